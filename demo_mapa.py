@@ -4,7 +4,8 @@ Demo del Sistema de Mapas y Sprites
 ====================================
 
 Este script crea una demostración visual del sistema de mapas implementado.
-Muestra todos los tipos de tiles disponibles y sus propiedades.
+Muestra todos los tipos de tiles disponibles y sus propiedades, y sirve
+de editor: se pintan tiles, se ponen y quitan jeeps y se guarda en .tmj.
 """
 
 import pygame
@@ -18,21 +19,33 @@ try:
     from settings import WIDTH, HEIGHT, FPS, TITLE, TILE_SIZE
     from tilemap import TileMap
     from sprite_manager import sprite_manager
+    from tile_animation import animation_clock
+    from hot_reload import HotReloader
+    from tile_editor import TileEditor
+    from minimap import Minimap
 except ImportError as e:
     print(f"Error al importar módulos: {e}")
     print("Asegúrate de que pygame esté instalado: pip install pygame")
     sys.exit(1)
 
 class MapDemo:
-    def __init__(self):
+    def __init__(self, map_path=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption(f"{TITLE} - Demo del Mapa")
         self.clock = pygame.time.Clock()
         self.running = True
+        self.dt = 1 / FPS
         
-        # Crear el mapa
-        self.tilemap = TileMap()
+        # Cargar los tiles reales en segundo plano
+        sprite_manager.stream_kenney_tiles()
+        
+        # Crear el mapa (o cargar un .tmj) y recargarlo en caliente al guardarlo
+        self.tilemap = TileMap(map_path=map_path)
+        self.hot_reload = HotReloader(self.tilemap, on_map_resized=self.reload_map)
+        self.editor = TileEditor(self.tilemap)
+        self.minimap = Minimap(self.tilemap)
+        self.show_minimap = True
         
         # Fuente para mostrar información
         try:
@@ -46,14 +59,21 @@ class MapDemo:
         print("=== Demo del Sistema de Mapas y Sprites ===")
         print("Controles:")
         print("- Mouse: Hover sobre tiles para ver información")
+        print("- Click izquierdo y arrastrar: Pintar con el tile elegido")
+        print("- Rueda o 1-9: Elegir tile   [ ]: Tamaño del pincel")
+        print("- Click derecho o J: Poner/quitar jeep")
+        print("- Ctrl+Z / Ctrl+Y: Deshacer / rehacer   Ctrl+S: Guardar .tmj")
+        print("- M: Mostrar/ocultar minimapa")
         print("- ESC o cerrar ventana: Salir")
         print("- Tiles cargados:", len(sprite_manager.get_all_sprites()))
         
         while self.running:
             self.handle_events()
+            sprite_manager.update_streaming()
+            self.hot_reload.poll()
             self.update()
             self.draw()
-            self.clock.tick(FPS)
+            self.dt = self.clock.tick(FPS) / 1000
         
         pygame.quit()
     
@@ -61,12 +81,28 @@ class MapDemo:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                self.show_minimap = not self.show_minimap
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:
+                self.editor.save()
+                # Se vuelve a vigilar el archivo guardado sin recargar lo que acabamos de escribir
+                self.hot_reload.set_tilemap(self.tilemap)
+            else:
+                self.editor.handle_event(event)
+    
+    def reload_map(self, path):
+        """El .tmj ha cambiado de tamaño: se carga como mapa nuevo"""
+        self.tilemap = TileMap(map_path=path)
+        self.hot_reload.set_tilemap(self.tilemap)
+        self.editor.set_tilemap(self.tilemap)
+        self.minimap = Minimap(self.tilemap)
     
     def update(self):
-        pass
+        # Reloj de animación común; el mapa solo marca las celdas cuyo frame cambia
+        animation_clock.update(self.dt)
+        self.tilemap.update_animations()
     
     def draw(self):
         self.screen.fill((0, 0, 0))
@@ -104,19 +140,37 @@ class MapDemo:
             self.screen.blit(text2, (panel_x + 10, panel_y + 35))
             self.screen.blit(text3, (panel_x + 10, panel_y + 55))
         
+        # Minimapa (las ediciones solo repintan sus píxeles)
+        if self.show_minimap:
+            minimap = self.minimap.render()
+            self.screen.blit(minimap, (WIDTH - minimap.get_width() - 10, HEIGHT - minimap.get_height() - 10))
+        
+        # Contorno del pincel bajo el mouse
+        size = self.editor.brush_size * TILE_SIZE
+        cell = self.editor.cell_at(*mouse_pos)
+        if cell:
+            offset = (self.editor.brush_size - 1) // 2
+            brush_rect = pygame.Rect((cell[1] - offset) * TILE_SIZE, (cell[0] - offset) * TILE_SIZE, size, size)
+            pygame.draw.rect(self.screen, (255, 255, 0), brush_rect, 2)
+        
         # Mostrar estadísticas generales
         if self.font:
             stats_text = f"Sprites cargados: {len(sprite_manager.get_all_sprites())}"
             map_size_text = f"Mapa: {len(self.tilemap.map_data[0])}x{len(self.tilemap.map_data)} tiles"
+            editor_text = (f"Pincel: {self.editor.brush} ({self.editor.brush_size}x{self.editor.brush_size})  "
+                           f"Deshacer: {len(self.editor.undo_stack)}{'  *sin guardar*' if self.editor.modified else ''}")
             
             stats_surface = self.font.render(stats_text, True, (255, 255, 255))
             map_surface = self.small_font.render(map_size_text, True, (255, 255, 255))
+            editor_surface = self.small_font.render(editor_text, True, (255, 255, 0))
             
             self.screen.blit(stats_surface, (10, 10))
             self.screen.blit(map_surface, (10, 35))
+            self.screen.blit(editor_surface, (10, 55))
         
         pygame.display.flip()
 
 if __name__ == "__main__":
-    demo = MapDemo()
+    # python demo_mapa.py [mapa.tmj]
+    demo = MapDemo(sys.argv[1] if len(sys.argv) > 1 else None)
     demo.run()
\ No newline at end of file
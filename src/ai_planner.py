@@ -0,0 +1,187 @@
+import heapq
+import itertools
+import queue
+import threading
+import traceback
+from pathfinding import HierarchicalPathfinder, CellPath, NEIGHBORS, navigation_grid
+
+
+class AIPlanner:
+    """Planificador de caminos en un hilo aparte.
+
+    El hilo trabajador mantiene su propia copia de la rejilla de navegación
+    y solo recibe deltas inmutables cuando el mapa cambia, así nunca lee el
+    estado del juego mientras el hilo principal lo modifica.
+
+    Las peticiones se agrupan por celda destino: si varios enemigos persiguen
+    al mismo jugador se resuelven con una única búsqueda inversa desde el
+    destino. update() limita cuántas búsquedas se envían y cuántos resultados
+    se aplican por frame; los resultados llegan en un tick posterior.
+    """
+
+    def __init__(self, tilemap, jobs_per_frame=4, results_per_frame=16, cluster_size=8):
+        self.tilemap = tilemap
+        self.jobs_per_frame = jobs_per_frame
+        self.results_per_frame = results_per_frame
+        self._pending = {}       # destino -> {solicitante: (origen, callback)}
+        self._in_flight = {}     # id de trabajo -> {solicitante: (origen, callback)}
+        self._job_ids = itertools.count()
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+
+        walkable, cost = navigation_grid(tilemap)
+        self._worker = threading.Thread(target=self._run, args=(walkable, cost, cluster_size),
+                                        name="ai-planner", daemon=True)
+        self._worker.start()
+        tilemap.add_change_listener(self._on_tiles_changed)
+
+    # --- Hilo principal ---
+
+    def request_path(self, requester, start, goal, callback):
+        """Pide un camino de start a goal; callback(path) se llamará en un update() posterior.
+
+        Si el solicitante ya tenía una petición pendiente, se sustituye.
+        """
+        for waiting in self._pending.values():
+            waiting.pop(requester, None)
+        self._pending.setdefault(goal, {})[requester] = (start, callback)
+
+    def cancel(self, requester):
+        """Olvida las peticiones del solicitante, pendientes o en cálculo (su resultado se descarta)"""
+        for waiting in itertools.chain(self._pending.values(), self._in_flight.values()):
+            waiting.pop(requester, None)
+
+    def is_waiting(self, requester):
+        """Indica si el solicitante tiene una petición sin responder"""
+        return (any(requester in waiting for waiting in self._pending.values()) or
+                any(requester in waiting for waiting in self._in_flight.values()))
+
+    def update(self):
+        """Envía trabajos y aplica resultados respetando los presupuestos por frame"""
+        # Enviar: un trabajo por destino, con todos sus orígenes
+        for _ in range(min(self.jobs_per_frame, len(self._pending))):
+            goal, waiting = self._pending.popitem()
+            if not waiting:
+                continue
+            job_id = next(self._job_ids)
+            self._in_flight[job_id] = waiting
+            starts = frozenset(start for start, _ in waiting.values())
+            self._jobs.put(('paths', job_id, goal, starts))
+
+        # Aplicar resultados de ticks anteriores
+        applied = 0
+        while applied < self.results_per_frame:
+            try:
+                job_id, paths = self._results.get_nowait()
+            except queue.Empty:
+                break
+            waiting = self._in_flight.pop(job_id, {})
+            for start, callback in waiting.values():
+                callback(paths.get(start))
+                applied += 1
+        return applied
+
+    def _on_tiles_changed(self, cells):
+        """Envía al trabajador los nuevos valores de las celdas cambiadas"""
+        jeep_cells = set(self.tilemap.jeep_cells())
+        delta = []
+        for row, col in cells:
+            modifier = self.tilemap.speed_grid[row][col]
+            walkable = self.tilemap.walkable_grid[row][col] and (row, col) not in jeep_cells
+            delta.append(((row, col), walkable, 1.0 / modifier if modifier > 0 else 0.0))
+        self._jobs.put(('update', tuple(delta)))
+
+    def shutdown(self):
+        """Detiene el hilo trabajador"""
+        self._jobs.put(('stop',))
+
+    # --- Hilo trabajador ---
+
+    def _run(self, walkable, cost, cluster_size):
+        pathfinder = HierarchicalPathfinder(walkable, cost, cluster_size)
+        while True:
+            message = self._jobs.get()
+            kind = message[0]
+            if kind == 'stop':
+                return
+            # Un error no puede matar el hilo: las peticiones siguientes se quedarían sin respuesta
+            try:
+                if kind == 'update':
+                    self._apply_update(pathfinder, message[1])
+                else:
+                    self._results.put((message[1], self._solve(pathfinder, message[2], message[3])))
+            except Exception as e:
+                print(f"⚠️  Error en el planificador de IA ({kind}): {e}")
+                traceback.print_exc()
+                if kind == 'update':
+                    # La rejilla ya tiene los valores nuevos: se rehace el grafo entero
+                    pathfinder.build()
+                else:
+                    self._results.put((message[1], {}))
+
+    @staticmethod
+    def _apply_update(pathfinder, delta):
+        changed = []
+        for cell, is_walkable, cell_cost in delta:
+            pathfinder.walkable[cell[0]][cell[1]] = is_walkable
+            pathfinder.cost[cell[0]][cell[1]] = cell_cost
+            changed.append(cell)
+        pathfinder.update_cells(changed)
+
+    @staticmethod
+    def _solve(pathfinder, goal, starts):
+        if len(starts) == 1:
+            start = next(iter(starts))
+            path = pathfinder.find_path(start, goal)
+            return {start: CellPath(path.cells(), path.cost)} if path else {}
+        return _shared_paths(pathfinder, goal, starts)
+
+
+def _shared_paths(pathfinder, goal, starts):
+    """Una sola búsqueda desde el destino sirve a todos los orígenes.
+
+    Dijkstra inverso desde goal hasta haber alcanzado todos los starts; cada
+    camino se reconstruye siguiendo los padres hacia el destino.
+    """
+    walkable = pathfinder.walkable
+    cost = pathfinder.cost
+    rows = pathfinder.rows
+    cols = pathfinder.cols
+    if not pathfinder._is_free(goal):
+        return {}
+
+    distances = {goal: 0.0}
+    parents = {goal: None}
+    remaining = {start for start in starts if pathfinder._is_free(start)}
+    heap = [(0.0, goal)]
+    while heap and remaining:
+        distance, cell = heapq.heappop(heap)
+        if distance > distances[cell]:
+            continue
+        remaining.discard(cell)
+        row, col = cell
+        # Coste de entrar en la celda actual al recorrer el camino hacia delante
+        step = cost[row][col] or 1.0
+        for d_row, d_col in NEIGHBORS:
+            n_row = row + d_row
+            n_col = col + d_col
+            if not (0 <= n_row < rows and 0 <= n_col < cols) or not walkable[n_row][n_col]:
+                continue
+            neighbor = (n_row, n_col)
+            new_distance = distance + step
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                parents[neighbor] = cell
+                heapq.heappush(heap, (new_distance, neighbor))
+
+    paths = {}
+    for start in starts:
+        if start not in parents:
+            continue
+        cells = []
+        cell = start
+        while cell is not None:
+            cells.append(cell)
+            cell = parents[cell]
+        paths[start] = CellPath(cells, distances[start])
+    return paths
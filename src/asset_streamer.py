@@ -0,0 +1,71 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+
+class AssetStreamer:
+    """Carga de imágenes en segundo plano.
+
+    Los hilos trabajadores leen y decodifican los PNG a bytes RGBA (sin tocar
+    el display). El hilo principal llama a finalize() una vez por frame y
+    convierte lo que haya llegado (frombuffer + convert_alpha) sin pasarse
+    del presupuesto de tiempo indicado.
+    """
+
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.ready = queue.Queue()
+        self.pending = 0
+
+    def request(self, name, path, scale=None):
+        """Encola la decodificación de una imagen"""
+        self.pending += 1
+        future = self.executor.submit(self._decode, path, scale)
+        future.add_done_callback(lambda f: self.ready.put((name, path, f)))
+
+    @staticmethod
+    def _decode(path, scale):
+        """Se ejecuta en un hilo trabajador: PNG -> bytes RGBA ya escalados"""
+        surface = pygame.image.load(path)
+        if scale:
+            surface = pygame.transform.scale(surface, scale)
+        return pygame.image.tobytes(surface, 'RGBA'), surface.get_size()
+
+    def finalize(self, on_loaded, on_error=None, budget_ms=2.0):
+        """Convierte en el hilo principal las imágenes listas, hasta agotar el presupuesto.
+
+        Devuelve el número de imágenes finalizadas en esta llamada.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        finalized = 0
+        while self.pending and time.perf_counter() < deadline:
+            try:
+                name, path, future = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(name, path, error)
+                continue
+
+            data, size = future.result()
+            surface = pygame.image.frombuffer(data, size, 'RGBA')
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.copy()  # Sin display: desligar del buffer
+            on_loaded(name, surface)
+            finalized += 1
+        return finalized
+
+    @property
+    def done(self):
+        """True cuando no queda nada por cargar ni por finalizar"""
+        return self.pending == 0
+
+    def shutdown(self):
+        """Detiene los hilos y descarta lo que no haya empezado"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,112 @@
+import numpy as np
+
+# Bits de vecinos de carretera
+ROAD_N = 1
+ROAD_E = 2
+ROAD_S = 4
+ROAD_W = 8
+
+# Tile de carretera según qué vecinos también son carretera
+ROAD_TILE_BY_MASK = {
+    0: 'road_straight_h',  # Tramo aislado
+    ROAD_N: 'road_straight_v',
+    ROAD_S: 'road_straight_v',
+    ROAD_N | ROAD_S: 'road_straight_v',
+    ROAD_E: 'road_straight_h',
+    ROAD_W: 'road_straight_h',
+    ROAD_E | ROAD_W: 'road_straight_h',
+    ROAD_E | ROAD_S: 'road_corner_bl',
+    ROAD_S | ROAD_W: 'road_corner_br',
+    ROAD_N | ROAD_E: 'road_corner_tl',
+    ROAD_N | ROAD_W: 'road_corner_tr',
+    ROAD_E | ROAD_S | ROAD_W: 'road_t_down',
+    ROAD_N | ROAD_E | ROAD_W: 'road_t_up',
+    ROAD_N | ROAD_S | ROAD_W: 'road_t_left',
+    ROAD_N | ROAD_E | ROAD_S: 'road_t_right',
+    ROAD_N | ROAD_E | ROAD_S | ROAD_W: 'road_intersection',
+}
+
+ROAD_TILES = frozenset(ROAD_TILE_BY_MASK.values())
+
+# Misma tabla indexable por máscara para la versión vectorizada
+_ROAD_LOOKUP = np.array([ROAD_TILE_BY_MASK[mask] for mask in range(16)], dtype=object)
+
+
+def is_road(tile_type):
+    """Indica si un tipo de tile es de carretera"""
+    return tile_type in ROAD_TILES
+
+
+def road_array(map_data):
+    """Array booleano con True en las celdas de carretera"""
+    return np.array([[tile in ROAD_TILES for tile in row] for row in map_data], dtype=bool)
+
+
+def road_masks(road):
+    """Máscara de 4 vecinos para cada celda de un array booleano de carreteras"""
+    padded = np.pad(road, 1, constant_values=False)
+    return ((padded[:-2, 1:-1] * ROAD_N) |
+            (padded[1:-1, 2:] * ROAD_E) |
+            (padded[2:, 1:-1] * ROAD_S) |
+            (padded[1:-1, :-2] * ROAD_W)).astype(np.uint8)
+
+
+def autotile_roads(map_data):
+    """Asigna el tile correcto a todas las carreteras del mapa.
+
+    Calcula las máscaras de todo el mapa de una vez y solo reescribe las
+    celdas cuyo tile cambia. Devuelve la lista de celdas (fila, col) cambiadas.
+    """
+    if not map_data:
+        return []
+    road = road_array(map_data)
+    wanted = _ROAD_LOOKUP[road_masks(road)]
+    current = np.array(map_data, dtype=object)
+    rows, cols = np.nonzero(road & (wanted != current))
+    changed = []
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        map_data[row][col] = wanted[row, col]
+        changed.append((row, col))
+    return changed
+
+
+def cell_mask(map_data, row, col):
+    """Máscara de 4 vecinos de una sola celda"""
+    rows = len(map_data)
+    cols = len(map_data[0])
+    mask = 0
+    if row > 0 and map_data[row - 1][col] in ROAD_TILES:
+        mask |= ROAD_N
+    if col < cols - 1 and map_data[row][col + 1] in ROAD_TILES:
+        mask |= ROAD_E
+    if row < rows - 1 and map_data[row + 1][col] in ROAD_TILES:
+        mask |= ROAD_S
+    if col > 0 and map_data[row][col - 1] in ROAD_TILES:
+        mask |= ROAD_W
+    return mask
+
+
+def update_autotile_at(map_data, row, col):
+    """Recalcula solo el vecindario 3x3 tras editar la celda (row, col).
+
+    Devuelve las celdas cuyo tile ha cambiado.
+    """
+    rows = len(map_data)
+    cols = len(map_data[0]) if rows else 0
+    changed = []
+    for r in range(max(0, row - 1), min(rows, row + 2)):
+        for c in range(max(0, col - 1), min(cols, col + 2)):
+            if map_data[r][c] not in ROAD_TILES:
+                continue
+            wanted = ROAD_TILE_BY_MASK[cell_mask(map_data, r, c)]
+            if map_data[r][c] != wanted:
+                map_data[r][c] = wanted
+                changed.append((r, c))
+    return changed
+
+
+def border_mask(map_data, target_tiles, next_to):
+    """Celdas de tipo target_tiles con algún vecino (4 direcciones) en next_to"""
+    target = np.array([[tile in target_tiles for tile in row] for row in map_data], dtype=bool)
+    near = np.array([[tile in next_to for tile in row] for row in map_data], dtype=bool)
+    return target & (road_masks(near) != 0)
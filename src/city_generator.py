@@ -0,0 +1,233 @@
+import random
+from collections import OrderedDict
+from autotile import ROAD_N, ROAD_E, ROAD_S, ROAD_W, ROAD_TILE_BY_MASK
+
+# Tipos de manzana y su peso relativo
+BLOCK_KINDS = [('buildings', 5), ('park', 3), ('plaza', 1), ('lot', 1)]
+
+MASK_64 = (1 << 64) - 1
+
+
+def mix_hash(*values):
+    """Hash entero estable entre ejecuciones (splitmix64 sobre los valores)"""
+    h = 0x9E3779B97F4A7C15
+    for value in values:
+        h = (h ^ (value & MASK_64)) & MASK_64
+        h = (h * 0xBF58476D1CE4E5B9) & MASK_64
+        h ^= h >> 31
+        h = (h * 0x94D049BB133111EB) & MASK_64
+        h ^= h >> 29
+    return h
+
+
+class Chunk:
+    """Trozo de mapa generado: tiles y posiciones de jeeps (en tiles globales)"""
+
+    __slots__ = ('cx', 'cy', 'tiles', 'jeeps')
+
+    def __init__(self, cx, cy, tiles, jeeps):
+        self.cx = cx
+        self.cy = cy
+        self.tiles = tiles
+        self.jeeps = jeeps
+
+
+class CityGenerator:
+    """Generador procedural de mapas urbanos por chunks.
+
+    Cada tile es función pura de (seed, x, y): las carreteras forman una
+    rejilla de manzanas en la que algunos tramos se eliminan según la semilla
+    (así aparecen esquinas y cruces en T), y cada manzana elige su contenido
+    con un RNG derivado de (seed, manzana). Por eso cualquier chunk se puede
+    generar de forma independiente y siempre sale igual.
+    """
+
+    def __init__(self, seed=0, chunk_size=16, block_size=8, removed_road_chance=0.2):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.block_size = block_size
+        self.removed_road_chance = removed_road_chance
+        self._blocks = OrderedDict()  # Caché pequeña de manzanas ya diseñadas
+
+    # --- Red de carreteras ---
+
+    def _segment_exists(self, axis, bx, by):
+        """Un tramo de carretera entre dos cruces (axis 0 = horizontal, 1 = vertical)"""
+        roll = mix_hash(self.seed, 1 + axis, bx, by) % 1000
+        return roll >= self.removed_road_chance * 1000
+
+    def is_road(self, x, y):
+        """Indica si el tile global (x, y) es carretera"""
+        size = self.block_size
+        on_vertical = x % size == 0
+        on_horizontal = y % size == 0
+        bx, by = x // size, y // size
+        if on_vertical and on_horizontal:
+            # Cruce: existe si llega al menos un tramo
+            return (self._segment_exists(0, bx, by) or self._segment_exists(0, bx - 1, by) or
+                    self._segment_exists(1, bx, by) or self._segment_exists(1, bx, by - 1))
+        if on_horizontal:
+            return self._segment_exists(0, bx, by)
+        if on_vertical:
+            return self._segment_exists(1, bx, by)
+        return False
+
+    def road_mask(self, x, y):
+        """Bits de los vecinos que también son carretera"""
+        mask = 0
+        if self.is_road(x, y - 1):
+            mask |= ROAD_N
+        if self.is_road(x + 1, y):
+            mask |= ROAD_E
+        if self.is_road(x, y + 1):
+            mask |= ROAD_S
+        if self.is_road(x - 1, y):
+            mask |= ROAD_W
+        return mask
+
+    # --- Manzanas ---
+
+    def _block_layout(self, bx, by):
+        """Diseña (y cachea) el contenido de una manzana"""
+        key = (bx, by)
+        layout = self._blocks.get(key)
+        if layout is not None:
+            self._blocks.move_to_end(key)
+            return layout
+
+        rng = random.Random(mix_hash(self.seed, 10, bx, by))
+        kinds = [kind for kind, _ in BLOCK_KINDS]
+        weights = [weight for _, weight in BLOCK_KINDS]
+        kind = rng.choices(kinds, weights)[0]
+        inner = self.block_size - 1  # Tiles entre carreteras
+        layout = {'kind': kind}
+
+        if kind == 'buildings' and inner >= 5:
+            width = rng.randint(3, inner - 2)
+            height = rng.randint(3, inner - 2)
+            left = rng.randint(2, inner - width)
+            top = rng.randint(2, inner - height)
+            layout['building'] = (left, top, left + width - 1, top + height - 1)
+            layout['door'] = rng.randint(left + 1, left + width - 2)
+            layout['roof'] = rng.choice(['roof_red', 'roof_blue'])
+            layout['floor'] = rng.choice(['stone_light', 'stone_dark'])
+        elif kind == 'park' and inner >= 6 and rng.random() < 0.4:
+            # Estanque con centro profundo
+            layout['pond'] = (3, 3, inner - 2, inner - 2)
+        elif kind == 'lot':
+            layout['ground'] = rng.choice(['dirt', 'sand'])
+
+        # Jeep aparcado en la acera de arriba (ocupa 2x1 tiles)
+        if rng.random() < 0.35:
+            layout['jeep'] = rng.randint(1, inner - 2)
+
+        self._blocks[key] = layout
+        if len(self._blocks) > 256:
+            self._blocks.popitem(last=False)
+        return layout
+
+    def _block_tile(self, x, y):
+        """Tile que no es carretera: depende de la manzana y de los vecinos"""
+        size = self.block_size
+        if self.road_mask(x, y):
+            return 'sidewalk'
+
+        local_x = x % size
+        local_y = y % size
+        if local_x == 0 or local_y == 0:
+            # Sobre un tramo de carretera eliminado: zona verde
+            return 'tree_trunk' if mix_hash(self.seed, 20, x, y) % 100 < 8 else 'grass'
+
+        layout = self._block_layout(x // size, y // size)
+        kind = layout['kind']
+        if kind == 'buildings' and 'building' in layout:
+            left, top, right, bottom = layout['building']
+            if left <= local_x <= right and top <= local_y <= bottom:
+                if local_y == top:
+                    return layout['roof']
+                if local_y == bottom:
+                    return 'door' if local_x == layout['door'] else 'brick_wall'
+                if local_x == left or local_x == right:
+                    return 'brick_wall'
+                if local_y == top + 1 and (local_x - left) % 2 == 0:
+                    return 'window'
+                return layout['floor']
+            return 'grass'
+        if kind == 'park':
+            if 'pond' in layout:
+                left, top, right, bottom = layout['pond']
+                if left <= local_x <= right and top <= local_y <= bottom:
+                    edge = local_x in (left, right) or local_y in (top, bottom)
+                    return 'water' if edge else 'water_deep'
+            return 'tree_trunk' if mix_hash(self.seed, 21, x, y) % 100 < 15 else 'grass'
+        if kind == 'plaza':
+            return 'cobblestone'
+        return layout.get('ground', 'grass')
+
+    def get_tile(self, x, y):
+        """Tipo de tile en la posición global (x, y)"""
+        if self.is_road(x, y):
+            return ROAD_TILE_BY_MASK[self.road_mask(x, y)]
+        return self._block_tile(x, y)
+
+    # --- Chunks ---
+
+    def generate_chunk(self, cx, cy):
+        """Genera el chunk (cx, cy); el resultado es determinista por (seed, cx, cy)"""
+        size = self.chunk_size
+        x0 = cx * size
+        y0 = cy * size
+        tiles = [[self.get_tile(x0 + col, y0 + row) for col in range(size)] for row in range(size)]
+
+        # Jeeps de las manzanas cuyo tile de anclaje cae dentro de este chunk
+        jeeps = []
+        block = self.block_size
+        for by in range(y0 // block, (y0 + size - 1) // block + 1):
+            for bx in range(x0 // block, (x0 + size - 1) // block + 1):
+                offset = self._block_layout(bx, by).get('jeep')
+                if offset is None:
+                    continue
+                jx = bx * block + offset
+                jy = by * block + 1
+                if not (x0 <= jx < x0 + size and y0 <= jy < y0 + size):
+                    continue
+                if (self._is_parking_tile(jx, jy) and self._is_parking_tile(jx + 1, jy)):
+                    jeeps.append((jx, jy))
+        return Chunk(cx, cy, tiles, jeeps)
+
+    def _is_parking_tile(self, x, y):
+        return not self.is_road(x, y) and self._block_tile(x, y) in ('sidewalk', 'grass', 'cobblestone')
+
+    def iter_chunks(self, cx0, cy0, cx1, cy1):
+        """Genera los chunks del rectángulo [cx0, cx1) x [cy0, cy1) de uno en uno"""
+        for cy in range(cy0, cy1):
+            for cx in range(cx0, cx1):
+                yield self.generate_chunk(cx, cy)
+
+
+class ChunkCache:
+    """Mantiene en memoria solo los chunks usados recientemente"""
+
+    def __init__(self, generator, max_chunks=64):
+        self.generator = generator
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+
+    def get_chunk(self, cx, cy):
+        """Devuelve el chunk, generándolo si hace falta"""
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.generator.generate_chunk(cx, cy)
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def get_tile(self, x, y):
+        """Tipo de tile en la posición global (x, y)"""
+        size = self.generator.chunk_size
+        chunk = self.get_chunk(x // size, y // size)
+        return chunk.tiles[y % size][x % size]
@@ -0,0 +1,154 @@
+import numpy as np
+
+# Etiqueta de las celdas bloqueadas
+NO_COMPONENT = -1
+
+
+def label_components(open_cells, labels=None):
+    """Etiqueta las componentes 4-conexas de una rejilla booleana.
+
+    Relleno vectorizado: cada celda toma la etiqueta mínima de sus vecinas
+    abiertas y después salta a la etiqueta de su etiqueta (pointer jumping)
+    hasta que nada cambia. La etiqueta de una componente es el índice plano
+    de su celda más baja. Si se pasan labels solo se recalculan las celdas
+    abiertas de open_cells y el resto se deja como está.
+    """
+    rows, cols = open_cells.shape
+    flat = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+    current = np.where(open_cells, flat, NO_COMPONENT)
+    if open_cells.size == 0:
+        return current if labels is None else labels
+    big = rows * cols
+    while True:
+        work = np.where(open_cells, current, big)
+        best = work.copy()
+        np.minimum(best[1:], work[:-1], out=best[1:])
+        np.minimum(best[:-1], work[1:], out=best[:-1])
+        np.minimum(best[:, 1:], work[:, :-1], out=best[:, 1:])
+        np.minimum(best[:, :-1], work[:, 1:], out=best[:, :-1])
+        best = np.where(open_cells, best, NO_COMPONENT)
+        # Saltar por los punteros acelera la convergencia en pasillos largos
+        flat_best = best.ravel()
+        while True:
+            mask = flat_best >= 0
+            jumped = flat_best.copy()
+            jumped[mask] = flat_best[flat_best[mask]]
+            if np.array_equal(jumped, flat_best):
+                break
+            flat_best = jumped
+        best = flat_best.reshape(rows, cols)
+        if np.array_equal(best, current):
+            break
+        current = best
+    if labels is None:
+        return current
+    labels[open_cells] = current[open_cells]
+    return labels
+
+
+class ConnectivityIndex:
+    """Componentes conexas de las celdas caminables de un TileMap (jeeps incluidos).
+
+    reachable(a, b) compara dos etiquetas, así que es O(1). Se mantiene con
+    los avisos de cambio del mapa: si una celda se abre se fusionan las
+    componentes vecinas; si se cierra solo se re-etiqueta la componente a la
+    que pertenecía, que es la única que puede haberse partido. Ese
+    re-etiquetado se deja para la siguiente consulta, así un trazo del
+    editor que cierra muchas celdas seguidas lo paga una sola vez.
+    """
+
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        self.open_cells = self._open_cells()
+        self._labels = label_components(self.open_cells)
+        self._split = set()  # Componentes que quizá se han partido, pendientes de re-etiquetar
+        self._sizes = None
+        tilemap.add_change_listener(self._on_tiles_changed)
+
+    def _open_cells(self):
+        open_cells = ~self.tilemap.blocked_padded[1:-1, 1:-1].copy()
+        for row, col in self.tilemap.jeep_cells():
+            open_cells[row, col] = False
+        return open_cells
+
+    @property
+    def labels(self):
+        """Etiqueta de cada celda, con los re-etiquetados pendientes ya hechos"""
+        if self._split:
+            region = np.isin(self._labels, list(self._split)) & self.open_cells
+            label_components(region, self._labels)
+            self._split.clear()
+        return self._labels
+
+    def _on_tiles_changed(self, cells):
+        blocked = self.tilemap.blocked_padded
+        jeep_cells = self.tilemap.jeep_cells()
+        labels = self._labels
+        rows, cols = labels.shape
+        cells = [(row, col) for row, col in cells if 0 <= row < rows and 0 <= col < cols]
+        now_open = {cell: not blocked[cell[0] + 1, cell[1] + 1] and cell not in jeep_cells for cell in cells}
+        # Primero los cierres: sus componentes quedan pendientes de re-etiquetar
+        split = self._split
+        for row, col in cells:
+            if self.open_cells[row, col] and not now_open[(row, col)]:
+                split.add(int(labels[row, col]))
+                labels[row, col] = NO_COMPONENT
+                self.open_cells[row, col] = False
+        # Después las aperturas, que solo pueden unir componentes
+        for row, col in cells:
+            if now_open[(row, col)] and not self.open_cells[row, col]:
+                self.open_cells[row, col] = True
+                merged, target = self._merge_at(row, col)
+                if merged & split:
+                    split.add(target)
+        self._sizes = None
+
+    def _merge_at(self, row, col):
+        """Une la celda recién abierta con las componentes vecinas; devuelve (etiquetas unidas, etiqueta final)"""
+        labels = self._labels
+        rows, cols = labels.shape
+        found = {int(labels[r, c]) for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                 if 0 <= r < rows and 0 <= c < cols and self.open_cells[r, c]}
+        found.discard(NO_COMPONENT)
+        target = min(found | {row * cols + col})
+        labels[row, col] = target
+        if found - {target}:
+            labels[np.isin(labels, list(found))] = target
+        return found, target
+
+    # --- Consultas ---
+
+    def component(self, cell):
+        """Etiqueta de la componente de la celda (NO_COMPONENT si está bloqueada o fuera)"""
+        row, col = cell
+        if 0 <= row < self.labels.shape[0] and 0 <= col < self.labels.shape[1]:
+            return int(self.labels[row, col])
+        return NO_COMPONENT
+
+    def reachable(self, cell_a, cell_b):
+        """¿Se puede ir andando de una celda a la otra?"""
+        label = self.component(cell_a)
+        return label != NO_COMPONENT and label == self.component(cell_b)
+
+    def component_at(self, x, y):
+        """Etiqueta de la componente bajo un punto en píxeles"""
+        size = self.tilemap.tile_size
+        return self.component((int(y // size), int(x // size)))
+
+    def component_sizes(self):
+        """Diccionario etiqueta -> número de celdas"""
+        if self._sizes is None:
+            labels, counts = np.unique(self.labels[self.labels >= 0], return_counts=True)
+            self._sizes = dict(zip(labels.tolist(), counts.tolist()))
+        return self._sizes
+
+    def largest_component(self):
+        """Etiqueta de la componente con más celdas (NO_COMPONENT si no hay ninguna)"""
+        sizes = self.component_sizes()
+        if not sizes:
+            return NO_COMPONENT
+        return max(sizes, key=sizes.get)
+
+    def cells_of(self, label):
+        """Celdas (fila, col) de una componente"""
+        return np.argwhere(self.labels == label)
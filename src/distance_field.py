@@ -0,0 +1,204 @@
+import heapq
+import numpy as np
+from pathfinding import NEIGHBORS, navigation_grid
+
+INF = float('inf')
+
+# Con más orígenes cambiados que esto sale más barato recalcular todo
+_MAX_INCREMENTAL_CHANGES = 8
+
+
+class DistanceField:
+    """Mapa de distancias de Dijkstra con varios orígenes sobre la rejilla.
+
+    El coste de entrar en una celda es 1 / speed_modifier (como en
+    navigation_grid) y los jeeps bloquean el paso, aunque sus celdas pueden
+    ser origen. Cada celda recuerda qué origen le da su distancia: al mover
+    un origen una casilla se añade el nuevo (solo baja distancias) y se
+    quita el viejo, invalidando únicamente la región que dependía de él y
+    repropagando desde su borde. Si cambia el mapa se recalcula entero la
+    próxima vez que se consulta.
+    """
+
+    def __init__(self, tilemap, sources=()):
+        self.tilemap = tilemap
+        self.rows = len(tilemap.map_data)
+        self.cols = len(tilemap.map_data[0]) if self.rows else 0
+        self.dist = [INF] * (self.rows * self.cols)
+        self.owner = [-1] * (self.rows * self.cols)
+        self.sources = set()
+        self._load_grid()
+        self._dirty = False
+        tilemap.add_change_listener(self._on_tiles_changed)
+        self.set_sources(sources)
+
+    def _load_grid(self):
+        walkable, cost = navigation_grid(self.tilemap)
+        self._walkable = [cell for row in walkable for cell in row]
+        self._cost = [cell for row in cost for cell in row]
+        cols = self.cols
+        # Vecinos de cada celda en índices planos
+        self._neighbors = []
+        for row in range(self.rows):
+            for col in range(cols):
+                self._neighbors.append(tuple((row + d_row) * cols + col + d_col
+                                             for d_row, d_col in NEIGHBORS
+                                             if 0 <= row + d_row < self.rows and 0 <= col + d_col < cols))
+
+    def _on_tiles_changed(self, cells):
+        self._dirty = True
+
+    # --- Orígenes ---
+
+    def set_sources(self, cells):
+        """Fija los orígenes (celdas (fila, col)); actualiza solo lo necesario"""
+        new = {row * self.cols + col for row, col in cells
+               if 0 <= row < self.rows and 0 <= col < self.cols}
+        if self._dirty:
+            self._load_grid()
+            self._dirty = False
+            self.sources = new
+            self._recompute()
+            return
+        added = new - self.sources
+        removed = self.sources - new
+        if not added and not removed:
+            return
+        if len(added) + len(removed) > _MAX_INCREMENTAL_CHANGES:
+            self.sources = new
+            self._recompute()
+            return
+        self.sources = new
+        for source in added:
+            self._add_source(source)
+        for source in removed:
+            self._remove_source(source)
+
+    def _recompute(self):
+        n = self.rows * self.cols
+        self.dist = [INF] * n
+        self.owner = [-1] * n
+        heap = []
+        for source in self.sources:
+            self.dist[source] = 0.0
+            self.owner[source] = source
+            heap.append((0.0, source))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _add_source(self, source):
+        self.dist[source] = 0.0
+        self.owner[source] = source
+        self._propagate([(0.0, source)])
+
+    def _remove_source(self, source):
+        """Invalida la región que dependía del origen y la rellena desde su borde.
+
+        Cada celda hereda el dueño de una vecina, así que la región es conexa:
+        se inunda desde el origen en vez de recorrer todo el mapa.
+        """
+        dist = self.dist
+        owner = self.owner
+        neighbors = self._neighbors
+        region = []
+        if owner[source] == source:
+            region.append(source)
+            dist[source] = INF
+            owner[source] = -1
+        stack = [source]
+        while stack:
+            for neighbor in neighbors[stack.pop()]:
+                if owner[neighbor] == source:
+                    dist[neighbor] = INF
+                    owner[neighbor] = -1
+                    region.append(neighbor)
+                    stack.append(neighbor)
+        cost = self._cost
+        walkable = self._walkable
+        heap = []
+        for cell in region:
+            if not walkable[cell]:
+                continue
+            for neighbor in self._neighbors[cell]:
+                candidate = dist[neighbor] + cost[cell]
+                if candidate < dist[cell]:
+                    dist[cell] = candidate
+                    owner[cell] = owner[neighbor]
+            if dist[cell] < INF:
+                heap.append((dist[cell], cell))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _propagate(self, heap):
+        dist = self.dist
+        owner = self.owner
+        cost = self._cost
+        walkable = self._walkable
+        neighbors = self._neighbors
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > dist[cell]:
+                continue
+            cell_owner = owner[cell]
+            for neighbor in neighbors[cell]:
+                if not walkable[neighbor]:
+                    continue
+                new_distance = distance + cost[neighbor]
+                if new_distance < dist[neighbor]:
+                    dist[neighbor] = new_distance
+                    owner[neighbor] = cell_owner
+                    heapq.heappush(heap, (new_distance, neighbor))
+
+    # --- Consultas ---
+
+    def _refresh(self):
+        if self._dirty:
+            self._load_grid()
+            self._dirty = False
+            self._recompute()
+
+    def distance(self, cell):
+        """Distancia ponderada desde el origen más cercano (inf si no se llega)"""
+        self._refresh()
+        row, col = cell
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.dist[row * self.cols + col]
+        return INF
+
+    def as_array(self):
+        """Copia (filas, columnas) de las distancias"""
+        self._refresh()
+        return np.array(self.dist, dtype=np.float64).reshape(self.rows, self.cols)
+
+    def downhill(self, cell):
+        """Vecino caminable más cercano a los orígenes (para perseguir), o None"""
+        return self._best_neighbor(cell, -1)
+
+    def uphill(self, cell):
+        """Vecino caminable más alejado de los orígenes (para huir), o None"""
+        return self._best_neighbor(cell, 1)
+
+    def _best_neighbor(self, cell, sign):
+        self._refresh()
+        row, col = cell
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        index = row * self.cols + col
+        best = None
+        best_value = self.dist[index] * sign if self.dist[index] < INF else -INF
+        for neighbor in self._neighbors[index]:
+            value = self.dist[neighbor]
+            if not self._walkable[neighbor] or value == INF:
+                continue
+            if value * sign > best_value:
+                best_value = value * sign
+                best = neighbor
+        if best is None:
+            return None
+        return divmod(best, self.cols)
+
+
+def influence_map(field, radius):
+    """Influencia que decae linealmente de 1 en los orígenes a 0 a 'radius' de coste"""
+    distances = field.as_array()
+    return np.clip(1.0 - distances / radius, 0.0, 1.0)
@@ -0,0 +1,77 @@
+import numpy as np
+
+# Capas de dibujo (se dibujan en orden creciente)
+LAYER_GROUND = 0    # Marcas y objetos pegados al suelo
+LAYER_ENTITIES = 1  # Jeeps, jugador, enemigos: se ordenan por su base
+LAYER_OVERLAY = 2   # Efectos por encima de todo
+
+
+class DrawList:
+    """Lista de dibujo ordenada por capa y por clave de profundidad.
+
+    Cada frame los objetos envían (capa, clave, id de sprite, posición); al
+    vaciarla se descartan los que quedan fuera de la vista, se ordena todo
+    con NumPy y cada capa se dibuja con una sola llamada a blits(). Los ids
+    de sprite indexan la tabla sprites (por ejemplo World.sprites).
+    """
+
+    def __init__(self, sprites, viewport):
+        self.sprites = sprites
+        self.viewport = viewport
+        self._batches = []
+        self.drawn = 0
+        self.culled = 0
+
+    def clear(self):
+        self._batches.clear()
+
+    def submit(self, layer, sort_key, sprite_id, position):
+        """Añade un único objeto"""
+        width, height = self.sprites[sprite_id].get_size()
+        self._batches.append(np.array([[layer, sort_key, sprite_id, position[0], position[1],
+                                        width, height]], dtype=np.float64))
+
+    def submit_many(self, layers, sort_keys, sprite_ids, positions, sizes):
+        """Añade un lote de objetos (arrays del mismo largo, posiciones y tamaños (N, 2))"""
+        if len(sprite_ids) == 0:
+            return
+        batch = np.empty((len(sprite_ids), 7), dtype=np.float64)
+        batch[:, 0] = layers
+        batch[:, 1] = sort_keys
+        batch[:, 2] = sprite_ids
+        batch[:, 3:5] = positions
+        batch[:, 5:7] = sizes
+        self._batches.append(batch)
+
+    def flush(self, target):
+        """Dibuja todo lo enviado sobre target (Surface o renderer) y vacía la lista"""
+        if not self._batches:
+            self.drawn = self.culled = 0
+            return
+        items = np.concatenate(self._batches) if len(self._batches) > 1 else self._batches[0]
+        self._batches.clear()
+
+        # Descartar lo que no toca la vista
+        left, top, width, height = self.viewport
+        x = np.round(items[:, 3])
+        y = np.round(items[:, 4])
+        visible = ((x < left + width) & (x + items[:, 5] > left) &
+                   (y < top + height) & (y + items[:, 6] > top))
+        self.culled = int(len(items) - visible.sum())
+        items = items[visible]
+        x = x[visible] - left
+        y = y[visible] - top
+        self.drawn = len(items)
+        if not self.drawn:
+            return
+
+        # Orden estable por capa y, dentro de cada capa, por clave
+        order = np.lexsort((items[:, 1], items[:, 0]))
+        layers = items[order, 0]
+        sprite_ids = items[order, 2].astype(np.int64).tolist()
+        positions = np.column_stack((x[order], y[order])).astype(np.int64).tolist()
+        sprites = self.sprites
+        bounds = np.flatnonzero(np.diff(layers)) + 1
+        for start, end in zip([0, *bounds.tolist()], [*bounds.tolist(), len(layers)]):
+            target.blits([(sprites[sprite_ids[i]], positions[i]) for i in range(start, end)],
+                         doreturn=False)
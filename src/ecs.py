@@ -0,0 +1,240 @@
+import numpy as np
+import pygame
+from sweep import sweep_move
+from drawlist import LAYER_ENTITIES
+
+# Estados de IA
+AI_NONE = 0
+AI_CHASE = 1
+AI_PATH = 2  # La dirección la fija quien sigue el camino (Enemy)
+
+# Banderas de colisionador
+COLLIDER_NONE = 0
+COLLIDER_SOLID = 1   # Choca con la rejilla de caminabilidad
+COLLIDER_DAMAGE = 2  # Mata al jugador al tocarlo (jeeps)
+
+
+class World:
+    """Almacén de entidades con componentes en arrays contiguos.
+
+    Cada entidad es un índice en los arrays. Los sistemas de este módulo
+    recorren todas las entidades a la vez con operaciones de NumPy en lugar
+    de llamar a un método de Python por objeto.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.count = 0    # Índice más alto usado + 1
+        self.free_ids = []
+        self.sprites = []  # id de sprite -> Surface
+        self.sprite_ids = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Crea o amplía los arrays de componentes conservando los datos"""
+        def grow(array, shape, dtype, fill=0):
+            new_array = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                new_array[:len(array)] = array
+            return new_array
+
+        old = self.capacity > 0
+        self.alive = grow(self.alive if old else None, capacity, bool)
+        self.position = grow(self.position if old else None, (capacity, 2), np.float64)
+        self.direction = grow(self.direction if old else None, (capacity, 2), np.float64)
+        self.motion = grow(self.motion if old else None, (capacity, 2), np.float64)  # Desplazamiento del último paso
+        self.size = grow(self.size if old else None, (capacity, 2), np.float64)
+        self.speed = grow(self.speed if old else None, capacity, np.float64)
+        self.sprite = grow(self.sprite if old else None, capacity, np.int32, -1)
+        self.layer = grow(self.layer if old else None, capacity, np.uint8, LAYER_ENTITIES)
+        self.collider = grow(self.collider if old else None, capacity, np.uint8)
+        self.ai_state = grow(self.ai_state if old else None, capacity, np.uint8)
+        self.ai_target = grow(self.ai_target if old else None, capacity, np.int32, -1)
+        self.capacity = capacity
+
+    def create_entity(self, x, y, width, height, speed=0.0, sprite=-1, collider=COLLIDER_SOLID):
+        """Crea una entidad y devuelve su id"""
+        if self.free_ids:
+            eid = self.free_ids.pop()
+        else:
+            if self.count == self.capacity:
+                self._allocate(self.capacity * 2)
+            eid = self.count
+            self.count += 1
+
+        self.alive[eid] = True
+        self.position[eid] = (x, y)
+        self.direction[eid] = (0.0, 0.0)
+        self.motion[eid] = (0.0, 0.0)
+        self.size[eid] = (width, height)
+        self.speed[eid] = speed
+        self.sprite[eid] = sprite
+        self.layer[eid] = LAYER_ENTITIES
+        self.collider[eid] = collider
+        self.ai_state[eid] = AI_NONE
+        self.ai_target[eid] = -1
+        return eid
+
+    def destroy_entity(self, eid):
+        """Libera el id para reutilizarlo"""
+        if self.alive[eid]:
+            self.alive[eid] = False
+            self.ai_target[self.ai_target == eid] = -1
+            self.free_ids.append(eid)
+
+    def register_sprite(self, key, surface):
+        """Registra una superficie y devuelve su id de sprite"""
+        if key not in self.sprite_ids:
+            self.sprite_ids[key] = len(self.sprites)
+            self.sprites.append(surface)
+        return self.sprite_ids[key]
+
+    def active_ids(self):
+        """Ids de las entidades vivas"""
+        return np.flatnonzero(self.alive[:self.count])
+
+
+def ai_system(world, ids=None):
+    """Orienta hacia su objetivo a todas las entidades en modo persecución"""
+    if ids is None:
+        ids = world.active_ids()
+    ids = ids[world.ai_state[ids] == AI_CHASE]
+    targets = world.ai_target[ids]
+    ids = ids[(targets >= 0)]
+    if len(ids) == 0:
+        return
+    targets = world.ai_target[ids]
+
+    centers = world.position[ids] + world.size[ids] / 2
+    target_centers = world.position[targets] + world.size[targets] / 2
+    delta = target_centers - centers
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    moving = length > 0
+    delta[moving] /= length[moving, None]
+    delta[~moving] = 0.0
+    world.direction[ids] = delta
+
+
+def movement_system(world, tilemap, dt, ids=None):
+    """Mueve en bloque todas las entidades con dirección no nula.
+
+    La velocidad se escala por dt y por el speed_modifier del tile bajo el
+    centro. Si el paso no supera un tile, la colisión con la rejilla se
+    resuelve en bloque primero en X y luego en Y; las entidades más rápidas
+    se barren contra la rejilla (sweep_move) para no atravesar paredes.
+    El desplazamiento aplicado queda en world.motion.
+    """
+    if ids is None:
+        ids = world.active_ids()
+    world.motion[ids] = 0.0
+    direction = world.direction[ids]
+    ids = ids[(direction[:, 0] != 0) | (direction[:, 1] != 0)]
+    if len(ids) == 0:
+        return
+
+    tile_size = tilemap.tile_size
+    speed_array = tilemap.speed_array
+    rows, cols = speed_array.shape
+    start = world.position[ids]
+    position = start.copy()
+    size = world.size[ids]
+    direction = world.direction[ids]
+
+    # Modificador de terreno bajo el centro de cada entidad
+    center_col = np.clip(((position[:, 0] + size[:, 0] / 2) // tile_size).astype(np.int64), 0, cols - 1)
+    center_row = np.clip(((position[:, 1] + size[:, 1] / 2) // tile_size).astype(np.int64), 0, rows - 1)
+    modifier = speed_array[center_row, center_col]
+    modifier = np.where(modifier > 0, modifier, 1.0)
+    step = world.speed[ids] * modifier * dt
+    delta = direction * step[:, None]
+
+    # Solo los colisionadores sólidos respetan la rejilla
+    solid = (world.collider[ids] & COLLIDER_SOLID) != 0
+    blocked = tilemap.blocked_padded
+    position[:, 0] = _resolve_axis(position, size, position[:, 0] + delta[:, 0],
+                                   0, solid, blocked, tile_size)
+    position[:, 1] = _resolve_axis(position, size, position[:, 1] + delta[:, 1],
+                                   1, solid, blocked, tile_size)
+
+    # Con más de un tile por paso la comprobación del tile final no basta
+    fast = np.flatnonzero(solid & (np.abs(delta).max(axis=1) > tile_size))
+    for index in fast.tolist():
+        (x, y), (w, h), (dx, dy) = start[index], size[index], delta[index]
+        position[index] = sweep_move(blocked, tile_size, x, y, w, h, dx, dy)
+
+    world.position[ids] = position
+    world.motion[ids] = position - start
+
+
+def _resolve_axis(position, size, new_value, axis, solid, blocked, tile_size):
+    """Ajusta new_value contra el primer tile bloqueado en el eje dado.
+
+    blocked es la rejilla de tiles no caminables con un borde de un tile
+    (fuera del mapa cuenta como bloqueado), por eso los índices van +1.
+    """
+    other = 1 - axis
+    old_value = position[:, axis]
+    forward = new_value > old_value
+    lead = np.where(forward, new_value + size[:, axis] - 1, new_value)
+    lead_tile = np.floor_divide(lead, tile_size).astype(np.int64)
+
+    first = np.floor_divide(position[:, other], tile_size).astype(np.int64)
+    last = np.floor_divide(position[:, other] + size[:, other] - 1, tile_size).astype(np.int64)
+    # blocked se indexa [fila, columna]: en X el tile de avance es una columna
+    limit_lead = blocked.shape[other] - 1
+    limit_span = blocked.shape[axis] - 1
+    lead_index = np.clip(lead_tile + 1, 0, limit_lead)
+
+    hit = np.zeros(len(position), dtype=bool)
+    for offset in range(int((last - first).max()) + 1 if len(position) else 0):
+        span = first + offset
+        valid = span <= last
+        span_index = np.clip(span + 1, 0, limit_span)
+        if axis == 0:
+            cell = blocked[span_index, lead_index]
+        else:
+            cell = blocked[lead_index, span_index]
+        hit |= valid & cell
+
+    hit &= solid & (new_value != old_value)
+    snapped = np.where(forward, lead_tile * tile_size - size[:, axis], (lead_tile + 1) * tile_size)
+    return np.where(hit, snapped, new_value)
+
+
+def collision_system(world, rect, collider_mask, ids=None):
+    """Ids de las entidades cuyo colisionador comparte bits con collider_mask y solapan rect"""
+    if ids is None:
+        ids = world.active_ids()
+    ids = ids[(world.collider[ids] & collider_mask) != 0]
+    if len(ids) == 0:
+        return ids
+    x, y, w, h = rect
+    position = world.position[ids]
+    size = world.size[ids]
+    # Mismo criterio que pygame.Rect.colliderect sobre posiciones enteras
+    left = np.round(position[:, 0])
+    top = np.round(position[:, 1])
+    overlap = ((left < x + w) & (left + size[:, 0] > x) &
+               (top < y + h) & (top + size[:, 1] > y))
+    return ids[overlap]
+
+
+def draw_system(world, draw_list, ids=None):
+    """Envía a la lista de dibujo todas las entidades con sprite, ordenadas por su base"""
+    if ids is None:
+        ids = world.active_ids()
+    ids = ids[world.sprite[ids] >= 0]
+    position = world.position[ids]
+    size = world.size[ids]
+    draw_list.submit_many(world.layer[ids], position[:, 1] + size[:, 1], world.sprite[ids],
+                          position, size)
+
+
+def entity_rect(world, eid, rect=None):
+    """Rellena (o crea) un pygame.Rect con la posición entera de la entidad"""
+    x, y = world.position[eid]
+    w, h = world.size[eid]
+    if rect is None:
+        return pygame.Rect(round(x), round(y), int(w), int(h))
+    rect.update(round(x), round(y), int(w), int(h))
+    return rect
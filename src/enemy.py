@@ -1,17 +1,190 @@
 import pygame
-from settings import RED
+from settings import RED, FPS, HEIGHT, ENEMY_SPEED, TILE_SIZE
+from sprite_manager import sprite_manager
+from kinematics import Body, move_bodies
+from ecs import AI_NONE, AI_CHASE, AI_PATH, ai_system
+from connectivity import NO_COMPONENT
+import numpy as np
 
 class Enemy:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, 40, 40)
-        self.speed = 3
+    def __init__(self, x, y, tilemap=None):
+        self.tilemap = tilemap
+        self.target = None
+        self.sees_target = False
+        self.path = None
+        self._planner = None  # AIPlanner al que se pidió el último camino
+        self.sprite = sprite_manager.get_sprite('enemy')
+        world = tilemap.world if tilemap else None
+        self.body = Body(x, y, 25, 25, ENEMY_SPEED, world)
+        if self.sprite:
+            self.body.world.sprite[self.body.eid] = self.body.world.register_sprite('enemy', self.sprite)
 
-    def update(self):
-        # Movimiento básico de prueba
-        self.rect.y += self.speed
-        if self.rect.y > 600:
-            self.rect.y = -40
+    @property
+    def rect(self):
+        return self.body.rect
 
-    def draw(self, screen):
-        pygame.draw.rect(screen, RED, self.rect)
+    def spawn(self, x, y):
+        """Reaparece en (x, y) sin objetivo ni camino (al reutilizarlo desde un pool)"""
+        self.cancel_path_request()
+        self.body.respawn(x, y)
+        self.target = None
+        self.sees_target = False
+        self.path = None
+
+    def despawn(self):
+        """Sale del World hasta el siguiente spawn"""
+        self.cancel_path_request()
+        self.body.despawn()
+
+    def cancel_path_request(self):
+        """Descarta el camino pedido que aún no ha llegado (era para la vida anterior)"""
+        if self._planner is not None:
+            self._planner.cancel(self)
+            self._planner = None
+
+    def set_target(self, target):
+        """Fija la entidad a perseguir (necesita un atributo body)"""
+        self.target = target
+        world = self.body.world
+        if target is not None and target.body.world is world:
+            # Mismo World: la persecución la resuelve ai_system en bloque
+            world.ai_state[self.body.eid] = AI_CHASE
+            world.ai_target[self.body.eid] = target.body.eid
+
+    def clear_target(self):
+        """Deja de perseguir: sin objetivo, sin camino y quieto"""
+        self.target = None
+        self.sees_target = False
+        self.path = None
+        world = self.body.world
+        world.ai_state[self.body.eid] = AI_NONE
+        world.ai_target[self.body.eid] = -1
+        self.body.set_direction(0, 0)
+
+    def update_awareness(self, visibility):
+        """Comprueba si hay línea de visión hasta el objetivo"""
+        self.sees_target = (self.target is not None and
+                            visibility.can_see(self.rect, self.target.rect))
+        return self.sees_target
+
+    def cell(self):
+        """Celda (fila, col) bajo el centro del enemigo"""
+        x, y = self.body.center()
+        return (int(y // TILE_SIZE), int(x // TILE_SIZE))
+
+    def target_cell(self):
+        """Celda (fila, col) bajo el centro del objetivo"""
+        target_x, target_y = self.target.body.center()
+        return (int(target_y // TILE_SIZE), int(target_x // TILE_SIZE))
+
+    def can_reach_target(self):
+        """¿Hay camino hasta el objetivo? (índice de conectividad del mapa, O(1))"""
+        if self.target is None:
+            return False
+        if self.tilemap is None:
+            return True
+        # Una celda bloqueada (p. ej. medio tapada por un jeep) no descarta nada
+        connectivity = self.tilemap.connectivity
+        own = connectivity.component(self.cell())
+        goal = connectivity.component(self.target_cell())
+        return own == NO_COMPONENT or goal == NO_COMPONENT or own == goal
+
+    def plan_path(self, pathfinder):
+        """Calcula en el momento un camino hasta la celda del objetivo"""
+        if not self.can_reach_target():
+            self.path = None
+            return None
+        self.path = pathfinder.find_path(self.cell(), self.target_cell())
+        return self.path
+
+    def request_path(self, planner):
+        """Pide el camino al AIPlanner; llega en un tick posterior vía set_path"""
+        if self.can_reach_target():
+            self._planner = planner
+            planner.request_path(self, self.cell(), self.target_cell(), self.set_path)
 
+    def set_path(self, path):
+        """Recibe un camino calculado en segundo plano"""
+        self.path = path
+
+    def follow_field(self, field, flee=False):
+        """Da un paso de descenso (o ascenso si huye) por un DistanceField.
+
+        Devuelve False si no hay vecino mejor que la celda actual.
+        """
+        cell = self.cell()
+        next_cell = field.uphill(cell) if flee else field.downhill(cell)
+        if next_cell is None:
+            return False
+        self.body.world.ai_state[self.body.eid] = AI_PATH
+        center_x, center_y = self.body.center()
+        self.body.set_direction((next_cell[1] + 0.5) * TILE_SIZE - center_x,
+                                (next_cell[0] + 0.5) * TILE_SIZE - center_y)
+        return True
+
+    def steer(self, field=None):
+        """Persigue directo si ve al objetivo; si no, sigue el camino planificado.
+
+        Mientras no hay camino se baja por el campo de distancias del
+        objetivo si se pasa uno (field).
+        """
+        world = self.body.world
+        if self.target is None or self.target.body.world is not world:
+            return
+        if not self.sees_target and not self.can_reach_target():
+            # Objetivo inalcanzable: se espera quieto en vez de empujar contra las paredes
+            world.ai_state[self.body.eid] = AI_PATH
+            self.body.set_direction(0, 0)
+            return
+        if self.sees_target or self.path is None or self.path.is_finished():
+            if self.sees_target or field is None or not self.follow_field(field):
+                world.ai_state[self.body.eid] = AI_CHASE
+            return
+
+        world.ai_state[self.body.eid] = AI_PATH
+        next_cell = self.path.peek(1)
+        center_x, center_y = self.body.center()
+        goal_x = (next_cell[1] + 0.5) * TILE_SIZE
+        goal_y = (next_cell[0] + 0.5) * TILE_SIZE
+        if abs(goal_x - center_x) < 3 and abs(goal_y - center_y) < 3:
+            self.path.advance()
+            next_cell = self.path.peek(1)
+            if next_cell is None:
+                world.ai_state[self.body.eid] = AI_CHASE
+                return
+            goal_x = (next_cell[1] + 0.5) * TILE_SIZE
+            goal_y = (next_cell[0] + 0.5) * TILE_SIZE
+        self.body.set_direction(goal_x - center_x, goal_y - center_y)
+
+    def think(self):
+        """Decide la dirección: directo hacia el objetivo"""
+        if self.target is None:
+            self.body.set_direction(0, 1)
+        elif self.body.world.ai_state[self.body.eid] == AI_CHASE:
+            ai_system(self.body.world, np.array([self.body.eid]))
+        else:
+            target_x, target_y = self.target.body.center()
+            own_x, own_y = self.body.center()
+            self.body.set_direction(target_x - own_x, target_y - own_y)
+
+    def update(self, dt=1 / FPS):
+        """Actualización individual (el juego mueve todos los cuerpos a la vez con move_bodies)"""
+        self.think()
+        if self.tilemap:
+            move_bodies([self.body], self.tilemap, dt)
+        else:
+            # Movimiento básico de prueba sin mapa
+            new_y = self.body.y + self.body.dir_y * self.body.speed * dt
+            if new_y > HEIGHT:
+                new_y = -self.body.height
+            self.body.set_position(self.body.x + self.body.dir_x * self.body.speed * dt, new_y)
+
+    def check_collision_with_player(self, player_rect):
+        """Verifica si el enemigo alcanzó al jugador"""
+        return self.rect.colliderect(player_rect)
+
+    def draw(self, screen):
+        if self.sprite:
+            screen.blit(self.sprite, self.rect)
+        else:
+            pygame.draw.rect(screen, RED, self.rect)
@@ -0,0 +1,246 @@
+import numpy as np
+from settings import FPS, ENEMY_REPLAN_INTERVAL
+from tilemap import TileMap
+from player import Player
+from enemy import Enemy
+from visibility import VisibilityMap
+from pathfinding import HierarchicalPathfinder
+from ecs import ai_system, movement_system
+
+# Acciones discretas: quieto y 8 direcciones
+ACTIONS = np.array([
+    (0, 0),
+    (0, -1), (1, -1), (1, 0), (1, 1),
+    (0, 1), (-1, 1), (-1, 0), (-1, -1),
+], dtype=np.float64)
+
+# Canal 1 de la observación: qué hay en cada celda
+OBS_EMPTY = 0
+OBS_ENEMY = 1
+OBS_JEEP = 2
+
+# Id de tile para lo que queda fuera del mapa
+OUT_OF_MAP = 255
+
+REWARD_ALIVE = 1.0 / FPS  # Un punto por segundo sobrevivido
+REWARD_CAUGHT = -1.0
+
+# Distancia mínima (píxeles) entre jugador y enemigo al aparecer
+MIN_SPAWN_DISTANCE = 150
+
+
+class VectorEscapeEnv:
+    """Varias partidas de huida simuladas a la vez sobre un mismo mapa.
+
+    Todas comparten TileMap y World: los jugadores y enemigos de cada
+    partida son filas del mismo ECS, así ai_system y movement_system mueven
+    todas las partidas con una sola llamada. Las reglas son las de
+    SimpleGame: el episodio termina si el enemigo alcanza al jugador o el
+    jugador toca un jeep.
+
+    La observación de cada partida es un recorte egocéntrico de
+    (2, 2R+1, 2R+1) centrado en el jugador: canal 0 con los ids de tile
+    (TileMap.tile_ids) y canal 1 con enemigo y jeeps. observation(i)
+    devuelve una vista sin copia de la rejilla interna, válida hasta el
+    siguiente step(); step() y reset() devuelven el lote (N, 2, D, D).
+    """
+
+    def __init__(self, num_envs=8, view_radius=5, max_steps=1800, dt=1 / FPS,
+                 seed=None, generator=None, autoreset=True):
+        self.num_envs = num_envs
+        self.view_radius = view_radius
+        self.view_size = 2 * view_radius + 1
+        self.max_steps = max_steps
+        self.dt = dt
+        self.autoreset = autoreset
+        self.rng = np.random.default_rng(seed)
+
+        self.tilemap = TileMap(generator=generator)
+        self.world = self.tilemap.world
+        self.visibility = VisibilityMap(self.tilemap)
+        self.pathfinder = HierarchicalPathfinder.from_tilemap(self.tilemap)
+        self.players = [Player(0, 0, self.tilemap) for _ in range(num_envs)]
+        self.enemies = [Enemy(0, 0, self.tilemap) for _ in range(num_envs)]
+        for player, enemy in zip(self.players, self.enemies):
+            enemy.set_target(player)
+        self.player_ids = np.array([player.body.eid for player in self.players], dtype=np.int64)
+        self.enemy_ids = np.array([enemy.body.eid for enemy in self.enemies], dtype=np.int64)
+        self.jeep_ids = np.array([jeep.eid for jeep in self.tilemap.jeeps], dtype=np.int64)
+
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.replan_timers = np.zeros(num_envs)
+
+        # Rejilla con borde de R celdas: así cualquier recorte es un slice (una vista)
+        rows, cols = self.tilemap.tile_ids.shape
+        r = view_radius
+        self.grid = np.zeros((num_envs, 2, rows + 2 * r, cols + 2 * r), dtype=np.uint8)
+        self.grid[:, 0] = OUT_OF_MAP
+        self.grid[:, 0, r:r + rows, r:r + cols] = self.tilemap.tile_ids
+        self._jeep_layer = np.zeros((rows + 2 * r, cols + 2 * r), dtype=np.uint8)
+        for row, col in self.tilemap.jeep_cells():
+            self._jeep_layer[row + r, col + r] = OBS_JEEP
+        self.grid[:, 1] = self._jeep_layer
+        self._windows = np.lib.stride_tricks.sliding_window_view(
+            self.grid, (self.view_size, self.view_size), axis=(2, 3))
+        self._enemy_cells = np.zeros((num_envs, 2), dtype=np.int64)
+        self._player_cells = np.zeros((num_envs, 2), dtype=np.int64)
+        self.tilemap.add_change_listener(self._on_tiles_changed)
+
+        # Celdas donde se puede aparecer: la zona caminable más grande (sin jeeps),
+        # así jugador y enemigo siempre están conectados
+        connectivity = self.tilemap.connectivity
+        self._spawn_cells = connectivity.cells_of(connectivity.largest_component())
+
+    def _on_tiles_changed(self, cells):
+        r = self.view_radius
+        for row, col in cells:
+            self.grid[:, 0, row + r, col + r] = self.tilemap.tile_ids[row, col]
+
+    # --- API ---
+
+    def reset(self, seed=None):
+        """Reinicia todas las partidas; devuelve (observaciones, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        for index in range(self.num_envs):
+            self._reset_env(index)
+        self._update_cells()
+        return self.observations(), {}
+
+    def step(self, actions):
+        """Avanza un tick todas las partidas.
+
+        Devuelve (observaciones, recompensas, terminadas, truncadas, info).
+        Con autoreset las partidas acabadas se reinician en el mismo paso;
+        info['cause'] dice por qué terminó cada una ('', 'enemy', 'jeep').
+        """
+        world = self.world
+        directions = ACTIONS[np.asarray(actions, dtype=np.int64)]
+        length = np.hypot(directions[:, 0], directions[:, 1])
+        moving = length > 0
+        directions[moving] /= length[moving, None]
+        world.direction[self.player_ids] = directions
+
+        # Enemigos: persecución directa con visión, si no camino planificado
+        self.visibility.begin_frame()
+        self.replan_timers -= self.dt
+        for index, enemy in enumerate(self.enemies):
+            if not enemy.update_awareness(self.visibility) and self.replan_timers[index] <= 0:
+                enemy.plan_path(self.pathfinder)
+                self.replan_timers[index] = ENEMY_REPLAN_INTERVAL
+            enemy.steer()
+        ai_system(world, self.enemy_ids)
+        movement_system(world, self.tilemap, self.dt, np.concatenate((self.player_ids, self.enemy_ids)))
+        self.steps += 1
+
+        caught = self._overlaps(self.player_ids, self.enemy_ids)
+        crashed = self._jeep_hits()
+        terminated = caught | crashed
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        rewards = np.where(terminated, REWARD_CAUGHT, REWARD_ALIVE)
+        cause = np.where(caught, 'enemy', np.where(crashed, 'jeep', ''))
+
+        if self.autoreset:
+            for index in np.flatnonzero(terminated | truncated).tolist():
+                self._reset_env(index)
+        self._update_cells()
+        return self.observations(), rewards, terminated, truncated, {'cause': cause}
+
+    def observation(self, index):
+        """Vista sin copia (2, D, D) del recorte de la partida index"""
+        row, col = self._player_cells[index]
+        return self.grid[index, :, row:row + self.view_size, col:col + self.view_size]
+
+    def observations(self):
+        """Lote (N, 2, D, D) con los recortes de todas las partidas (un solo gather)"""
+        return self._windows[np.arange(self.num_envs), :,
+                             self._player_cells[:, 0], self._player_cells[:, 1]]
+
+    def close(self):
+        pass
+
+    # --- Internos ---
+
+    def _reset_env(self, index):
+        cells = self._spawn_cells
+        size = self.tilemap.tile_size
+        player_cell = cells[self.rng.integers(len(cells))]
+        distances = np.hypot(*(cells - player_cell).T) * size
+        far = cells[distances >= MIN_SPAWN_DISTANCE]
+        enemy_cell = far[self.rng.integers(len(far))] if len(far) else cells[self.rng.integers(len(cells))]
+
+        world = self.world
+        player_id = self.player_ids[index]
+        enemy_id = self.enemy_ids[index]
+        world.position[player_id] = (player_cell[1] * size + 1, player_cell[0] * size + 1)
+        world.position[enemy_id] = (enemy_cell[1] * size + 1, enemy_cell[0] * size + 1)
+        world.direction[[player_id, enemy_id]] = 0.0
+        world.motion[[player_id, enemy_id]] = 0.0
+        self.enemies[index].path = None
+        self.replan_timers[index] = 0.0
+        self.steps[index] = 0
+
+    def _update_cells(self):
+        """Recalcula la celda de jugador y enemigo y mueve la marca del enemigo"""
+        size = self.tilemap.tile_size
+        rows, cols = self.tilemap.tile_ids.shape
+        r = self.view_radius
+        world = self.world
+        for cells, ids in ((self._player_cells, self.player_ids), (self._enemy_cells, self.enemy_ids)):
+            centers = world.position[ids] + world.size[ids] / 2
+            cells[:, 0] = np.clip(centers[:, 1] // size, 0, rows - 1)
+            cells[:, 1] = np.clip(centers[:, 0] // size, 0, cols - 1)
+
+        # La rejilla tiene borde r: la celda (f, c) del mapa está en (f + r, c + r)
+        envs = np.arange(self.num_envs)
+        layer = self.grid[:, 1]
+        layer[...] = self._jeep_layer
+        layer[envs, self._enemy_cells[:, 0] + r, self._enemy_cells[:, 1] + r] = OBS_ENEMY
+
+    def _overlaps(self, ids_a, ids_b):
+        """Solape por parejas (mismo criterio que pygame.Rect.colliderect)"""
+        world = self.world
+        pos_a = np.round(world.position[ids_a])
+        pos_b = np.round(world.position[ids_b])
+        size_a = world.size[ids_a]
+        size_b = world.size[ids_b]
+        return ((pos_a < pos_b + size_b) & (pos_b < pos_a + size_a)).all(axis=1)
+
+    def _jeep_hits(self):
+        """Jugadores que tocan un jeep: rects de todos contra todos y máscaras solo en los candidatos"""
+        hits = np.zeros(self.num_envs, dtype=bool)
+        if len(self.jeep_ids) == 0:
+            return hits
+        world = self.world
+        players = np.round(world.position[self.player_ids])[:, None, :]
+        jeeps = np.round(world.position[self.jeep_ids])[None, :, :]
+        candidates = ((players < jeeps + world.size[self.jeep_ids][None]) &
+                      (jeeps < players + world.size[self.player_ids][:, None])).all(axis=2).any(axis=1)
+        for index in np.flatnonzero(candidates).tolist():
+            hits[index] = self.players[index].check_jeep_collision() is not None
+        return hits
+
+
+class EscapeEnv:
+    """Una sola partida con la interfaz reset/step clásica.
+
+    La observación es la vista sin copia de VectorEscapeEnv.observation:
+    si se quiere guardar entre pasos hay que copiarla.
+    """
+
+    def __init__(self, view_radius=5, max_steps=1800, dt=1 / FPS, seed=None, generator=None):
+        self.env = VectorEscapeEnv(1, view_radius, max_steps, dt, seed, generator, autoreset=False)
+        self.action_count = len(ACTIONS)
+        self.observation_shape = (2, self.env.view_size, self.env.view_size)
+
+    def reset(self, seed=None):
+        self.env.reset(seed)
+        return self.env.observation(0), {}
+
+    def step(self, action):
+        _, rewards, terminated, truncated, info = self.env.step([action])
+        return (self.env.observation(0), float(rewards[0]), bool(terminated[0]),
+                bool(truncated[0]), {'cause': str(info['cause'][0])})
+
+    def close(self):
+        self.env.close()
@@ -1,27 +1,38 @@
 import pygame, sys
-from settings import WIDTH, HEIGHT, FPS, TITLE, BLACK
+from settings import WIDTH, HEIGHT, FPS, TITLE, BLACK, MAX_FRAME_TIME
 from player import Player
 from enemy import Enemy 
+from sprite_manager import sprite_manager
+from startup_profiler import startup_profiler
 
 
 class Game:
     def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(TITLE)
+        with startup_profiler.phase("display init"):
+            pygame.init()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
         self.running = True
+        self.dt = 1 / FPS
 
         # Entidades
+        with startup_profiler.phase("sprite load"):
+            sprite_manager.ensure_loaded()
         self.player = Player(WIDTH//2, HEIGHT//2)
         self.enemy = Enemy(200,-40) 
 
     def run(self):
+        first_frame = True
         while self.running:
             self.events()
             self.update()
             self.draw()
-            self.clock.tick(FPS)
+            if first_frame:
+                first_frame = False
+                startup_profiler.mark("first frame")
+                startup_profiler.report()
+            self.dt = min(self.clock.tick(FPS) / 1000, MAX_FRAME_TIME)
 
     def events(self):
         for event in pygame.event.get():
@@ -31,8 +42,8 @@ class Game:
                 sys.exit()
 
     def update(self):
-        self.player.update()
-        self.enemy.update()
+        self.player.update(self.dt)
+        self.enemy.update(self.dt)
 
     def draw(self):
         self.screen.fill(BLACK)
@@ -0,0 +1,115 @@
+import os
+import time
+from settings import HOT_RELOAD_INTERVAL
+from sprite_manager import sprite_manager, KENNEY_TILES_PATH, KENNEY_TILE_FILES
+from tiled_map import load_tmj
+from tilemap import TILE_PROPERTIES
+
+
+class FileWatcher:
+    """Vigila archivos comprobando su fecha de modificación y tamaño (solo stdlib).
+
+    No usa hilos ni APIs del sistema: poll() se llama cada frame y solo
+    hace os.stat de los archivos vigilados cada 'interval' segundos.
+    """
+
+    def __init__(self, interval=HOT_RELOAD_INTERVAL):
+        self.interval = interval
+        self.watched = {}  # ruta -> [firma, callbacks]
+        self._next_check = 0.0
+
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def watch(self, path, callback):
+        """Llama a callback(ruta) cada vez que el archivo cambie (o aparezca)"""
+        path = os.path.abspath(path)
+        entry = self.watched.setdefault(path, [self._signature(path), []])
+        entry[1].append(callback)
+
+    def unwatch(self, path):
+        self.watched.pop(os.path.abspath(path), None)
+
+    def poll(self, now=None):
+        """Comprueba los archivos si toca; devuelve las rutas que han cambiado"""
+        now = time.monotonic() if now is None else now
+        if now < self._next_check:
+            return []
+        self._next_check = now + self.interval
+        changed = []
+        for path, entry in list(self.watched.items()):
+            signature = self._signature(path)
+            if signature == entry[0]:
+                continue
+            entry[0] = signature
+            # Un archivo borrado (o a medio guardar) se ignora hasta que vuelva
+            if signature is None:
+                continue
+            changed.append(path)
+            for callback in entry[1]:
+                callback(path)
+        return changed
+
+
+class HotReloader:
+    """Recarga en caliente los tiles de Kenney y el mapa .tmj de un TileMap.
+
+    Un PNG cambiado se sustituye con sprite_manager.reload_sprite: la capa
+    estática repinta solo sus celdas y el atlas de GPU sube solo su región.
+    Un .tmj cambiado se aplica con TileMap.apply_map_data, que toca solo
+    las celdas distintas (rejillas, conectividad, pathfinding y capa
+    estática se actualizan por notify_change). Si el mapa cambia de tamaño
+    se llama a on_map_resized(ruta) para que el juego cree otro TileMap.
+    """
+
+    def __init__(self, tilemap=None, on_map_resized=None, interval=HOT_RELOAD_INTERVAL):
+        self.watcher = FileWatcher(interval)
+        self.tilemap = None
+        self.on_map_resized = on_map_resized
+        self.reloads = 0
+        sprite_files = {}
+        for name, filename in KENNEY_TILE_FILES.items():
+            sprite_files.setdefault(os.path.join(KENNEY_TILES_PATH, filename), []).append(name)
+        self._sprite_names = {os.path.abspath(path): names for path, names in sprite_files.items()}
+        for path in self._sprite_names:
+            self.watcher.watch(path, self._on_sprite_file)
+        if tilemap is not None:
+            self.set_tilemap(tilemap)
+
+    def set_tilemap(self, tilemap):
+        """Cambia el mapa vigilado (p. ej. tras reconstruir el TileMap)"""
+        if self.tilemap is not None and self.tilemap.map_path:
+            self.watcher.unwatch(self.tilemap.map_path)
+        self.tilemap = tilemap
+        if tilemap.map_path:
+            self.watcher.watch(tilemap.map_path, self._on_map_file)
+
+    def poll(self):
+        return self.watcher.poll()
+
+    def _on_sprite_file(self, path):
+        for name in self._sprite_names.get(path, ()):
+            if sprite_manager.reload_sprite(name, path) is not None:
+                self.reloads += 1
+                print(f"♻️  Sprite recargado: {name}")
+
+    def _on_map_file(self, path):
+        try:
+            map_data, jeep_positions = load_tmj(path, TILE_PROPERTIES)
+        except (ValueError, KeyError, OSError) as e:
+            # Lo normal es pillar el archivo a medio guardar: se reintenta en el siguiente cambio
+            print(f"⚠️  No se pudo recargar el mapa '{path}': {e}")
+            return
+        changed = self.tilemap.apply_map_data(map_data, jeep_positions)
+        self.reloads += 1
+        if changed is None:
+            print(f"♻️  El mapa {os.path.basename(path)} ha cambiado de tamaño")
+            if self.on_map_resized:
+                self.on_map_resized(path)
+        else:
+            print(f"♻️  Mapa recargado: {len(changed)} celdas cambiadas")
@@ -1,14 +1,37 @@
 import pygame
 from settings import TILE_SIZE
 from sprite_manager import sprite_manager
+from ecs import World, COLLIDER_DAMAGE, entity_rect
 
 class Jeep:
     """Clase para el Jeep que actúa como obstáculo de daño"""
     
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, TILE_SIZE * 2, TILE_SIZE)  # Jeep de 2x1 tiles
+    def __init__(self, x, y, world=None):
         self.type = "damage"
-        self.sprite = self.create_jeep_sprite()
+        # El sprite se crea una vez y lo comparten todos los jeeps
+        self.sprite = sprite_manager.get_sprite('jeep')
+        if self.sprite is None:
+            self.sprite = sprite_manager.add_sprite('jeep', self.create_jeep_sprite())
+        # Jeep de 2x1 tiles, estático y registrado como colisionador de daño
+        self.world = world if world is not None else World(capacity=1)
+        sprite_id = self.world.register_sprite('jeep', self.sprite)
+        self.eid = self.world.create_entity(x, y, TILE_SIZE * 2, TILE_SIZE,
+                                            sprite=sprite_id, collider=COLLIDER_DAMAGE)
+        self._rect = pygame.Rect(x, y, TILE_SIZE * 2, TILE_SIZE)
+    
+    @property
+    def rect(self):
+        return entity_rect(self.world, self.eid, self._rect)
+
+    def spawn(self, x, y):
+        """Vuelve al World en (x, y) (al reutilizarlo desde un pool)"""
+        sprite_id = self.world.register_sprite('jeep', self.sprite)
+        self.eid = self.world.create_entity(x, y, TILE_SIZE * 2, TILE_SIZE,
+                                            sprite=sprite_id, collider=COLLIDER_DAMAGE)
+
+    def despawn(self):
+        """Sale del World hasta el siguiente spawn"""
+        self.world.destroy_entity(self.eid)
         
     def create_jeep_sprite(self):
         """Crea el sprite del jeep"""
@@ -42,9 +65,21 @@ class Jeep:
             # Fallback
             pygame.draw.rect(screen, (85, 107, 47), self.rect)
     
-    def check_collision(self, other_rect):
-        """Verifica colisión con otro rectángulo"""
-        return self.rect.colliderect(other_rect)
+    def check_collision(self, other_rect, other_mask=None):
+        """Verifica colisión con otro rectángulo.
+        
+        Primero la prueba barata de rects; solo si se solapan se comparan las
+        máscaras, así las zonas transparentes del sprite no cuentan. La
+        máscara se pide cada vez al sprite_manager (la tiene cacheada) para
+        que siga al sprite si se recarga en caliente.
+        """
+        rect = self.rect
+        if not rect.colliderect(other_rect):
+            return False
+        if other_mask is None:
+            other_mask = sprite_manager.get_rect_mask(other_rect.size)
+        offset = (other_rect.x - rect.x, other_rect.y - rect.y)
+        return sprite_manager.get_mask('jeep').overlap(other_mask, offset) is not None
     
     def get_position(self):
         """Obtiene la posición del jeep"""
@@ -0,0 +1,98 @@
+import numpy as np
+import pygame
+from ecs import World, COLLIDER_SOLID, movement_system, entity_rect
+
+
+class Body:
+    """Componente cinemático compartido por jugador y enemigo.
+
+    Es una fachada sobre una fila del World: la posición en coma flotante
+    (sub-píxel), la dirección y la velocidad viven en los arrays del ECS y
+    rect devuelve un pygame.Rect entero sincronizado al leerlo.
+    """
+
+    __slots__ = ('world', 'eid', '_rect', '_spawn_data')
+
+    def __init__(self, x, y, width, height, speed, world=None, sprite=-1, collider=COLLIDER_SOLID):
+        self.world = world if world is not None else World(capacity=4)
+        self.eid = self.world.create_entity(x, y, width, height, speed, sprite, collider)
+        self._rect = pygame.Rect(int(x), int(y), width, height)
+        self._spawn_data = None
+
+    @property
+    def x(self):
+        return float(self.world.position[self.eid, 0])
+
+    @property
+    def y(self):
+        return float(self.world.position[self.eid, 1])
+
+    @property
+    def width(self):
+        return int(self.world.size[self.eid, 0])
+
+    @property
+    def height(self):
+        return int(self.world.size[self.eid, 1])
+
+    @property
+    def speed(self):
+        return float(self.world.speed[self.eid])
+
+    @property
+    def dir_x(self):
+        return float(self.world.direction[self.eid, 0])
+
+    @property
+    def dir_y(self):
+        return float(self.world.direction[self.eid, 1])
+
+    @property
+    def rect(self):
+        """Rect entero con la posición actual (se reutiliza el mismo objeto)"""
+        return entity_rect(self.world, self.eid, self._rect)
+
+    def set_position(self, x, y):
+        """Coloca el cuerpo en una posición absoluta"""
+        self.world.position[self.eid] = (x, y)
+
+    def despawn(self):
+        """Saca la entidad del World; el cuerpo puede volver con respawn (pools)"""
+        world = self.world
+        eid = self.eid
+        self._spawn_data = (float(world.size[eid, 0]), float(world.size[eid, 1]), float(world.speed[eid]),
+                            int(world.sprite[eid]), int(world.collider[eid]))
+        world.destroy_entity(eid)
+
+    def respawn(self, x, y):
+        """Vuelve a crear la entidad en (x, y) con el tamaño, velocidad y sprite de antes"""
+        width, height, speed, sprite, collider = self._spawn_data
+        self.eid = self.world.create_entity(x, y, width, height, speed, sprite, collider)
+        self._spawn_data = None
+
+    def set_direction(self, dx, dy):
+        """Fija la dirección de movimiento (se normaliza para no ir más rápido en diagonal)"""
+        length = (dx * dx + dy * dy) ** 0.5
+        if length > 0:
+            self.world.direction[self.eid] = (dx / length, dy / length)
+        else:
+            self.world.direction[self.eid] = (0.0, 0.0)
+
+    def center(self):
+        """Centro del cuerpo en coordenadas de píxel"""
+        x, y = self.world.position[self.eid]
+        w, h = self.world.size[self.eid]
+        return (float(x + w / 2), float(y + h / 2))
+
+
+def move_bodies(bodies, tilemap, dt):
+    """Actualiza todos los cuerpos en una sola pasada.
+
+    Agrupa los cuerpos por World y delega en ecs.movement_system, que aplica
+    dt, el speed_modifier del terreno y la colisión por ejes en bloque.
+    """
+    by_world = {}
+    for body in bodies:
+        by_world.setdefault(id(body.world), (body.world, []))[1].append(body.eid)
+    for world, ids in by_world.values():
+        movement_system(world, tilemap, dt, np.array(ids, dtype=np.int64))
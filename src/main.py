@@ -1,4 +1,7 @@
+# Primero el perfilador (python main.py --trace-startup): su reloj empieza antes de importar pygame
+from startup_profiler import startup_profiler
 from game import Game
+startup_profiler.mark("imports")
 
 if __name__ == "__main__":
     juego = Game()
@@ -0,0 +1,145 @@
+import numpy as np
+import pygame
+from settings import MINIMAP_SIZE
+from sprite_manager import sprite_manager, FALLBACK_COLORS
+from tilemap import TILE_PALETTE
+
+# Color de los tiles sin sprite ni color de respaldo
+MISSING_COLOR = (255, 0, 255)
+
+# Colores de los puntos de las entidades
+PLAYER_DOT_COLOR = (255, 255, 255)
+ENEMY_DOT_COLOR = (255, 40, 40)
+JEEP_DOT_COLOR = (255, 220, 0)
+JEEP_DOT_MAX_SIZE = 4  # Lado máximo en píxeles del punto de un jeep
+
+BORDER_COLOR = (255, 255, 255)
+
+
+def tile_color(tile_type):
+    """Color medio de un tipo de tile: el de su sprite o, si no hay, el de respaldo"""
+    sprite = sprite_manager.get_sprite(tile_type)
+    if sprite is not None:
+        return tuple(pygame.transform.average_color(sprite))[:3]
+    return FALLBACK_COLORS.get(tile_type, MISSING_COLOR)
+
+
+class Minimap:
+    """Minimapa de un TileMap con un píxel por tile.
+
+    La imagen se monta de una vez pasando tile_ids por una tabla de colores
+    (un color medio por id de paleta) con pygame.surfarray y se escala una
+    sola vez al tamaño final por vecino más próximo (índices precalculados
+    de columna y fila). Las ediciones del mapa llegan por notify_change y
+    solo repintan los píxeles de esas celdas; cada frame se copia la imagen
+    escalada y se dibujan encima los puntos de las entidades. Solo se rehace
+    entera si cambian los sprites o el tamaño del mapa.
+    """
+
+    def __init__(self, tilemap, max_size=MINIMAP_SIZE):
+        self.tilemap = tilemap
+        self.max_size = max_size
+        self.colors = None      # Color por id de paleta, array (n, 3) uint8
+        self.base = None        # Un píxel por tile
+        self.scaled = None      # base escalada, se mantiene al día celda a celda
+        self.frame = None       # scaled con los puntos de este frame
+        self.scale = 1.0
+        self._cols = None       # Columna de tile que muestra cada columna de píxeles
+        self._rows = None       # Ídem para las filas
+        self._version = None
+        tilemap.add_change_listener(self._on_tiles_changed)
+        sprite_manager.add_sprite_listener(self._on_sprites_changed)
+
+    def rebuild(self):
+        """Monta la imagen entera (al crearlo o si cambian los sprites o el tamaño)"""
+        self.colors = np.array([tile_color(tile_type) for tile_type in TILE_PALETTE], dtype=np.uint8)
+        tile_ids = self.tilemap.tile_ids
+        rows, cols = tile_ids.shape
+        # Escala entera si cabe (píxeles nítidos); si no, se reduce
+        scale = min(self.max_size[0] / cols, self.max_size[1] / rows)
+        self.scale = float(int(scale)) if scale >= 1 else scale
+        size = (max(1, round(cols * self.scale)), max(1, round(rows * self.scale)))
+        self._cols = np.minimum((np.arange(size[0]) / self.scale).astype(np.int64), cols - 1)
+        self._rows = np.minimum((np.arange(size[1]) / self.scale).astype(np.int64), rows - 1)
+        pixels = self.colors[tile_ids].transpose(1, 0, 2)
+        if self.base is None or self.base.get_size() != (cols, rows):
+            self.base = pygame.Surface((cols, rows))
+        pygame.surfarray.blit_array(self.base, pixels)
+        if self.scaled is None or self.scaled.get_size() != size:
+            self.scaled = pygame.Surface(size)
+            self.frame = pygame.Surface(size)
+        pygame.surfarray.blit_array(self.scaled, pixels[self._cols][:, self._rows])
+        self._version = sprite_manager.version
+
+    def _cell_rect(self, row, col):
+        """Píxeles de la imagen escalada que muestran la celda (ancho 0 si al reducir no sale)"""
+        x = int(np.searchsorted(self._cols, col))
+        y = int(np.searchsorted(self._rows, row))
+        return (x, y, int(np.searchsorted(self._cols, col, 'right')) - x,
+                int(np.searchsorted(self._rows, row, 'right')) - y)
+
+    def _on_tiles_changed(self, cells):
+        if self.scaled is None or self._version is None:
+            return
+        tile_ids = self.tilemap.tile_ids
+        ids = [int(tile_ids[row, col]) for row, col in cells]
+        if max(ids, default=0) >= len(self.colors):
+            # Tile nuevo en la paleta: aún no tiene color
+            self._version = None
+            return
+        for (row, col), index in zip(cells, ids):
+            color = self.colors[index]
+            self.base.set_at((col, row), color)
+            rect = self._cell_rect(row, col)
+            if rect[2] and rect[3]:
+                self.scaled.fill(color, rect)
+
+    def _on_sprites_changed(self, names):
+        """Un sprite recargado cambia el color medio de su tile: se rehace en el próximo dibujo"""
+        if any(name in TILE_PALETTE for name in names):
+            self._version = None
+
+    def to_minimap(self, x, y):
+        """Punto del mundo en píxeles -> punto del minimapa"""
+        factor = self.scale / self.tilemap.tile_size
+        return (int(x * factor), int(y * factor))
+
+    def _dot(self, x, y, color, radius=2):
+        mx, my = self.to_minimap(x, y)
+        self.frame.fill(color, (mx - radius, my - radius, 2 * radius, 2 * radius))
+
+    def _jeep_dots(self):
+        """Puntos de todos los jeeps escritos en bloque en el array de la superficie.
+
+        Los mapas grandes tienen cientos de jeeps: un fill por jeep costaría
+        más que todo el resto del minimapa.
+        """
+        jeeps = self.tilemap.jeeps
+        if not jeeps:
+            return
+        world = self.tilemap.world
+        ids = np.fromiter((jeep.eid for jeep in jeeps), dtype=np.int64, count=len(jeeps))
+        centers = (world.position[ids] + world.size[ids] / 2) * (self.scale / self.tilemap.tile_size)
+        width, height = self.frame.get_size()
+        size = min(JEEP_DOT_MAX_SIZE, max(1, int(self.scale)))
+        xs = centers[:, 0].astype(np.int64) - size // 2
+        ys = centers[:, 1].astype(np.int64) - size // 2
+        pixels = pygame.surfarray.pixels3d(self.frame)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[np.clip(xs + dx, 0, width - 1), np.clip(ys + dy, 0, height - 1)] = JEEP_DOT_COLOR
+        del pixels  # Suelta el bloqueo de la superficie
+
+    def render(self, player=None, enemy=None):
+        """Superficie del minimapa de este frame con los jeeps y, si se pasan, jugador y enemigo"""
+        if (self._version != sprite_manager.version or self.scaled is None or
+                self.base.get_size() != self.tilemap.tile_ids.shape[::-1]):
+            self.rebuild()
+        self.frame.blit(self.scaled, (0, 0))
+        self._jeep_dots()
+        if enemy is not None:
+            self._dot(*enemy.rect.center, ENEMY_DOT_COLOR)
+        if player is not None:
+            self._dot(*player.rect.center, PLAYER_DOT_COLOR)
+        pygame.draw.rect(self.frame, BORDER_COLOR, self.frame.get_rect(), 1)
+        return self.frame
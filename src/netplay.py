@@ -0,0 +1,344 @@
+import asyncio
+import random
+import struct
+import numpy as np
+from settings import FPS, ENEMY_REPLAN_INTERVAL
+from tilemap import TileMap
+from player import Player
+from enemy import Enemy
+from visibility import VisibilityMap
+from ai_planner import AIPlanner
+from ecs import ai_system, movement_system
+
+# Tipos de mensaje
+MSG_INPUT = 1    # Cliente -> servidor: ack + dirección
+MSG_WELCOME = 2  # Servidor -> cliente: id de su jugador y el mapa
+MSG_STATE = 3    # Servidor -> cliente: entidades cambiadas respecto a la base
+
+# Tipos de entidad
+KIND_PLAYER = 0
+KIND_ENEMY = 1
+KIND_JEEP = 2
+
+QUANTUM = 4          # Posiciones en cuartos de píxel
+MAX_COORDINATE = np.iinfo(np.int16).max // QUANTUM  # Mayor posición en píxeles que cabe en el estado
+HISTORY_TICKS = 64   # Instantáneas que se guardan para hacer deltas
+MAX_PENDING_BYTES = 64 * 1024  # Si un cliente no lee, se le salta ese tick
+
+_FRAME = struct.Struct('<I')
+_INPUT = struct.Struct('<BIbb')
+_WELCOME = struct.Struct('<BHIHH')
+_STATE = struct.Struct('<BIIHH')
+
+# Registro de entidad en el estado que se envía (9 bytes, sin relleno)
+ENTITY_DTYPE = np.dtype([('id', '<u2'), ('kind', 'u1'), ('w', 'u1'), ('h', 'u1'),
+                         ('x', '<i2'), ('y', '<i2')])
+_REMOVED_DTYPE = np.dtype('<u2')
+
+
+def encode_state(tick, current, base=None, base_tick=0):
+    """Mensaje de estado: entidades nuevas o cambiadas respecto a base y las que ya no existen.
+
+    current y base son arrays ENTITY_DTYPE ordenados por id; sin base se
+    envía todo (base_tick 0).
+    """
+    if base is None:
+        changed = current
+        removed = np.zeros(0, dtype=_REMOVED_DTYPE)
+        base_tick = 0
+    else:
+        # Alinear por id: lo que no estaba en base o ha cambiado se envía
+        index = np.searchsorted(base['id'], current['id'])
+        index = np.minimum(index, max(len(base) - 1, 0))
+        if len(base):
+            same = (base['id'][index] == current['id']) & (base[index] == current)
+        else:
+            same = np.zeros(len(current), dtype=bool)
+        changed = current[~same]
+        removed = np.setdiff1d(base['id'], current['id']).astype(_REMOVED_DTYPE)
+    header = _STATE.pack(MSG_STATE, tick, base_tick, len(changed), len(removed))
+    return b''.join((header, changed.tobytes(), removed.tobytes()))
+
+
+def decode_state(payload):
+    """Devuelve (tick, base_tick, cambiadas, ids eliminados)"""
+    _, tick, base_tick, changed_count, removed_count = _STATE.unpack_from(payload)
+    offset = _STATE.size
+    changed = np.frombuffer(payload, ENTITY_DTYPE, changed_count, offset)
+    offset += changed.nbytes
+    removed = np.frombuffer(payload, _REMOVED_DTYPE, removed_count, offset)
+    return tick, base_tick, changed, removed
+
+
+async def _read_frame(reader, expected_size=None):
+    """Lee un mensaje; con expected_size, uno de otro tamaño es ValueError (sin leerlo)"""
+    size = _FRAME.unpack(await reader.readexactly(_FRAME.size))[0]
+    if expected_size is not None and size != expected_size:
+        raise ValueError(f"mensaje de {size} bytes, se esperaban {expected_size}")
+    return await reader.readexactly(size)
+
+
+def _frame(payload):
+    return _FRAME.pack(len(payload)) + payload
+
+
+class _Connection:
+    __slots__ = ('writer', 'player', 'ack', 'bytes_sent')
+
+    def __init__(self, writer, player):
+        self.writer = writer
+        self.player = player
+        self.ack = 0
+        self.bytes_sent = 0
+
+
+class GameServer:
+    """Servidor autoritativo: simula la partida y reparte el estado a los clientes.
+
+    Todos los jugadores comparten TileMap y World, así que un tick mueve a
+    todos con una sola llamada a movement_system. Cada tick se guarda el
+    estado cuantizado y a cada cliente se le envía solo lo que difiere de la
+    última instantánea que confirmó; los clientes con el mismo ack
+    comparten el mismo mensaje ya serializado.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, tick_rate=FPS, seed=None):
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.tick = 0
+        self.rng = random.Random(seed)
+        self.tilemap = TileMap()
+        rows, cols = self.tilemap.tile_ids.shape
+        if max(rows, cols) * self.tilemap.tile_size > MAX_COORDINATE:
+            raise ValueError(f"El mapa ({cols}x{rows} tiles) no cabe en las posiciones cuantizadas "
+                             f"del estado (máximo {MAX_COORDINATE} píxeles por eje)")
+        self.world = self.tilemap.world
+        self.visibility = VisibilityMap(self.tilemap)
+        self.planner = AIPlanner(self.tilemap)
+        self.replan_timer = 0.0
+        self.enemy = Enemy(0, 0, self.tilemap)
+        self.clients = {}
+        self.history = {}  # tick -> array ENTITY_DTYPE
+        self.kinds = {jeep.eid: KIND_JEEP for jeep in self.tilemap.jeeps}
+        self.kinds[self.enemy.body.eid] = KIND_ENEMY
+        self.server = None
+        self._loop_task = None
+
+        # Se aparece en la zona caminable más grande (sin jeeps): nunca dentro de un edificio cerrado
+        connectivity = self.tilemap.connectivity
+        cells = connectivity.cells_of(connectivity.largest_component())
+        self._spawn_cells = [tuple(cell) for cell in cells.tolist()]
+        self._respawn(self.enemy.body)
+
+    async def start(self):
+        """Abre el puerto y arranca el bucle de ticks"""
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._loop_task = asyncio.create_task(self._tick_loop())
+        print(f"🌐 Servidor escuchando en {self.host}:{self.port}")
+
+    async def stop(self):
+        """Para el bucle, desconecta a los clientes y cierra el puerto"""
+        if self._loop_task:
+            self._loop_task.cancel()
+        for connection in list(self.clients.values()):
+            connection.writer.close()
+        # Dejar que cada conexión salga de su lectura y se limpie
+        while self.clients:
+            await asyncio.sleep(0)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.planner.shutdown()
+
+    # --- Conexiones ---
+
+    async def _handle_client(self, reader, writer):
+        player = Player(0, 0, self.tilemap)
+        self._respawn(player.body)
+        eid = player.body.eid
+        self.kinds[eid] = KIND_PLAYER
+        connection = _Connection(writer, player)
+        self.clients[eid] = connection
+        rows, cols = self.tilemap.tile_ids.shape
+        writer.write(_frame(_WELCOME.pack(MSG_WELCOME, eid, self.tick, rows, cols) +
+                            self.tilemap.tile_ids.tobytes()))
+        try:
+            while True:
+                # El cliente solo manda entradas: cualquier otra cosa corta la conexión
+                kind, ack, dx, dy = _INPUT.unpack(await _read_frame(reader, _INPUT.size))
+                if kind != MSG_INPUT:
+                    raise ValueError(f"tipo de mensaje {kind} inesperado")
+                if dx not in (-1, 0, 1) or dy not in (-1, 0, 1):
+                    raise ValueError(f"dirección ({dx}, {dy}) no válida")
+                connection.ack = max(connection.ack, ack)
+                player.body.set_direction(dx, dy)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            print(f"⚠️  Cliente {eid} desconectado por un mensaje no válido: {e}")
+        finally:
+            if self.enemy.target is player:
+                self.enemy.clear_target()
+            del self.clients[eid]
+            self.kinds.pop(eid, None)
+            self.world.destroy_entity(eid)
+            writer.close()
+
+    # --- Simulación ---
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.step()
+            self.broadcast()
+            next_tick += self.dt
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def step(self):
+        """Un tick de las reglas de SimpleGame para todos los jugadores"""
+        self.tick += 1
+        players = [connection.player for connection in self.clients.values()]
+        if players:
+            # El enemigo persigue al jugador más cercano
+            ex, ey = self.enemy.body.center()
+            target = min(players, key=lambda p: (p.body.center()[0] - ex) ** 2 + (p.body.center()[1] - ey) ** 2)
+            if target is not self.enemy.target:
+                self.enemy.set_target(target)
+                self.enemy.path = None
+            self.visibility.begin_frame()
+            if not self.enemy.update_awareness(self.visibility):
+                self.replan_timer -= self.dt
+                if self.replan_timer <= 0:
+                    self.enemy.request_path(self.planner)
+                    self.replan_timer = ENEMY_REPLAN_INTERVAL
+            self.planner.update()
+            self.enemy.steer()
+            ai_system(self.world)
+        elif self.enemy.target is not None:
+            self.enemy.clear_target()
+        movement_system(self.world, self.tilemap, self.dt)
+
+        # Quien toca un jeep o es alcanzado reaparece en otro sitio
+        for player in players:
+            if (player.check_jeep_collision() or
+                    self.enemy.check_collision_with_player(player.rect)):
+                self._respawn(player.body)
+
+        self.history[self.tick] = self.snapshot()
+        self.history.pop(self.tick - HISTORY_TICKS, None)
+
+    def _respawn(self, body):
+        row, col = self.rng.choice(self._spawn_cells)
+        size = self.tilemap.tile_size
+        body.set_position(col * size + 1, row * size + 1)
+        body.set_direction(0, 0)
+
+    def snapshot(self):
+        """Estado cuantizado de todas las entidades, ordenado por id"""
+        ids = np.array(sorted(self.kinds), dtype=np.int64)
+        state = np.empty(len(ids), dtype=ENTITY_DTYPE)
+        state['id'] = ids
+        state['kind'] = [self.kinds[eid] for eid in ids.tolist()]
+        state['w'] = self.world.size[ids, 0]
+        state['h'] = self.world.size[ids, 1]
+        quantized = np.round(self.world.position[ids] * QUANTUM)
+        # El mapa cabe en el rango (se comprueba al crear el servidor): no hace falta recortar
+        state['x'] = quantized[:, 0]
+        state['y'] = quantized[:, 1]
+        return state
+
+    def broadcast(self):
+        """Envía a cada cliente el delta contra su último ack (uno por ack distinto)"""
+        current = self.history[self.tick]
+        encoded = {}
+        for connection in self.clients.values():
+            transport = connection.writer.transport
+            if transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                continue  # Va atrasado: el siguiente delta contra su ack lo pondrá al día
+            base_tick = connection.ack if connection.ack in self.history else 0
+            message = encoded.get(base_tick)
+            if message is None:
+                base = self.history.get(base_tick) if base_tick else None
+                message = _frame(encode_state(self.tick, current, base, base_tick))
+                encoded[base_tick] = message
+            connection.writer.write(message)
+            connection.bytes_sent += len(message)
+
+
+class GameClient:
+    """Cliente: envía la dirección y reconstruye el estado con los deltas del servidor"""
+
+    def __init__(self):
+        self.player_id = None
+        self.tile_ids = None
+        self.tick = 0
+        self.states = {0: {}}  # tick -> {id: (kind, x, y, w, h)}
+        self.entities = {}
+        self.bytes_received = 0
+        self.direction = (0, 0)
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        payload = await _read_frame(self.reader)
+        _, self.player_id, self.tick, rows, cols = _WELCOME.unpack_from(payload)
+        self.tile_ids = np.frombuffer(payload, np.uint8, rows * cols, _WELCOME.size).reshape(rows, cols)
+
+    def set_direction(self, dx, dy):
+        self.direction = (dx, dy)
+
+    async def receive(self):
+        """Lee y aplica un mensaje de estado; confirma el tick y manda la dirección"""
+        payload = await _read_frame(self.reader)
+        self.bytes_received += len(payload) + _FRAME.size
+        tick, base_tick, changed, removed = decode_state(payload)
+        entities = dict(self.states.get(base_tick, {}))
+        for eid in removed.tolist():
+            entities.pop(eid, None)
+        for record in changed.tolist():
+            eid, kind, w, h, x, y = record
+            entities[eid] = (kind, x / QUANTUM, y / QUANTUM, w, h)
+        self.entities = entities
+        self.tick = tick
+        self.states[tick] = entities
+        self.states.pop(tick - HISTORY_TICKS, None)
+        self.writer.write(_frame(_INPUT.pack(MSG_INPUT, tick, *self.direction)))
+        return tick
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def run_local_session(clients=8, ticks=120, seed=0):
+    """Servidor y bots por localhost; devuelve bytes medios por cliente y tick"""
+    server = GameServer(seed=seed)
+    await server.start()
+    bots = [GameClient() for _ in range(clients)]
+    for bot in bots:
+        await bot.connect('127.0.0.1', server.port)
+    rng = random.Random(seed)
+
+    async def play(bot):
+        for _ in range(ticks):
+            if rng.random() < 0.1:
+                bot.set_direction(rng.randint(-1, 1), rng.randint(-1, 1))
+            await bot.receive()
+
+    await asyncio.gather(*(play(bot) for bot in bots))
+    received = sum(bot.bytes_received for bot in bots) / (clients * ticks)
+    for bot in bots:
+        await bot.close()
+    await server.stop()
+    return received, bots, server
+
+
+if __name__ == "__main__":
+    per_tick, bots, server = asyncio.run(run_local_session())
+    print(f"📦 {per_tick:.1f} bytes por cliente y tick con {len(bots)} clientes")
@@ -0,0 +1,392 @@
+import heapq
+
+# Movimientos en 4 direcciones (fila, col)
+NEIGHBORS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def navigation_grid(tilemap):
+    """Rejillas de caminabilidad y coste a partir de un TileMap.
+
+    Los jeeps cuentan como obstáculos estáticos. El coste de entrar en una
+    celda es 1 / speed_modifier, así las carreteras salen más baratas.
+    """
+    walkable = [list(row) for row in tilemap.walkable_grid]
+    for row, col in tilemap.jeep_cells():
+        walkable[row][col] = False
+    cost = [[1.0 / modifier if modifier > 0 else 0.0 for modifier in row]
+            for row in tilemap.speed_grid]
+    return walkable, cost
+
+
+class CellPath:
+    """Camino ya refinado: lista de celdas con la misma interfaz que HierarchicalPath"""
+
+    def __init__(self, cells, cost=0.0):
+        self._cells = list(cells)
+        self.cost = cost
+        self._index = 0
+
+    def peek(self, ahead=0):
+        """Celda del camino a 'ahead' pasos de la actual (None si se acaba)"""
+        if self._index + ahead < len(self._cells):
+            return self._cells[self._index + ahead]
+        return None
+
+    def advance(self):
+        """Pasa a la siguiente celda"""
+        if self._index + 1 < len(self._cells):
+            self._index += 1
+
+    def is_finished(self):
+        return self._index + 1 >= len(self._cells)
+
+    def cells(self):
+        return list(self._cells)
+
+
+class HierarchicalPath:
+    """Camino devuelto por HierarchicalPathfinder.
+
+    Guarda la ruta abstracta (nodos de entrada entre clusters) y la refina a
+    celdas concretas tramo a tramo, solo cuando se van consumiendo.
+    """
+
+    def __init__(self, pathfinder, abstract_nodes, cost):
+        self.pathfinder = pathfinder
+        self.abstract_nodes = abstract_nodes
+        self.cost = cost
+        self._segment = 0
+        self._cells = [abstract_nodes[0]]
+        self._index = 0
+
+    def _refine_next(self):
+        """Añade las celdas del siguiente tramo abstracto"""
+        if self._segment + 1 >= len(self.abstract_nodes):
+            return False
+        start = self.abstract_nodes[self._segment]
+        goal = self.abstract_nodes[self._segment + 1]
+        self._segment += 1
+        cells = self.pathfinder.refine_segment(start, goal)
+        if cells is None:
+            return False
+        self._cells.extend(cells[1:])
+        return True
+
+    def peek(self, ahead=0):
+        """Celda del camino a 'ahead' pasos de la actual (None si se acaba)"""
+        while self._index + ahead >= len(self._cells):
+            if not self._refine_next():
+                return None
+        return self._cells[self._index + ahead]
+
+    def advance(self):
+        """Pasa a la siguiente celda"""
+        if self.peek(1) is not None:
+            self._index += 1
+
+    def is_finished(self):
+        return self.peek(1) is None
+
+    def cells(self):
+        """Refina todo el camino y devuelve la lista completa de celdas"""
+        while self._refine_next():
+            pass
+        return list(self._cells)
+
+
+class HierarchicalPathfinder:
+    """Búsqueda de caminos jerárquica (HPA*) sobre una rejilla de tiles.
+
+    El mapa se divide en clusters cuadrados. En cada frontera entre clusters
+    se crean nodos de entrada y, dentro de cada cluster, se precalcula el
+    coste entre sus entradas. Las consultas buscan en ese grafo pequeño y el
+    camino se refina a celdas después, con búsquedas limitadas a un cluster.
+    Al cambiar celdas solo se recalculan los clusters afectados.
+    """
+
+    def __init__(self, walkable, cost, cluster_size=8):
+        self.walkable = walkable
+        self.cost = cost
+        self.rows = len(walkable)
+        self.cols = len(walkable[0]) if self.rows else 0
+        self.cluster_size = cluster_size
+        # Coste mínimo de una celda, para que la heurística de A* sea admisible
+        self.min_cost = min((value for row in cost for value in row if value > 0), default=1.0)
+        self.cluster_rows = (self.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (self.cols + cluster_size - 1) // cluster_size
+        self.borders = {}        # (cluster_a, cluster_b) -> [(celda_a, celda_b)]
+        self.inter_edges = {}    # nodo -> {nodo vecino de otro cluster: coste}
+        self.intra_edges = {}    # cluster -> {nodo: {nodo: coste}}
+        self.build()
+
+    @classmethod
+    def from_tilemap(cls, tilemap, cluster_size=8):
+        """Crea el pathfinder y lo mantiene al día con las ediciones del mapa"""
+        walkable, cost = navigation_grid(tilemap)
+        pathfinder = cls(walkable, cost, cluster_size)
+
+        def on_change(cells):
+            jeep_cells = set(tilemap.jeep_cells())
+            for row, col in cells:
+                modifier = tilemap.speed_grid[row][col]
+                pathfinder.walkable[row][col] = (tilemap.walkable_grid[row][col] and
+                                                 (row, col) not in jeep_cells)
+                pathfinder.cost[row][col] = 1.0 / modifier if modifier > 0 else 0.0
+            pathfinder.update_cells(cells)
+
+        tilemap.add_change_listener(on_change)
+        return pathfinder
+
+    # --- Construcción ---
+
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def cluster_bounds(self, cluster):
+        """(fila0, col0, fila1, col1) con el final exclusivo"""
+        size = self.cluster_size
+        row0 = cluster[0] * size
+        col0 = cluster[1] * size
+        return (row0, col0, min(row0 + size, self.rows), min(col0 + size, self.cols))
+
+    def build(self):
+        """Construye el grafo abstracto completo"""
+        self.borders.clear()
+        self.inter_edges.clear()
+        self.intra_edges.clear()
+        clusters = [(cr, cc) for cr in range(self.cluster_rows) for cc in range(self.cluster_cols)]
+        for cluster in clusters:
+            for neighbor in self._forward_neighbors(cluster):
+                self._build_border(cluster, neighbor)
+        for cluster in clusters:
+            self._build_intra_edges(cluster)
+
+    def _forward_neighbors(self, cluster):
+        """Clusters a la derecha y debajo (cada frontera se procesa una vez)"""
+        cr, cc = cluster
+        if cc + 1 < self.cluster_cols:
+            yield (cr, cc + 1)
+        if cr + 1 < self.cluster_rows:
+            yield (cr + 1, cc)
+
+    def _border_pairs(self, cluster_a, cluster_b):
+        """Parejas de celdas enfrentadas a lo largo de la frontera entre dos clusters"""
+        row0, col0, row1, col1 = self.cluster_bounds(cluster_a)
+        if cluster_b[1] > cluster_a[1]:  # Frontera vertical
+            return [((row, col1 - 1), (row, col1)) for row in range(row0, row1)]
+        return [((row1 - 1, col), (row1, col)) for col in range(col0, col1)]
+
+    def _build_border(self, cluster_a, cluster_b):
+        """Crea las entradas de una frontera: una por tramo abierto (dos si es largo)"""
+        transitions = []
+        run = []
+        for cell_a, cell_b in self._border_pairs(cluster_a, cluster_b) + [(None, None)]:
+            if cell_a is not None and self._is_free(cell_a) and self._is_free(cell_b):
+                run.append((cell_a, cell_b))
+                continue
+            if run:
+                if len(run) >= 6:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+
+        key = (cluster_a, cluster_b)
+        self.borders[key] = transitions
+        for cell_a, cell_b in transitions:
+            step_cost = (self._cell_cost(cell_a) + self._cell_cost(cell_b)) / 2
+            self.inter_edges.setdefault(cell_a, {})[cell_b] = step_cost
+            self.inter_edges.setdefault(cell_b, {})[cell_a] = step_cost
+
+    def _remove_border(self, key):
+        for cell_a, cell_b in self.borders.pop(key, []):
+            self.inter_edges.get(cell_a, {}).pop(cell_b, None)
+            self.inter_edges.get(cell_b, {}).pop(cell_a, None)
+            for cell in (cell_a, cell_b):
+                if not self.inter_edges.get(cell):
+                    self.inter_edges.pop(cell, None)
+
+    def _cluster_nodes(self, cluster):
+        """Nodos de entrada que pertenecen a un cluster"""
+        nodes = set()
+        cr, cc = cluster
+        for key in (((cr, cc - 1), cluster), ((cr - 1, cc), cluster),
+                    (cluster, (cr, cc + 1)), (cluster, (cr + 1, cc))):
+            for cell_a, cell_b in self.borders.get(key, []):
+                nodes.add(cell_a if key[0] == cluster else cell_b)
+        return nodes
+
+    def _build_intra_edges(self, cluster):
+        """Costes entre todas las entradas del cluster (Dijkstra limitado al cluster)"""
+        bounds = self.cluster_bounds(cluster)
+        nodes = self._cluster_nodes(cluster)
+        edges = {}
+        for node in nodes:
+            distances, _ = self._dijkstra(node, bounds, nodes)
+            edges[node] = {other: distances[other] for other in nodes
+                           if other != node and other in distances}
+        self.intra_edges[cluster] = edges
+
+    def update_cells(self, cells):
+        """Recalcula solo los clusters que contienen las celdas cambiadas y sus vecinos"""
+        dirty = set()
+        for cell in cells:
+            dirty.add(self.cluster_of(cell))
+        touched = set(dirty)
+        for cluster in dirty:
+            cr, cc = cluster
+            for neighbor in ((cr, cc - 1), (cr - 1, cc), (cr, cc + 1), (cr + 1, cc)):
+                if 0 <= neighbor[0] < self.cluster_rows and 0 <= neighbor[1] < self.cluster_cols:
+                    key = (min(cluster, neighbor), max(cluster, neighbor))
+                    self._remove_border(key)
+                    self._build_border(*key)
+                    touched.add(neighbor)
+        for cluster in touched:
+            self._build_intra_edges(cluster)
+
+    # --- Búsquedas locales ---
+
+    def _is_free(self, cell):
+        row, col = cell
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.walkable[row][col]
+
+    def _cell_cost(self, cell):
+        return self.cost[cell[0]][cell[1]] or 1.0
+
+    def _dijkstra(self, source, bounds, targets=None):
+        """Dijkstra limitado a un rectángulo; para antes si ya alcanzó todos los targets"""
+        row0, col0, row1, col1 = bounds
+        distances = {source: 0.0}
+        parents = {source: None}
+        remaining = set(targets) - {source} if targets else None
+        heap = [(0.0, source)]
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+            if remaining is not None:
+                remaining.discard(cell)
+                if not remaining:
+                    break
+            row, col = cell
+            for d_row, d_col in NEIGHBORS:
+                n_row = row + d_row
+                n_col = col + d_col
+                if not (row0 <= n_row < row1 and col0 <= n_col < col1):
+                    continue
+                if not self.walkable[n_row][n_col]:
+                    continue
+                neighbor = (n_row, n_col)
+                new_distance = distance + (self.cost[n_row][n_col] or 1.0)
+                if new_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = cell
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return distances, parents
+
+    def _local_path(self, start, goal, bounds):
+        """A* entre dos celdas sin salir de bounds"""
+        row0, col0, row1, col1 = bounds
+        goal_row, goal_col = goal
+        min_cost = self.min_cost
+        g_costs = {start: 0.0}
+        parents = {start: None}
+        heap = [(0.0, start)]
+        while heap:
+            _, cell = heapq.heappop(heap)
+            if cell == goal:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path[::-1]
+            row, col = cell
+            g_cost = g_costs[cell]
+            for d_row, d_col in NEIGHBORS:
+                n_row = row + d_row
+                n_col = col + d_col
+                if not (row0 <= n_row < row1 and col0 <= n_col < col1):
+                    continue
+                if not self.walkable[n_row][n_col]:
+                    continue
+                neighbor = (n_row, n_col)
+                new_cost = g_cost + (self.cost[n_row][n_col] or 1.0)
+                if new_cost < g_costs.get(neighbor, float('inf')):
+                    g_costs[neighbor] = new_cost
+                    parents[neighbor] = cell
+                    estimate = (abs(goal_row - n_row) + abs(goal_col - n_col)) * min_cost
+                    heapq.heappush(heap, (new_cost + estimate, neighbor))
+        return None
+
+    def refine_segment(self, start, goal):
+        """Celdas concretas entre dos nodos consecutivos de un camino abstracto"""
+        if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) == 1:
+            return [start, goal]
+        cluster = self.cluster_of(start)
+        if cluster == self.cluster_of(goal):
+            return self._local_path(start, goal, self.cluster_bounds(cluster))
+        return self._local_path(start, goal, (0, 0, self.rows, self.cols))
+
+    # --- Consulta ---
+
+    def find_path(self, start, goal):
+        """Camino de start a goal (celdas (fila, col)) o None si no hay.
+
+        Devuelve un HierarchicalPath que se refina a celdas bajo demanda.
+        """
+        if not self._is_free(start) or not self._is_free(goal):
+            return None
+        if start == goal:
+            return HierarchicalPath(self, [start], 0.0)
+
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # Conexiones temporales de start y goal con las entradas de su cluster
+        start_nodes = self._cluster_nodes(start_cluster)
+        start_distances, _ = self._dijkstra(start, self.cluster_bounds(start_cluster),
+                                            start_nodes | {goal} if goal_cluster == start_cluster else start_nodes)
+        goal_nodes = self._cluster_nodes(goal_cluster)
+        goal_distances, _ = self._dijkstra(goal, self.cluster_bounds(goal_cluster), goal_nodes)
+        start_links = {node: start_distances[node] for node in start_nodes if node in start_distances}
+        goal_links = {node: goal_distances[node] for node in goal_nodes if node in goal_distances}
+        if goal in start_distances:
+            start_links[goal] = start_distances[goal]
+        # Si start es una entrada también puede salir por sus propias aristas del grafo
+        start_links.pop(start, None)
+        for neighbor, edge_cost in self.inter_edges.get(start, {}).items():
+            start_links[neighbor] = min(edge_cost, start_links.get(neighbor, float('inf')))
+        if start in goal_links:
+            start_links[goal] = min(goal_links[start], start_links.get(goal, float('inf')))
+
+        # A* sobre el grafo abstracto
+        min_cost = self.min_cost
+        goal_row, goal_col = goal
+        g_costs = {start: 0.0}
+        parents = {start: None}
+        heap = [(0.0, start)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == goal:
+                nodes = []
+                while node is not None:
+                    nodes.append(node)
+                    node = parents[node]
+                return HierarchicalPath(self, nodes[::-1], g_costs[goal])
+            g_cost = g_costs[node]
+            if node == start:
+                links = start_links.items()
+            else:
+                links = list(self.intra_edges.get(self.cluster_of(node), {}).get(node, {}).items())
+                links += self.inter_edges.get(node, {}).items()
+                if node in goal_links:
+                    links.append((goal, goal_links[node]))
+            for neighbor, edge_cost in links:
+                new_cost = g_cost + edge_cost
+                if new_cost < g_costs.get(neighbor, float('inf')):
+                    g_costs[neighbor] = new_cost
+                    parents[neighbor] = node
+                    estimate = (abs(goal_row - neighbor[0]) + abs(goal_col - neighbor[1])) * min_cost
+                    heapq.heappush(heap, (new_cost + estimate, neighbor))
+        return None
@@ -1,22 +1,63 @@
 import pygame
-from settings import GREEN
+from settings import GREEN, FPS, PLAYER_SPEED
+from sprite_manager import sprite_manager
+from kinematics import Body, move_bodies
 
 class Player:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, 50, 50)
-        self.speed = 5
+    def __init__(self, x, y, tilemap=None):
+        self.tilemap = tilemap
+        self.sprite = sprite_manager.get_sprite('player')
+        world = tilemap.world if tilemap else None
+        self.body = Body(x, y, 30, 30, PLAYER_SPEED, world)
+        if self.sprite:
+            self.body.world.sprite[self.body.eid] = self.body.world.register_sprite('player', self.sprite)
 
-    def update(self):
+    @property
+    def rect(self):
+        return self.body.rect
+
+    def spawn(self, x, y):
+        """Reaparece en (x, y) (al reutilizarlo desde un pool)"""
+        self.body.respawn(x, y)
+
+    def despawn(self):
+        """Sale del World hasta el siguiente spawn"""
+        self.body.despawn()
+
+    def handle_input(self):
+        """Lee el teclado (WASD + flechas) y fija la dirección de movimiento"""
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
-            self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT]:
-            self.rect.x += self.speed
-        if keys[pygame.K_UP]:
-            self.rect.y -= self.speed
-        if keys[pygame.K_DOWN]:
-            self.rect.y += self.speed
+        dx = 0
+        dy = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            dx -= 1
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            dx += 1
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            dy -= 1
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            dy += 1
+        self.body.set_direction(dx, dy)
 
-    def draw(self, screen):
-        pygame.draw.rect(screen, GREEN, self.rect)
+    def update(self, dt=1 / FPS):
+        """Actualización individual (el juego mueve todos los cuerpos a la vez con move_bodies)"""
+        self.handle_input()
+        if self.tilemap:
+            move_bodies([self.body], self.tilemap, dt)
+        else:
+            self.body.set_position(self.body.x + self.body.dir_x * self.body.speed * dt,
+                                   self.body.y + self.body.dir_y * self.body.speed * dt)
+
+    def check_jeep_collision(self):
+        """Devuelve el jeep con el que choca el jugador, si lo hay"""
+        if self.tilemap:
+            body = self.body
+            return self.tilemap.check_jeep_collision(self.rect, sprite_manager.get_mask('player'),
+                                                     body.world.motion[body.eid])
+        return None
 
+    def draw(self, screen):
+        if self.sprite:
+            screen.blit(self.sprite, self.rect)
+        else:
+            pygame.draw.rect(screen, GREEN, self.rect)
@@ -0,0 +1,142 @@
+import os
+import sys
+import contextlib
+import traceback
+import weakref
+import pygame
+
+# Modo depuración: guarda dónde se pidió cada objeto para señalar fugas
+POOL_DEBUG = "--debug-pools" in sys.argv or os.environ.get("JAHACK_POOL_DEBUG") == "1"
+
+# Todos los pools vivos, para los informes
+POOLS = weakref.WeakSet()
+
+
+class Pool:
+    """Reserva de objetos reutilizables de un mismo tipo.
+
+    acquire(*args) devuelve un objeto libre preparado con reset(obj, *args)
+    o, si no queda ninguno, uno nuevo de factory(*args); release(obj) lo
+    devuelve (pasando antes por on_release). Así los reinicios y las
+    oleadas no crean basura que luego tenga que recoger el GC a mitad de
+    un frame. Con debug se guarda la pila de cada acquire y leaks() dice
+    qué objetos siguen fuera y quién los pidió.
+    """
+
+    def __init__(self, name, factory, reset=None, on_release=None, debug=None):
+        self.name = name
+        self.factory = factory
+        self.reset = reset
+        self.on_release = on_release
+        self.debug = POOL_DEBUG if debug is None else debug
+        self.free = []
+        self.in_use = {}  # id(obj) -> (obj, pila del acquire o None)
+        self.created = 0
+        self.acquired = 0
+        self.high_water = 0  # Máximo de objetos en uso a la vez
+        POOLS.add(self)
+
+    def acquire(self, *args):
+        """Objeto listo para usar (reutilizado si hay alguno libre)"""
+        if self.free:
+            obj = self.free.pop()
+            if self.reset:
+                self.reset(obj, *args)
+        else:
+            obj = self.factory(*args)
+            self.created += 1
+        stack = traceback.extract_stack(limit=8)[:-1] if self.debug else None
+        self.in_use[id(obj)] = (obj, stack)
+        self.acquired += 1
+        self.high_water = max(self.high_water, len(self.in_use))
+        return obj
+
+    def release(self, obj):
+        """Devuelve un objeto al pool"""
+        if self.in_use.pop(id(obj), None) is None:
+            raise ValueError(f"El objeto no está prestado por el pool '{self.name}' (¿doble release?)")
+        if self.on_release:
+            self.on_release(obj)
+        self.free.append(obj)
+
+    @contextlib.contextmanager
+    def borrow(self, *args):
+        """acquire/release en un bloque with"""
+        obj = self.acquire(*args)
+        try:
+            yield obj
+        finally:
+            self.release(obj)
+
+    def prewarm(self, count, *args):
+        """Crea objetos por adelantado (p. ej. en la carga) para no crearlos en juego"""
+        objects = [self.acquire(*args) for _ in range(count)]
+        for obj in objects:
+            self.release(obj)
+
+    def stats(self):
+        """Contadores del pool"""
+        return {
+            'name': self.name,
+            'in_use': len(self.in_use),
+            'free': len(self.free),
+            'created': self.created,
+            'acquired': self.acquired,
+            'high_water': self.high_water,
+        }
+
+    def leaks(self):
+        """Objetos sin devolver con la pila de su acquire (None sin modo debug)"""
+        return list(self.in_use.values())
+
+
+class SurfacePool:
+    """Superficies auxiliares reutilizables, un Pool por (tamaño, flags).
+
+    El contenido de una superficie reutilizada no se borra: quien la pide
+    la rellena entera.
+    """
+
+    def __init__(self, name='surfaces', debug=None):
+        self.name = name
+        self.debug = debug
+        self.pools = {}
+        self._owner = {}  # id(surface) -> pool
+
+    def acquire(self, size, flags=0):
+        key = (tuple(size), flags)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = Pool(f"{self.name} {key[0][0]}x{key[0][1]}", lambda: pygame.Surface(key[0], key[1]),
+                        debug=self.debug)
+            self.pools[key] = pool
+        surface = pool.acquire()
+        self._owner[id(surface)] = pool
+        return surface
+
+    def release(self, surface):
+        pool = self._owner.pop(id(surface), None)
+        if pool is None:
+            raise ValueError(f"La superficie no está prestada por el pool '{self.name}'")
+        pool.release(surface)
+
+
+def report_pools(pools=None):
+    """Imprime los contadores de los pools y, en modo debug, las fugas con su origen"""
+    print("♻️  Pools:")
+    for pool in sorted(pools if pools is not None else POOLS, key=lambda pool: pool.name):
+        stats = pool.stats()
+        print(f"   {stats['name']:<18} en uso {stats['in_use']:4}  libres {stats['free']:4}  "
+              f"creados {stats['created']:4}  máximo {stats['high_water']:4}")
+        for obj, stack in pool.leaks():
+            if stack is not None:
+                # Primer marco fuera de este módulo: quien pidió el objeto
+                origin = next((frame for frame in reversed(stack)
+                               if frame.filename not in (__file__, contextlib.__file__)), stack[-1])
+                print(f"⚠️  Fuga en '{pool.name}': {type(obj).__name__} pedido en "
+                      f"{os.path.basename(origin.filename)}:{origin.lineno} ({origin.name})")
+
+
+# Pools globales para objetos pequeños de vida corta
+rect_pool = Pool('rects', lambda *args: pygame.Rect(*args), reset=lambda rect, *args: rect.update(*args))
+surface_pool = SurfacePool()
@@ -0,0 +1,86 @@
+from collections import deque
+from settings import (FPS, ENEMY_REPLAN_INTERVAL, ADAPTIVE_QUALITY, QUALITY_WINDOW,
+                      QUALITY_DOWNGRADE, QUALITY_UPGRADE, QUALITY_UPGRADE_FRAMES)
+
+# Niveles de calidad, de mejor a peor:
+#   hud_interval: frames entre repintados del minimapa
+#   animation_interval: frames entre avances de los tiles animados (0 = congelados)
+#   replan_interval: segundos entre recálculos del camino del enemigo
+#   max_jeeps: jeeps que se dibujan, los más cercanos al jugador (None = todos)
+QUALITY_LEVELS = (
+    {'name': 'alta', 'hud_interval': 1, 'animation_interval': 1,
+     'replan_interval': ENEMY_REPLAN_INTERVAL, 'max_jeeps': None},
+    {'name': 'media', 'hud_interval': 2, 'animation_interval': 2,
+     'replan_interval': ENEMY_REPLAN_INTERVAL * 1.5, 'max_jeeps': 64},
+    {'name': 'baja', 'hud_interval': 4, 'animation_interval': 4,
+     'replan_interval': ENEMY_REPLAN_INTERVAL * 2, 'max_jeeps': 32},
+    {'name': 'mínima', 'hud_interval': 8, 'animation_interval': 0,
+     'replan_interval': ENEMY_REPLAN_INTERVAL * 3, 'max_jeeps': 16},
+)
+
+
+class QualityController:
+    """Ajusta el nivel de calidad según el tiempo de frame medido.
+
+    record() recibe lo que ha costado cada frame sin contar la espera de
+    clock.tick (Clock.get_rawtime). Con la ventana llena se compara la media
+    con el presupuesto 1000 / FPS: si pasa de QUALITY_DOWNGRADE se baja un
+    nivel enseguida; para volver a subir la media tiene que quedarse por
+    debajo de QUALITY_UPGRADE durante QUALITY_UPGRADE_FRAMES seguidos. La
+    distancia entre los dos umbrales y la espera (más la ventana vacía tras
+    cada cambio) evitan que oscile entre dos niveles.
+    """
+
+    def __init__(self, levels=QUALITY_LEVELS, target_fps=FPS, window=QUALITY_WINDOW, enabled=ADAPTIVE_QUALITY):
+        self.levels = levels
+        self.budget_ms = 1000 / target_fps
+        self.enabled = enabled
+        self.level = 0
+        self.samples = deque(maxlen=window)
+        self._total = 0.0
+        self._calm_frames = 0   # Frames seguidos con holgura para subir
+        self.changes = 0
+
+    @property
+    def settings(self):
+        """Parámetros del nivel actual"""
+        return self.levels[self.level]
+
+    @property
+    def average_ms(self):
+        return self._total / len(self.samples) if self.samples else 0.0
+
+    def set_level(self, level):
+        """Fija un nivel (y empieza a medir de cero con él)"""
+        level = max(0, min(len(self.levels) - 1, level))
+        if level == self.level:
+            return False
+        self.level = level
+        self.samples.clear()
+        self._total = 0.0
+        self._calm_frames = 0
+        self.changes += 1
+        return True
+
+    def record(self, frame_ms):
+        """Añade el tiempo de un frame; devuelve True si ha cambiado de nivel"""
+        if not self.enabled:
+            return False
+        if len(self.samples) == self.samples.maxlen:
+            self._total -= self.samples[0]
+        self.samples.append(frame_ms)
+        self._total += frame_ms
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        average = self.average_ms
+        if average > self.budget_ms * QUALITY_DOWNGRADE:
+            changed = self.set_level(self.level + 1)
+        elif average < self.budget_ms * QUALITY_UPGRADE:
+            self._calm_frames += 1
+            changed = self._calm_frames >= QUALITY_UPGRADE_FRAMES and self.set_level(self.level - 1)
+        else:
+            self._calm_frames = 0
+            changed = False
+        if changed:
+            print(f"⚙️  Calidad {self.settings['name']} (frame medio {average:.1f} ms de {self.budget_ms:.1f} ms)")
+        return changed
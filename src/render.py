@@ -0,0 +1,217 @@
+import weakref
+import pygame
+from settings import RENDERER
+from sprite_manager import sprite_manager
+
+# Color de los tiles sin sprite
+MISSING_TILE_COLOR = (255, 0, 255)
+
+
+class SoftwareRenderer:
+    """Dibuja con Surface.blit sobre la superficie de la ventana (el camino de siempre).
+
+    blit y blits tienen la misma firma que pygame.Surface, así los sistemas
+    que reciben una pantalla (DrawList.flush) aceptan cualquier renderer.
+    """
+
+    name = 'software'
+
+    def __init__(self, size, title):
+        self.size = size
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(title)
+
+    def clear(self, color):
+        self.screen.fill(color)
+
+    def blit(self, surface, position):
+        self.screen.blit(surface, position)
+
+    def blits(self, items, doreturn=False):
+        self.screen.blits(items, doreturn=False)
+
+    def update_surface(self, surface):
+        """La superficie ha cambiado (aquí se dibuja directamente, no hay nada que subir)"""
+
+    def draw_tilemap(self, tilemap):
+        tilemap.draw(self.screen, draw_jeeps=False)
+
+    def present(self):
+        pygame.display.flip()
+
+
+class TextureAtlas:
+    """Todos los sprites de tile empaquetados en una sola textura.
+
+    Se empaquetan por estanterías (filas con la altura del sprite más alto)
+    y se suben a la GPU una única vez; cada tile se dibuja copiando su
+    región de la textura.
+    """
+
+    def __init__(self, renderer, sprites, max_width=1024):
+        from pygame._sdl2.video import Texture
+
+        self.regions = {}
+        x = y = shelf_height = 0
+        width = 0
+        for name, sprite in sprites.items():
+            w, h = sprite.get_size()
+            if x + w > max_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            self.regions[name] = pygame.Rect(x, y, w, h)
+            x += w
+            width = max(width, x)
+            shelf_height = max(shelf_height, h)
+
+        sheet = pygame.Surface((max(width, 1), max(y + shelf_height, 1)), pygame.SRCALPHA)
+        for name, region in self.regions.items():
+            sheet.blit(sprites[name], region)
+        self.texture = Texture.from_surface(renderer, sheet)
+
+
+class GPURenderer:
+    """Dibuja con Renderer/Texture de SDL2 (pygame._sdl2.video).
+
+    Los tiles salen de un atlas que se sube una vez (y se vuelve a subir
+    solo si el sprite_manager cambia). El mapa se compone desde el atlas en
+    una textura destino que se guarda entre frames: solo se vuelven a copiar
+    las celdas que el TileMap marca como sucias (ediciones, tiles animados,
+    sprites recargados) y cada frame basta con una copia de esa textura. El
+    resto de superficies se convierte en textura la primera vez que se
+    dibuja y se reutiliza mientras la superficie exista.
+    """
+
+    name = 'gpu'
+
+    def __init__(self, size, title):
+        from pygame._sdl2.video import Window, Renderer, Texture
+
+        self.size = size
+        self._texture_class = Texture
+        self.window = Window(title, size)
+        self.renderer = Renderer(self.window, accelerated=-1)
+        self.textures = weakref.WeakKeyDictionary()  # Surface -> Texture
+        self.atlas = None
+        self._atlas_version = None
+        self.map_layer = None     # Textura destino con los tiles visibles ya compuestos
+        self._layer_key = None    # (mapa, atlas, tamaño) con los que se compuso
+        sprite_manager.add_sprite_listener(self._on_sprites_changed)
+
+    def clear(self, color):
+        self.renderer.draw_color = (*color[:3], 255)
+        self.renderer.clear()
+
+    def texture_for(self, surface):
+        """Textura de una superficie (se crea la primera vez)"""
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self._texture_class.from_surface(self.renderer, surface)
+            self.textures[surface] = texture
+        return texture
+
+    def blit(self, surface, position):
+        texture = self.texture_for(surface)
+        texture.draw(dstrect=(position[0], position[1], texture.width, texture.height))
+
+    def blits(self, items, doreturn=False):
+        for surface, position in items:
+            self.blit(surface, position)
+
+    def update_surface(self, surface):
+        """Vuelve a subir una superficie que ha cambiado a su textura ya creada"""
+        texture = self.textures.get(surface)
+        if texture is not None:
+            texture.update(surface)
+
+    def _refresh_atlas(self):
+        if self._atlas_version != sprite_manager.version:
+            self.atlas = TextureAtlas(self.renderer, sprite_manager.get_all_sprites())
+            self._atlas_version = sprite_manager.version
+
+    def _on_sprites_changed(self, names):
+        """Sube a la textura del atlas solo las regiones de los sprites sustituidos"""
+        if self.atlas is None:
+            return
+        for name in names:
+            region = self.atlas.regions.get(name)
+            sprite = sprite_manager.get_sprite(name)
+            if region is None or sprite is None or sprite.get_size() != region.size:
+                # Sprite nuevo o de otro tamaño: no cabe en su hueco, se rehace el atlas
+                self._atlas_version = None
+                return
+            self.atlas.texture.update(sprite, region)
+
+    def draw_tilemap(self, tilemap):
+        """Dibuja la capa del mapa, repintando antes en ella solo las celdas sucias"""
+        self._refresh_atlas()
+        size = tilemap.tile_size
+        rows = min(len(tilemap.map_data), -(-self.size[1] // size))
+        cols = min(len(tilemap.map_data[0]) if rows else 0, -(-self.size[0] // size))
+        if not rows or not cols:
+            return
+        layer_size = (cols * size, rows * size)
+        dirty = tilemap.take_dirty_cells()
+        key = (weakref.ref(tilemap), self.atlas, layer_size)
+        if self.map_layer is None or key != self._layer_key:
+            # Mapa, atlas o tamaño nuevos: se compone entera una vez
+            if self.map_layer is None or self.map_layer.width != layer_size[0] or \
+                    self.map_layer.height != layer_size[1]:
+                self.map_layer = self._texture_class(self.renderer, layer_size, target=True)
+            self._layer_key = key
+            cells = [(row, col) for row in range(rows) for col in range(cols)]
+        else:
+            cells = [(row, col) for row, col in dirty if row < rows and col < cols]
+        if cells:
+            self._compose_cells(tilemap, cells)
+        self.map_layer.draw(dstrect=(0, 0, layer_size[0], layer_size[1]))
+
+    def _compose_cells(self, tilemap, cells):
+        """Copia desde el atlas las celdas indicadas a la textura de la capa del mapa"""
+        texture = self.atlas.texture
+        regions = self.atlas.regions
+        size = tilemap.tile_size
+        map_data = tilemap.map_data
+        self.renderer.target = self.map_layer
+        try:
+            for row, col in cells:
+                region = regions.get(tilemap.tile_sprite_name(map_data[row][col]))
+                if region is not None:
+                    texture.draw(srcrect=region, dstrect=(col * size, row * size, size, size))
+                else:
+                    self.renderer.draw_color = (*MISSING_TILE_COLOR, 255)
+                    self.renderer.fill_rect((col * size, row * size, size, size))
+        finally:
+            self.renderer.target = None
+
+    def present(self):
+        self.renderer.present()
+
+
+RENDERERS = {
+    'software': SoftwareRenderer,
+    'gpu': GPURenderer,
+}
+
+
+def create_renderer(size, title, backend=None):
+    """Crea el renderer pedido ('auto', 'gpu' o 'software').
+
+    'auto' intenta primero el de GPU; si SDL2 no lo ofrece se usa el de
+    software sin interrumpir el arranque.
+    """
+    backend = backend or RENDERER
+    order = ['gpu', 'software'] if backend == 'auto' else [backend, 'software']
+    for name in order:
+        if name not in RENDERERS:
+            print(f"⚠️  Renderer desconocido '{name}'")
+            continue
+        try:
+            renderer = RENDERERS[name](size, title)
+        except (ImportError, pygame.error) as e:
+            print(f"⚠️  Renderer '{name}' no disponible: {e}")
+            continue
+        print(f"🖥️  Renderer: {renderer.name}")
+        return renderer
+    raise RuntimeError("No hay ningún renderer disponible")
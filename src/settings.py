@@ -5,6 +5,33 @@ WIDTH = 800
 HEIGHT = 600
 FPS = 60
 TITLE = "Juego Hackathon 2D"
+RENDERER = 'auto'  # 'auto' (GPU si SDL2 lo ofrece), 'gpu' o 'software'
+
+# Tiles
+ORIGINAL_TILE_SIZE = 16  # Tamaño de los tiles de Kenney
+TILE_SIZE = 32           # Tamaño en pantalla (escalado x2)
+
+# Movimiento (píxeles por segundo, antes del modificador de terreno)
+PLAYER_SPEED = 240
+ENEMY_SPEED = 150
+MAX_FRAME_TIME = 0.1  # Límite de dt para evitar saltos tras un parón
+
+# IA
+ENEMY_REPLAN_INTERVAL = 0.5  # Segundos entre recálculos de camino
+
+# Calidad adaptativa según el tiempo de frame (en fracciones del presupuesto 1/FPS)
+ADAPTIVE_QUALITY = True
+QUALITY_WINDOW = 60           # Frames de la media móvil
+QUALITY_DOWNGRADE = 0.9       # Por encima se baja un nivel
+QUALITY_UPGRADE = 0.5         # Por debajo (sostenido) se sube un nivel
+QUALITY_UPGRADE_FRAMES = 180  # Frames seguidos con holgura antes de subir
+
+# Minimapa (tamaño máximo en píxeles; se ajusta a la forma del mapa)
+MINIMAP_SIZE = (200, 150)
+
+# Recarga en caliente de sprites y mapas .tmj
+HOT_RELOAD = True
+HOT_RELOAD_INTERVAL = 0.5  # Segundos entre comprobaciones de los archivos
 
 # Colores RGB
 WHITE = (255, 255, 255)
@@ -12,4 +39,3 @@ BLACK = (0, 0, 0)
 GREEN = (0, 200, 0)
 RED   = (200, 0, 0)
 BLUE  = (0, 0, 200)
-
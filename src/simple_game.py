@@ -1,38 +1,113 @@
+# Primero el perfilador: su reloj empieza antes de importar pygame
+from startup_profiler import startup_profiler
 import pygame, sys
-from settings import WIDTH, HEIGHT, FPS, TITLE, BLACK, TILE_SIZE
+import numpy as np
+from settings import WIDTH, HEIGHT, FPS, TITLE, BLACK, TILE_SIZE, MAX_FRAME_TIME, HOT_RELOAD
 from player import Player
 from enemy import Enemy
 from tilemap import TileMap
+from sprite_manager import sprite_manager
+from visibility import VisibilityMap
+from ai_planner import AIPlanner
+from ecs import ai_system, movement_system, draw_system
+from drawlist import DrawList
+from tile_animation import animation_clock
+from hot_reload import HotReloader
+from pool import Pool, POOL_DEBUG, surface_pool, rect_pool, report_pools
+from render import create_renderer
+from minimap import Minimap
+from quality import QualityController
+from snapshot import take_snapshot, restore_snapshot
+from telemetry import (TelemetryWriter, EVENT_COLLISION, EVENT_RESTART,
+                       ENTITY_PLAYER, ENTITY_ENEMY, ENTITY_JEEP)
+startup_profiler.mark("imports")
 
 class SimpleGame:
     """Versión simplificada que inicia directamente en el juego"""
     
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(f"{TITLE} - Modo Directo")
+    def __init__(self, telemetry_path=None, renderer=None, map_path=None):
+        with startup_profiler.phase("display init"):
+            pygame.init()
+            self.renderer = create_renderer((WIDTH, HEIGHT), f"{TITLE} - Modo Directo", renderer)
         self.clock = pygame.time.Clock()
         self.running = True
+        self.dt = 1 / FPS
+        self.tick = 0
+        self.elapsed = 0.0
+        self.info_items = None  # (superficie, posición) del texto de ayuda, se crean una vez
+        self._info_backgrounds = []
+        self.map_path = map_path  # Mapa .tmj opcional (si no, el mapa urbano por defecto)
+        self.show_minimap = True
+        self._minimap_frame = None
+        # Baja o sube HUD, animaciones, IA y jeeps dibujados según lo que tarda cada frame
+        self.quality = QualityController()
+        self._hidden_jeeps = None  # eids de jeeps que no se dibujan en este nivel
+
+        # Telemetría opcional: posiciones por tick, colisiones y reinicios
+        self.telemetry = TelemetryWriter(telemetry_path) if telemetry_path else None
+        if self.telemetry:
+            print(f"📈 Guardando telemetría en {telemetry_path}")
+
+        # Sprites de respaldo al instante; los tiles reales se piden tras el primer frame
+        with startup_profiler.phase("sprite load"):
+            sprite_manager.ensure_loaded()
+            if not sprite_manager.has_kenney_tiles():
+                startup_profiler.note(f"Faltan assets: {sprite_manager.missing_assets[-1]}")
 
         # Inicializar componentes del juego directamente
         print("🎮 Iniciando juego en modo directo...")
-        print("📋 Controles: WASD o Flechas para moverse")
+        print("📋 Controles: WASD o Flechas para moverse (F5 guardar, F9 cargar, M minimapa)")
         print("⚠️  Objetivo: Evita el enemigo rojo y los jeeps verdes")
         
-        self.init_game_components()
+        with startup_profiler.phase("map build"):
+            self.init_game_components()
+        
+        # Al guardar un tile o el .tmj se recarga solo lo que ha cambiado
+        self.hot_reload = None
+        if HOT_RELOAD:
+            self.hot_reload = HotReloader(self.tilemap, on_map_resized=self._on_map_resized)
 
     def init_game_components(self):
         """Inicializa los componentes del juego"""
-        # Mapa
-        self.tilemap = TileMap()
+        # Mapa (si se reinicia, parar el planificador del mapa anterior)
+        if getattr(self, 'planner', None):
+            self.planner.shutdown()
+        self.tilemap = TileMap(map_path=self.map_path)
+        self.visibility = VisibilityMap(self.tilemap)
+        self.minimap = Minimap(self.tilemap)
+        self.planner = AIPlanner(self.tilemap)
+        self.replan_timer = 0.0
+        self.quick_save = None
+        self.draw_list = DrawList(self.tilemap.world.sprites, pygame.Rect(0, 0, WIDTH, HEIGHT))
+        self._jeep_ids = self.current_jeep_ids()
+        # Los jeeps cambian con el editor, la recarga en caliente o al cargar partida
+        self.tilemap.add_change_listener(self._on_tiles_changed)
+        
+        # Jugador y enemigo salen de pools: al reiniciar se reutilizan los mismos objetos
+        tilemap = self.tilemap
+        self.players = Pool('players', lambda x, y: Player(x, y, tilemap),
+                            reset=Player.spawn, on_release=Player.despawn)
+        self.enemies = Pool('enemies', lambda x, y: Enemy(x, y, tilemap),
+                            reset=Enemy.spawn, on_release=Enemy.despawn)
+        self.player = None
+        self.enemy = None
+        self.spawn_entities()
+
+    def spawn_entities(self):
+        """Coloca jugador y enemigo en posiciones seguras y conectadas entre sí"""
+        if self.player is not None:
+            self.players.release(self.player)
+            self.enemies.release(self.enemy)
         
         # Entidades - posiciones iniciales seguras
         # Encontrar posición segura para el jugador
         safe_x, safe_y = self.tilemap.find_safe_spawn_position(for_enemy=False)
-        self.player = Player(safe_x, safe_y, self.tilemap)
+        self.player = self.players.acquire(safe_x, safe_y)
         
         # Encontrar posición segura para el enemigo con espacio de movimiento
-        enemy_x, enemy_y = self.tilemap.find_safe_spawn_position(entity_width=25, entity_height=25, for_enemy=True)
+        player_center = self.player.rect.center
+        enemy_x, enemy_y = self.tilemap.find_safe_spawn_position(entity_width=25, entity_height=25, for_enemy=True,
+                                                                 reachable_from=player_center)
         
         # Verificar que el enemigo no esté demasiado cerca del jugador
         distance_to_player = ((enemy_x - safe_x) ** 2 + (enemy_y - safe_y) ** 2) ** 0.5
@@ -46,14 +121,16 @@ class SimpleGame:
             for alt_x, alt_y in alternative_positions:
                 alt_distance = ((alt_x - safe_x) ** 2 + (alt_y - safe_y) ** 2) ** 0.5
                 if alt_distance >= 150:
-                    temp_rect = pygame.Rect(alt_x, alt_y, 25, 25)
-                    if (self.tilemap._is_rect_walkable(temp_rect) and 
-                        not self.tilemap.check_jeep_collision(temp_rect) and
-                        self.tilemap._has_movement_space(alt_x, alt_y, 25, 25)):
-                        enemy_x, enemy_y = alt_x, alt_y
-                        break
+                    with rect_pool.borrow(alt_x, alt_y, 25, 25) as temp_rect:
+                        if (self.tilemap._is_rect_walkable(temp_rect) and
+                            self.tilemap.can_reach(*temp_rect.center, *player_center) and
+                            not self.tilemap.check_jeep_collision(temp_rect) and
+                            self.tilemap._has_movement_space(alt_x, alt_y, 25, 25)):
+                            enemy_x, enemy_y = alt_x, alt_y
+                            break
             
-        self.enemy = Enemy(enemy_x, enemy_y, self.tilemap)
+        self.enemy = self.enemies.acquire(enemy_x, enemy_y)
+        self.replan_timer = 0.0
         
         # El enemigo persigue al jugador
         self.enemy.set_target(self.player)
@@ -64,16 +141,46 @@ class SimpleGame:
 
     def run(self):
         print("🚀 ¡Juego iniciado! Usa WASD para moverte")
+        first_frame = True
         while self.running:
             self.events()
+            sprite_manager.update_streaming()
+            if self.hot_reload:
+                self.hot_reload.poll()
             self.update()
             self.draw()
-            self.clock.tick(FPS)
+            if first_frame:
+                first_frame = False
+                startup_profiler.mark("first frame")
+                startup_profiler.report()
+                # Los tiles reales llegan en segundo plano; mientras, se usan los de respaldo
+                sprite_manager.stream_kenney_tiles()
+            self.dt = min(self.clock.tick(FPS) / 1000, MAX_FRAME_TIME)
+            # get_rawtime es lo que ha costado el frame sin la espera de tick (el primero, con la carga, no cuenta)
+            if self.tick > 1 and self.quality.record(self.clock.get_rawtime()):
+                self._minimap_frame = None
+                self.update_hidden_jeeps()
+        self.close()
+
+    def close(self):
+        """Cierra los recursos de la sesión (vuelca la telemetría pendiente)"""
+        if self.telemetry:
+            self.telemetry.close()
+            self.telemetry = None
+        if POOL_DEBUG and self.player is not None:
+            # Se devuelve lo que sigue en juego: lo que quede prestado es una fuga
+            self.players.release(self.player)
+            self.enemies.release(self.enemy)
+            self.player = self.enemy = None
+            self.tilemap.place_jeeps([])
+            self.release_info()
+            report_pools()
 
     def events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+                self.close()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
@@ -82,65 +189,210 @@ class SimpleGame:
                     self.running = False
                 elif event.key == pygame.K_r:
                     print("🔄 Reiniciando juego...")
-                    self.init_game_components()
+                    self.restart()
+                elif event.key == pygame.K_m:
+                    self.show_minimap = not self.show_minimap
+                elif event.key == pygame.K_F5:
+                    self.quick_save = self.save_snapshot(self.quick_save)
+                    print("💾 Partida guardada")
+                elif event.key == pygame.K_F9 and self.quick_save:
+                    self.load_snapshot(self.quick_save)
+                    print("📂 Partida cargada")
 
     def update(self):
-        self.player.update()
-        self.enemy.update()
+        # Decisiones primero, después los sistemas recorren todas las entidades en bloque
+        world = self.tilemap.world
+        self.visibility.begin_frame()
+        self.player.handle_input()
+        # Sin línea de visión el enemigo sigue un camino que se recalcula cada cierto tiempo
+        if not self.enemy.update_awareness(self.visibility):
+            self.replan_timer -= self.dt
+            if self.replan_timer <= 0:
+                self.enemy.request_path(self.planner)
+                self.replan_timer = self.quality.settings['replan_interval']
+        self.planner.update()
+        self.enemy.steer(self.tilemap.player_field(self.enemy.target_cell()))
+        ai_system(world)
+        movement_system(world, self.tilemap, self.dt)
+        animation_clock.update(self.dt)
+        self.tick += 1
+        if self._hidden_jeeps is not None and self.tick % 15 == 0:
+            self.update_hidden_jeeps()
+        self.elapsed += self.dt
+        if self.telemetry:
+            self.log_positions()
         
         # Verificar colisión con jeeps (damage)
         jeep_collision = self.player.check_jeep_collision()
         if jeep_collision:
             print("💥 ¡Colisión con jeep! Reiniciando...")
-            self.init_game_components()
+            self.log_collision(ENTITY_JEEP, self.tilemap.jeeps.index(jeep_collision))
+            self.restart()
             return
         
         # Verificar si el enemigo alcanzó al jugador
         if self.enemy.check_collision_with_player(self.player.rect):
             print("👹 ¡El enemigo te alcanzó! Reiniciando...")
-            self.init_game_components()
+            self.log_collision(ENTITY_ENEMY)
+            self.restart()
+            return
+
+    def current_jeep_ids(self):
+        """eids de los jeeps que hay ahora en el mapa"""
+        jeeps = self.tilemap.jeeps
+        return np.fromiter((jeep.eid for jeep in jeeps), dtype=np.int64, count=len(jeeps))
+
+    def _on_tiles_changed(self, cells):
+        """Si han cambiado los jeeps, se rehacen sus eids y los que no se dibujan"""
+        ids = self.current_jeep_ids()
+        if np.array_equal(ids, self._jeep_ids):
             return
+        self._jeep_ids = ids
+        if self.player is not None:
+            self.update_hidden_jeeps()
+
+    def update_hidden_jeeps(self):
+        """Con más jeeps que max_jeeps solo se dibujan los más cercanos al jugador.
+
+        Los jeeps son obstáculos fijos: los ocultos siguen colisionando y
+        contando para el pathfinding, solo se ahorra su dibujo.
+        """
+        limit = self.quality.settings['max_jeeps']
+        ids = self._jeep_ids
+        if limit is None or len(ids) <= limit:
+            self._hidden_jeeps = None
+            return
+        world = self.tilemap.world
+        offsets = world.position[ids] - world.position[self.player.body.eid]
+        far = np.argpartition((offsets ** 2).sum(axis=1), limit)[limit:]
+        self._hidden_jeeps = ids[far]
+
+    def save_snapshot(self, base=None):
+        """Instantánea del estado actual (comparte el mapa con base si no ha cambiado)"""
+        return take_snapshot(self.tilemap, self.player, self.enemy, base=base)
+
+    def load_snapshot(self, snapshot):
+        """Vuelve al estado de una instantánea"""
+        restore_snapshot(snapshot, self.tilemap, self.player, self.enemy)
+        self.replan_timer = 0.0
+
+    def _on_map_resized(self, path):
+        """El .tmj recargado tiene otro tamaño: se crea el mapa de nuevo"""
+        self.init_game_components()
+        self.hot_reload.set_tilemap(self.tilemap)
+        self._minimap_frame = None
+        self.update_hidden_jeeps()
+
+    def restart(self):
+        """Reinicia la partida dejando constancia en la telemetría.
+
+        El mapa no cambia entre partidas: solo se recolocan jugador y enemigo.
+        """
+        if self.telemetry:
+            self.telemetry.log_event(self.tick, self.elapsed, EVENT_RESTART, ENTITY_PLAYER)
+        self.spawn_entities()
+        if self._hidden_jeeps is not None:
+            self.update_hidden_jeeps()
+
+    def log_positions(self):
+        """Añade a la telemetría las posiciones de este tick"""
+        world = self.tilemap.world
+        self.telemetry.log_positions(self.tick, self.elapsed, ENTITY_PLAYER,
+                                     world.position[self.player.body.eid])
+        self.telemetry.log_positions(self.tick, self.elapsed, ENTITY_ENEMY,
+                                     world.position[self.enemy.body.eid])
+        if len(self._jeep_ids):
+            self.telemetry.log_positions(self.tick, self.elapsed, ENTITY_JEEP,
+                                         world.position[self._jeep_ids])
+
+    def log_collision(self, entity, index=0):
+        """Registra con qué chocó el jugador y dónde"""
+        if self.telemetry:
+            x, y = self.player.rect.topleft
+            self.telemetry.log_event(self.tick, self.elapsed, EVENT_COLLISION, entity, index, x, y)
 
     def draw(self):
-        self.screen.fill(BLACK)
+        self.renderer.clear(BLACK)
         
-        # Dibujamos el mapa primero (fondo)
-        self.tilemap.draw(self.screen)
-        # Luego las entidades (primer plano)
-        self.player.draw(self.screen)
-        self.enemy.draw(self.screen)
+        # Dibujamos el mapa primero (fondo); los tiles animados solo repintan sus celdas
+        animation_interval = self.quality.settings['animation_interval']
+        if animation_interval and self.tick % animation_interval == 0:
+            self.tilemap.update_animations()
+        self.renderer.draw_tilemap(self.tilemap)
+        # Luego las entidades (jeeps, jugador, enemigo) ordenadas por profundidad
+        ids = None
+        if self._hidden_jeeps is not None:
+            ids = self.tilemap.world.active_ids()
+            ids = ids[~np.isin(ids, self._hidden_jeeps)]
+        draw_system(self.tilemap.world, self.draw_list, ids)
+        self.draw_list.flush(self.renderer)
         
         # Información básica
         self.draw_info()
+        if self.show_minimap:
+            self.draw_minimap()
         
-        pygame.display.flip()
+        self.renderer.present()
+    
+    def draw_minimap(self):
+        """Minimapa en la esquina inferior derecha (la imagen de los tiles está cacheada).
+
+        Con calidad reducida solo se repinta cada hud_interval frames; entre
+        medias se vuelve a dibujar el último.
+        """
+        if self._minimap_frame is None or self.tick % self.quality.settings['hud_interval'] == 0:
+            self._minimap_frame = self.minimap.render(self.player, self.enemy)
+            self.renderer.update_surface(self._minimap_frame)
+        frame = self._minimap_frame
+        self.renderer.blit(frame, (WIDTH - frame.get_width() - 10, HEIGHT - frame.get_height() - 10))
     
     def draw_info(self):
-        """Dibuja información básica del juego"""
+        """Dibuja información básica del juego (textos y fondos preparados una sola vez)"""
+        if self.info_items is None:
+            self.build_info()
+        self.renderer.blits(self.info_items)
+
+    def build_info(self):
+        """Renderiza las instrucciones y sus fondos; los fondos salen del pool de superficies"""
+        self.release_info()
+        self.info_items = []
         try:
             font = pygame.font.Font(None, 20)
+        except Exception:
+            return
+        
+        # Instrucciones básicas
+        instructions = [
+            "WASD/Flechas: Moverse",
+            "ESC: Salir | R: Reiniciar | M: Minimapa",
+            "⚠️ Evita: Enemigo rojo y jeeps verdes"
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            text = font.render(instruction, True, (255, 255, 255))
+            # Fondo para el texto
+            text_bg = surface_pool.acquire((text.get_width() + 6, text.get_height() + 2))
+            text_bg.set_alpha(150)
+            text_bg.fill((0, 0, 0))
+            self._info_backgrounds.append(text_bg)
             
-            # Instrucciones básicas
-            instructions = [
-                "WASD/Flechas: Moverse",
-                "ESC: Salir | R: Reiniciar",
-                "⚠️ Evita: Enemigo rojo y jeeps verdes"
-            ]
-            
-            for i, instruction in enumerate(instructions):
-                text = font.render(instruction, True, (255, 255, 255))
-                # Fondo para el texto
-                text_bg = pygame.Surface((text.get_width() + 6, text.get_height() + 2))
-                text_bg.set_alpha(150)
-                text_bg.fill((0, 0, 0))
-                
-                y_pos = 10 + i * 25
-                self.screen.blit(text_bg, (8, y_pos))
-                self.screen.blit(text, (10, y_pos + 1))
-                
-        except Exception as e:
-            pass
+            y_pos = 10 + i * 25
+            self.info_items.append((text_bg, (8, y_pos)))
+            self.info_items.append((text, (10, y_pos + 1)))
+
+    def release_info(self):
+        """Devuelve al pool los fondos del texto de ayuda"""
+        for surface in self._info_backgrounds:
+            surface_pool.release(surface)
+        self._info_backgrounds = []
+        self.info_items = None
 
 if __name__ == "__main__":
-    simple_game = SimpleGame()
+    # python simple_game.py [--telemetry sesion.bin] [--renderer auto|gpu|software] [--map mapa.tmj]
+    #                       [--trace-startup] [--debug-pools]
+    options = {}
+    for flag in ("--telemetry", "--renderer", "--map"):
+        if flag in sys.argv[1:-1]:
+            options[flag] = sys.argv[sys.argv.index(flag) + 1]
+    simple_game = SimpleGame(options.get("--telemetry"), options.get("--renderer"), options.get("--map"))
     simple_game.run()
\ No newline at end of file
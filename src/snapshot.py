@@ -0,0 +1,137 @@
+import struct
+import numpy as np
+from game_state import GameState
+from tilemap import TILE_PALETTE
+
+# Formato binario: cabecera fija seguida de arrays planos little-endian
+SNAPSHOT_MAGIC = b'JAHS'
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('<4sBBHHHB')  # firma, versión, flags, filas, columnas, jeeps, estado
+_COUNT = struct.Struct('<I')
+FLAG_DIFF = 1
+
+_STATES = list(GameState)
+_NO_STATE = 255
+
+_TILES_DTYPE = np.dtype(np.uint8)
+_JEEPS_DTYPE = np.dtype('<i4')
+_BODIES_DTYPE = np.dtype('<f8')
+_INDEX_DTYPE = np.dtype('<u4')
+
+
+class Snapshot:
+    """Instantánea del estado de una partida guardada en arrays planos.
+
+    tiles son los ids de paleta del mapa (uint8, solo lectura). Si el mapa no
+    ha cambiado desde la instantánea base se comparte su array en vez de
+    copiarlo (copia en escritura), así clonar un estado cuesta lo mismo que
+    copiar las posiciones. bodies guarda posición y dirección de jugador y
+    enemigo en coma flotante para que la restauración sea exacta.
+    """
+
+    __slots__ = ('tiles', 'tiles_version', 'jeeps', 'bodies', 'state')
+
+    def __init__(self, tiles, tiles_version, jeeps, bodies, state=None):
+        self.tiles = tiles
+        self.tiles_version = tiles_version
+        self.jeeps = jeeps
+        self.bodies = bodies
+        self.state = state
+
+    def to_bytes(self, base=None):
+        """Serializa; con base solo se guardan los tiles que difieren de ella"""
+        rows, cols = self.tiles.shape
+        diff = base is not None and base.tiles.shape == self.tiles.shape
+        state = _NO_STATE if self.state is None else _STATES.index(self.state)
+        parts = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, FLAG_DIFF if diff else 0,
+                              rows, cols, len(self.jeeps), state)]
+        if diff:
+            if self.tiles is base.tiles:
+                changed = np.zeros(0, dtype=_INDEX_DTYPE)
+            else:
+                changed = np.flatnonzero(self.tiles != base.tiles).astype(_INDEX_DTYPE)
+            parts.append(_COUNT.pack(len(changed)))
+            parts.append(changed.tobytes())
+            parts.append(self.tiles.ravel()[changed].tobytes())
+        else:
+            parts.append(self.tiles.tobytes())
+        parts.append(self.jeeps.astype(_JEEPS_DTYPE).tobytes())
+        parts.append(self.bodies.astype(_BODIES_DTYPE).tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, base=None):
+        """Reconstruye una instantánea; las diferenciales necesitan su base"""
+        magic, version, flags, rows, cols, jeep_count, state = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Formato de instantánea no soportado")
+        offset = _HEADER.size
+
+        if flags & FLAG_DIFF:
+            if base is None or base.tiles.shape != (rows, cols):
+                raise ValueError("La instantánea diferencial necesita su instantánea base")
+            (count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            changed = np.frombuffer(data, _INDEX_DTYPE, count, offset)
+            offset += changed.nbytes
+            values = np.frombuffer(data, _TILES_DTYPE, count, offset)
+            offset += values.nbytes
+            if count:
+                tiles = base.tiles.copy()
+                tiles.ravel()[changed] = values
+                tiles.setflags(write=False)
+                tiles_version = None
+            else:
+                tiles = base.tiles
+                tiles_version = base.tiles_version
+        else:
+            tiles = np.frombuffer(data, _TILES_DTYPE, rows * cols, offset).reshape(rows, cols)
+            offset += tiles.nbytes
+            tiles_version = None
+
+        jeeps = np.frombuffer(data, _JEEPS_DTYPE, jeep_count * 2, offset).reshape(jeep_count, 2)
+        offset += jeeps.nbytes
+        bodies = np.frombuffer(data, _BODIES_DTYPE, 8, offset).reshape(2, 4)
+        return cls(tiles, tiles_version, jeeps, bodies,
+                   None if state == _NO_STATE else _STATES[state])
+
+
+def take_snapshot(tilemap, player, enemy, state_manager=None, base=None):
+    """Captura el estado actual; comparte los tiles de base si el mapa no ha cambiado"""
+    if base is not None and base.tiles_version == tilemap.tile_version:
+        tiles = base.tiles
+    else:
+        tiles = tilemap.tile_ids.copy()
+        tiles.setflags(write=False)
+
+    world = tilemap.world
+    jeep_ids = [jeep.eid for jeep in tilemap.jeeps]
+    jeeps = np.round(world.position[jeep_ids]).astype(_JEEPS_DTYPE).reshape(-1, 2)
+    body_ids = [player.body.eid, enemy.body.eid]
+    bodies = np.hstack([world.position[body_ids], world.direction[body_ids]])
+    state = state_manager.current_state if state_manager is not None else None
+    return Snapshot(tiles, tilemap.tile_version, jeeps, bodies, state)
+
+
+def restore_snapshot(snapshot, tilemap, player, enemy, state_manager=None):
+    """Devuelve la partida al estado de la instantánea tocando solo lo que difiere"""
+    if snapshot.tiles_version != tilemap.tile_version:
+        tilemap.restore_tiles(snapshot.tiles, snapshot.tiles_version)
+        if snapshot.tiles_version is None:
+            snapshot.tiles_version = tilemap.tile_version
+
+    world = tilemap.world
+    jeep_ids = [jeep.eid for jeep in tilemap.jeeps]
+    current = np.round(world.position[jeep_ids]).reshape(-1, 2)
+    if current.shape != snapshot.jeeps.shape or (current != snapshot.jeeps).any():
+        tilemap.place_jeeps([tuple(position) for position in snapshot.jeeps.tolist()])
+
+    body_ids = [player.body.eid, enemy.body.eid]
+    world.position[body_ids] = snapshot.bodies[:, :2]
+    world.direction[body_ids] = snapshot.bodies[:, 2:]
+    world.motion[body_ids] = 0.0
+    # El camino anterior ya no vale: se planifica de nuevo
+    enemy.path = None
+
+    if state_manager is not None and snapshot.state is not None:
+        state_manager.current_state = snapshot.state
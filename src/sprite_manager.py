@@ -1,6 +1,94 @@
 import pygame
 import os
+import weakref
 from settings import TILE_SIZE, ORIGINAL_TILE_SIZE
+from asset_streamer import AssetStreamer
+
+# Relativa a este archivo para que no dependa del directorio desde el que se lanza
+KENNEY_TILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "assets", "kenney_rpg-urban-pack", "Tiles")
+
+# Mapeo de archivos de tiles a nombres descriptivos
+KENNEY_TILE_FILES = {
+    # Terrenos básicos
+    'grass': 'tile_0000.png',
+    'stone_light': 'tile_0001.png',
+    'stone_dark': 'tile_0002.png',
+    'cobblestone': 'tile_0003.png',
+    'dirt': 'tile_0030.png',
+    'sand': 'tile_0031.png',
+    
+    # Carreteras y calles
+    'road_straight_h': 'tile_0004.png',     # Carretera horizontal
+    'road_straight_v': 'tile_0014.png',     # Carretera vertical
+    'road_corner_tl': 'tile_0005.png',      # Esquina superior izquierda
+    'road_corner_tr': 'tile_0006.png',      # Esquina superior derecha
+    'road_corner_bl': 'tile_0015.png',      # Esquina inferior izquierda
+    'road_corner_br': 'tile_0016.png',      # Esquina inferior derecha
+    'road_intersection': 'tile_0024.png',   # Intersección
+    'road_t_up': 'tile_0025.png',           # T hacia arriba
+    'road_t_down': 'tile_0035.png',         # T hacia abajo
+    'road_t_left': 'tile_0034.png',         # T hacia izquierda
+    'road_t_right': 'tile_0026.png',        # T hacia derecha
+    
+    # Edificios
+    'brick_wall': 'tile_0011.png',
+    'tree_trunk': 'tile_0012.png',
+    'roof_red': 'tile_0040.png',
+    'roof_blue': 'tile_0041.png',
+    'window': 'tile_0050.png',
+    'door': 'tile_0051.png',
+    
+    # Agua
+    'water': 'tile_0021.png',
+    'water_deep': 'tile_0022.png',
+    
+    # Aceras
+    'sidewalk': 'tile_0007.png',
+    'sidewalk_corner': 'tile_0017.png'
+}
+
+
+# Colores de los sprites de respaldo (y del minimapa si no hay sprite)
+FALLBACK_COLORS = {
+    # Terrenos
+    'grass': (34, 139, 34),
+    'stone_light': (160, 160, 160),
+    'stone_dark': (96, 96, 96),
+    'cobblestone': (112, 112, 112),
+    'dirt': (139, 69, 19),
+    'sand': (238, 203, 173),
+    
+    # Carreteras - gris oscuro
+    'road_straight_h': (64, 64, 64),
+    'road_straight_v': (64, 64, 64),
+    'road_corner_tl': (64, 64, 64),
+    'road_corner_tr': (64, 64, 64),
+    'road_corner_bl': (64, 64, 64),
+    'road_corner_br': (64, 64, 64),
+    'road_intersection': (64, 64, 64),
+    'road_t_up': (64, 64, 64),
+    'road_t_down': (64, 64, 64),
+    'road_t_left': (64, 64, 64),
+    'road_t_right': (64, 64, 64),
+    
+    # Aceras
+    'sidewalk': (192, 192, 192),
+    'sidewalk_corner': (192, 192, 192),
+    
+    # Edificios
+    'brick_wall': (139, 69, 19),
+    'tree_trunk': (101, 67, 33),
+    'roof_red': (178, 34, 34),
+    'roof_blue': (70, 130, 180),
+    'window': (135, 206, 235),
+    'door': (160, 82, 45),
+    
+    # Agua
+    'water': (30, 144, 255),
+    'water_deep': (0, 100, 200)
+}
+
 
 class SpriteManager:
     """Gestor de sprites para el juego"""
@@ -8,61 +96,89 @@ class SpriteManager:
     def __init__(self):
         self.sprites = {}
         self.tilesets = {}
-        self.load_all_sprites()
+        self.version = 0      # Cambia con cada add_sprite (replace_sprite solo avisa a los listeners)
+        self.masks = {}       # Máscaras de colisión por nombre de sprite
+        self.rect_masks = {}  # Máscaras llenas por tamaño
+        self.streamer = None
+        self.loaded = False
+        self.missing_assets = []  # Rutas que no se pudieron cargar
+        self.listeners = []       # Avisados con los nombres de cada replace_sprite
     
     def load_all_sprites(self):
-        """Carga todos los sprites disponibles"""
-        self.load_kenney_tiles()
+        """Prepara todos los sprites: respaldos al instante, los de Kenney se cargan con stream_kenney_tiles()
+        
+        Se llama sola la primera vez que se pide un sprite, así importar el
+        módulo no cuesta nada.
+        """
+        self.loaded = True
+        self.create_placeholder_tiles()
         self.create_entity_sprites()
     
+    def ensure_loaded(self):
+        """Carga los sprites de respaldo si todavía no se ha hecho"""
+        if not self.loaded:
+            self.load_all_sprites()
+    
+    def has_kenney_tiles(self):
+        """Comprueba que existe la carpeta de tiles; si no, lo anota una sola vez"""
+        if os.path.isdir(KENNEY_TILES_PATH):
+            return True
+        if KENNEY_TILES_PATH not in self.missing_assets:
+            self.missing_assets.append(KENNEY_TILES_PATH)
+            print(f"⚠️  No se encontró la carpeta de tiles '{KENNEY_TILES_PATH}': se usan sprites de respaldo")
+        return False
+    
     def load_kenney_tiles(self):
         """Carga los tiles de Kenney"""
-        tiles_path = os.path.join("src", "assets", "kenney_rpg-urban-pack", "Tiles")
-        
-        # Mapeo de archivos de tiles a nombres descriptivos
-        tile_mapping = {
-            # Terrenos básicos
-            'grass': 'tile_0000.png',
-            'stone_light': 'tile_0001.png',
-            'stone_dark': 'tile_0002.png',
-            'cobblestone': 'tile_0003.png',
-            'dirt': 'tile_0030.png',
-            'sand': 'tile_0031.png',
-            
-            # Carreteras y calles
-            'road_straight_h': 'tile_0004.png',     # Carretera horizontal
-            'road_straight_v': 'tile_0014.png',     # Carretera vertical
-            'road_corner_tl': 'tile_0005.png',      # Esquina superior izquierda
-            'road_corner_tr': 'tile_0006.png',      # Esquina superior derecha
-            'road_corner_bl': 'tile_0015.png',      # Esquina inferior izquierda
-            'road_corner_br': 'tile_0016.png',      # Esquina inferior derecha
-            'road_intersection': 'tile_0024.png',   # Intersección
-            'road_t_up': 'tile_0025.png',           # T hacia arriba
-            'road_t_down': 'tile_0035.png',         # T hacia abajo
-            'road_t_left': 'tile_0034.png',         # T hacia izquierda
-            'road_t_right': 'tile_0026.png',        # T hacia derecha
-            
-            # Edificios
-            'brick_wall': 'tile_0011.png',
-            'tree_trunk': 'tile_0012.png',
-            'roof_red': 'tile_0040.png',
-            'roof_blue': 'tile_0041.png',
-            'window': 'tile_0050.png',
-            'door': 'tile_0051.png',
-            
-            # Agua
-            'water': 'tile_0021.png',
-            'water_deep': 'tile_0022.png',
-            
-            # Aceras
-            'sidewalk': 'tile_0007.png',
-            'sidewalk_corner': 'tile_0017.png'
-        }
-        
-        for sprite_name, filename in tile_mapping.items():
-            file_path = os.path.join(tiles_path, filename)
+        self.ensure_loaded()
+        if not self.has_kenney_tiles():
+            return
+        for sprite_name, filename in KENNEY_TILE_FILES.items():
+            file_path = os.path.join(KENNEY_TILES_PATH, filename)
             self.load_sprite(sprite_name, file_path, scale=(TILE_SIZE, TILE_SIZE))
     
+    def create_placeholder_tiles(self):
+        """Rellena todos los tiles con sprites de respaldo mientras llegan los reales"""
+        for sprite_name in KENNEY_TILE_FILES:
+            if sprite_name not in self.sprites:
+                self.create_fallback_sprite(sprite_name, (TILE_SIZE, TILE_SIZE))
+    
+    def stream_kenney_tiles(self, workers=2):
+        """Empieza a cargar los tiles de Kenney en segundo plano.
+        
+        Hay que llamar a update_streaming() cada frame para que vayan
+        sustituyendo a los sprites de respaldo.
+        """
+        self.ensure_loaded()
+        if not self.has_kenney_tiles():
+            return
+        if self.streamer is None:
+            self.streamer = AssetStreamer(workers)
+        for sprite_name, filename in KENNEY_TILE_FILES.items():
+            file_path = os.path.join(KENNEY_TILES_PATH, filename)
+            self.streamer.request(sprite_name, file_path, scale=(TILE_SIZE, TILE_SIZE))
+    
+    def update_streaming(self, budget_ms=2.0):
+        """Finaliza sprites cargados en segundo plano sin pasarse del presupuesto"""
+        if self.streamer is None:
+            return 0
+        loaded = self.streamer.finalize(self._on_streamed_sprite, self._on_stream_error, budget_ms)
+        if self.streamer.done:
+            self.streamer.shutdown()
+            self.streamer = None
+        return loaded
+    
+    def is_streaming(self):
+        """Indica si quedan sprites por llegar"""
+        return self.streamer is not None
+    
+    def _on_streamed_sprite(self, name, surface):
+        self.add_sprite(name, surface)
+    
+    def _on_stream_error(self, name, path, error):
+        self.missing_assets.append(path)
+        print(f"No se pudo cargar el sprite '{name}' desde '{path}': {error}")
+    
     def create_entity_sprites(self):
         """Crea sprites para entidades del juego"""
         # Sprite del jugador (verde con borde)
@@ -72,7 +188,7 @@ class SpriteManager:
         # Añadir una cara simple
         pygame.draw.circle(player_surface, (0, 255, 0), (15, 10), 3)
         pygame.draw.rect(player_surface, (0, 255, 0), (10, 20, 10, 5))
-        self.sprites['player'] = player_surface
+        self.add_sprite('player', player_surface)
         
         # Sprite del enemigo (rojo con borde)
         enemy_surface = pygame.Surface((25, 25), pygame.SRCALPHA)
@@ -83,17 +199,21 @@ class SpriteManager:
         pygame.draw.circle(enemy_surface, (255, 255, 255), (17, 8), 2)
         pygame.draw.circle(enemy_surface, (0, 0, 0), (8, 8), 1)
         pygame.draw.circle(enemy_surface, (0, 0, 0), (17, 8), 1)
-        self.sprites['enemy'] = enemy_surface
+        self.add_sprite('enemy', enemy_surface)
     
     def load_sprite(self, name, path, scale=None):
         """Carga un sprite individual"""
         try:
-            sprite = pygame.image.load(path).convert_alpha()
+            sprite = pygame.image.load(path)
+            # Sin superficie de display (renderer GPU) no se puede convertir
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
             if scale:
                 sprite = pygame.transform.scale(sprite, scale)
-            self.sprites[name] = sprite
+            self.add_sprite(name, sprite)
             return sprite
         except (pygame.error, FileNotFoundError) as e:
+            self.missing_assets.append(path)
             print(f"No se pudo cargar el sprite '{name}' desde '{path}': {e}")
             return self.create_fallback_sprite(name, scale)
     
@@ -102,47 +222,8 @@ class SpriteManager:
         size = scale or (TILE_SIZE, TILE_SIZE)
         surface = pygame.Surface(size)
         
-        # Colores de respaldo basados en el nombre
-        color_map = {
-            # Terrenos
-            'grass': (34, 139, 34),
-            'stone_light': (160, 160, 160),
-            'stone_dark': (96, 96, 96),
-            'cobblestone': (112, 112, 112),
-            'dirt': (139, 69, 19),
-            'sand': (238, 203, 173),
-            
-            # Carreteras - gris oscuro
-            'road_straight_h': (64, 64, 64),
-            'road_straight_v': (64, 64, 64),
-            'road_corner_tl': (64, 64, 64),
-            'road_corner_tr': (64, 64, 64),
-            'road_corner_bl': (64, 64, 64),
-            'road_corner_br': (64, 64, 64),
-            'road_intersection': (64, 64, 64),
-            'road_t_up': (64, 64, 64),
-            'road_t_down': (64, 64, 64),
-            'road_t_left': (64, 64, 64),
-            'road_t_right': (64, 64, 64),
-            
-            # Aceras
-            'sidewalk': (192, 192, 192),
-            'sidewalk_corner': (192, 192, 192),
-            
-            # Edificios
-            'brick_wall': (139, 69, 19),
-            'tree_trunk': (101, 67, 33),
-            'roof_red': (178, 34, 34),
-            'roof_blue': (70, 130, 180),
-            'window': (135, 206, 235),
-            'door': (160, 82, 45),
-            
-            # Agua
-            'water': (30, 144, 255),
-            'water_deep': (0, 100, 200)
-        }
         
-        color = color_map.get(name, (255, 0, 255))  # Magenta como color de error
+        color = FALLBACK_COLORS.get(name, (255, 0, 255))  # Magenta como color de error
         surface.fill(color)
         
         # Añadir patrones específicos para distinguir mejor
@@ -166,21 +247,96 @@ class SpriteManager:
                 pygame.draw.line(surface, (255, 255, 0), (0, size[1]//2), (size[0], size[1]//2), 2)
                 pygame.draw.line(surface, (255, 255, 0), (size[0]//2, 0), (size[0]//2, size[1]), 2)
         
+        elif name in ['water', 'water_deep']:
+            # Olas claras (al desplazar el sprite en la animación parece que corre)
+            wave = tuple(min(255, channel + 60) for channel in color)
+            for j in range(size[1] // 4, size[1], size[1] // 2):
+                pygame.draw.line(surface, wave, (size[0] // 8, j), (size[0] // 2, j), 2)
+
         elif name == 'sidewalk':
             # Patrón de baldosas para aceras
             for i in range(0, size[0], size[0]//4):
                 for j in range(0, size[1], size[1]//4):
                     pygame.draw.rect(surface, (160, 160, 160), (i, j, size[0]//4-1, size[1]//4-1), 1)
         
+        self.add_sprite(name, surface)
+        return surface
+    
+    def add_sprite(self, name, surface):
+        """Registra (o sustituye) un sprite; su máscara se recalculará al pedirla"""
+        self.sprites[name] = surface
+        self.masks.pop(name, None)
+        self.version += 1
+        return surface
+    
+    def add_sprite_listener(self, callback):
+        """Registra callback(nombres) para las sustituciones sueltas de replace_sprite.
+        
+        Los métodos se guardan con referencia débil: un mapa o renderer que
+        desaparece deja de recibir avisos sin tener que darse de baja.
+        """
+        if hasattr(callback, '__self__'):
+            self.listeners.append(weakref.WeakMethod(callback))
+        else:
+            self.listeners.append(lambda: callback)
+    
+    def replace_sprite(self, name, surface):
+        """Sustituye un sprite sin cambiar version: solo se avisa a los listeners.
+        
+        Es lo que usa la recarga en caliente para que cada caché invalide
+        únicamente lo que dependía de ese sprite.
+        """
         self.sprites[name] = surface
+        self.masks.pop(name, None)
+        for ref in list(self.listeners):
+            callback = ref()
+            if callback is not None:
+                callback([name])
+        self.listeners = [ref for ref in self.listeners if ref() is not None]
         return surface
     
+    def reload_sprite(self, name, path, scale=(TILE_SIZE, TILE_SIZE)):
+        """Vuelve a leer un sprite de disco y lo sustituye con replace_sprite (None si falla)"""
+        try:
+            sprite = pygame.image.load(path)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            if scale:
+                sprite = pygame.transform.scale(sprite, scale)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"⚠️  No se pudo recargar el sprite '{name}' desde '{path}': {e}")
+            return None
+        return self.replace_sprite(name, sprite)
+    
+    def get_mask(self, name):
+        """Máscara de colisión del sprite, creada una sola vez y compartida"""
+        mask = self.masks.get(name)
+        if mask is None:
+            sprite = self.get_sprite(name)
+            if sprite is None:
+                return None
+            mask = pygame.mask.from_surface(sprite)
+            self.masks[name] = mask
+        return mask
+    
+    def get_rect_mask(self, size):
+        """Máscara completamente llena de un tamaño dado (para entidades sin sprite)"""
+        size = (int(size[0]), int(size[1]))
+        mask = self.rect_masks.get(size)
+        if mask is None:
+            mask = pygame.mask.Mask(size, fill=True)
+            self.rect_masks[size] = mask
+        return mask
+    
     def get_sprite(self, name):
         """Obtiene un sprite por nombre"""
+        if not self.loaded:
+            self.load_all_sprites()
         return self.sprites.get(name)
     
     def get_all_sprites(self):
         """Obtiene todos los sprites cargados"""
+        self.ensure_loaded()
         return self.sprites.copy()
 
 # Instancia global del gestor de sprites
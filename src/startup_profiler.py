@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Reloj de arranque: este módulo se importa antes que pygame
+_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Mide el tiempo de pared de cada fase del arranque hasta el primer frame.
+
+    Se activa con --trace-startup o con la variable de entorno
+    JAHACK_TRACE_STARTUP=1; desactivado no hace nada.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []  # (nombre, segundos)
+        self.notes = []
+        self._last = _START
+        self.reported = False
+
+    def mark(self, name):
+        """Cierra la fase name: el tiempo desde la marca anterior hasta ahora"""
+        now = time.perf_counter()
+        if self.enabled:
+            self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name):
+        """Mide el bloque como una fase (lo anterior no cuenta)"""
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def note(self, message):
+        """Apunta un problema detectado durante el arranque"""
+        if self.enabled:
+            self.notes.append(message)
+
+    def report(self):
+        """Imprime la tabla de fases (solo la primera vez)"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("⏱️  Arranque (ms):")
+        for name, seconds in self.phases:
+            print(f"   {name:<14}{seconds * 1000:8.1f}")
+        print(f"   {'total':<14}{(time.perf_counter() - _START) * 1000:8.1f}")
+        for message in self.notes:
+            print(f"⚠️  {message}")
+
+
+# Instancia global del perfilador de arranque
+startup_profiler = StartupProfiler(
+    "--trace-startup" in sys.argv or os.environ.get("JAHACK_TRACE_STARTUP") == "1")
@@ -0,0 +1,107 @@
+import os
+import struct
+import numpy as np
+
+# Tipos de registro
+EVENT_POSITION = 0
+EVENT_COLLISION = 1
+EVENT_RESTART = 2
+
+# Entidades
+ENTITY_PLAYER = 0
+ENTITY_ENEMY = 1
+ENTITY_JEEP = 2
+
+# Registro de tamaño fijo (little-endian para que los logs sean portables)
+TELEMETRY_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('time', '<f4'),
+    ('kind', 'u1'),
+    ('entity', 'u1'),
+    ('index', '<u2'),  # Índice del jeep (0 para jugador y enemigo)
+    ('x', '<f4'),
+    ('y', '<f4'),
+])
+
+# Cabecera: firma, versión y tamaño de registro
+TELEMETRY_MAGIC = b'JAHT'
+TELEMETRY_VERSION = 1
+_HEADER = struct.Struct('<4sHH8x')
+HEADER_SIZE = _HEADER.size
+
+
+class TelemetryWriter:
+    """Escribe registros de telemetría en binario a través de un búfer fijo.
+
+    Los registros se copian a un array estructurado preasignado y solo se
+    vuelca al archivo cuando se llena (o al cerrar), así en cada tick no hay
+    más que una asignación de NumPy y ninguna llamada al sistema.
+    """
+
+    def __init__(self, path, buffer_records=8192):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, TELEMETRY_DTYPE.itemsize))
+        self.buffer = np.zeros(buffer_records, dtype=TELEMETRY_DTYPE)
+        self.count = 0
+        self.records_written = 0
+
+    def _reserve(self, n):
+        """Devuelve el trozo del búfer donde caben n registros (vaciándolo si hace falta)"""
+        if self.count + n > len(self.buffer):
+            self.flush()
+            if n > len(self.buffer):
+                self.buffer = np.zeros(n, dtype=TELEMETRY_DTYPE)
+        rows = self.buffer[self.count:self.count + n]
+        self.count += n
+        return rows
+
+    def log_positions(self, tick, time, entity, positions):
+        """Registra las posiciones (N, 2) de varias entidades del mismo tipo"""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        rows = self._reserve(len(positions))
+        rows['tick'] = tick
+        rows['time'] = time
+        rows['kind'] = EVENT_POSITION
+        rows['entity'] = entity
+        rows['index'] = np.arange(len(positions))
+        rows['x'] = positions[:, 0]
+        rows['y'] = positions[:, 1]
+
+    def log_event(self, tick, time, kind, entity, index=0, x=0.0, y=0.0):
+        """Registra un suceso suelto (colisión, reinicio)"""
+        row = self._reserve(1)
+        row[0] = (tick, time, kind, entity, index, x, y)
+
+    def flush(self):
+        """Vuelca al archivo los registros pendientes"""
+        if self.count:
+            self.file.write(memoryview(self.buffer[:self.count]).cast('B'))
+            self.records_written += self.count
+            self.count = 0
+
+    def close(self):
+        """Vuelca lo pendiente y cierra el archivo"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def open_telemetry(path):
+    """Abre un log de telemetría como array estructurado mapeado en memoria (sin copiar).
+
+    Permite filtrar con máscaras de NumPy directamente sobre el archivo, por
+    ejemplo log[log['kind'] == EVENT_RESTART].
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Log de telemetría incompleto: {path}")
+    magic, version, itemsize = _HEADER.unpack(header)
+    if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION or itemsize != TELEMETRY_DTYPE.itemsize:
+        raise ValueError(f"Formato de telemetría no soportado: {path}")
+    # Un registro a medias (sesión interrumpida) se ignora
+    count = (os.path.getsize(path) - HEADER_SIZE) // TELEMETRY_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=TELEMETRY_DTYPE)
+    return np.memmap(path, dtype=TELEMETRY_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
@@ -0,0 +1,171 @@
+import bisect
+import itertools
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+from sprite_manager import sprite_manager
+
+# Tiles animados por defecto: (número de frames, milisegundos por frame).
+# Los frames se generan desplazando el sprite base, como agua que corre.
+ANIMATED_TILES = {
+    'water': (4, 250),
+    'water_deep': (4, 400),
+}
+
+
+class AnimationClock:
+    """Reloj único para todas las animaciones de tiles.
+
+    Todo lo que anima lee el mismo tiempo, así los tiles del mismo tipo
+    cambian de frame a la vez y el mapa sabe exactamente qué celdas repintar.
+    """
+
+    def __init__(self):
+        self.time_ms = 0.0
+        self.speed = 1.0
+        self.paused = False
+
+    def update(self, dt):
+        """Avanza el reloj dt segundos"""
+        if not self.paused:
+            self.time_ms += dt * 1000 * self.speed
+
+
+# Reloj global de animación
+animation_clock = AnimationClock()
+
+
+class TileAnimation:
+    """Secuencia de frames precalculada de un tipo de tile.
+
+    frames son nombres de sprite del sprite_manager y durations los
+    milisegundos de cada uno; frame_index busca en los finales acumulados.
+    """
+
+    def __init__(self, frames, durations):
+        if not frames or len(frames) != len(durations):
+            raise ValueError("Una animación necesita un frame por duración")
+        self.frames = list(frames)
+        self.durations = list(durations)
+        self.ends = list(itertools.accumulate(self.durations))
+        self.total = self.ends[-1]
+
+    def frame_index(self, time_ms):
+        """Frame que toca en ese instante"""
+        return bisect.bisect_right(self.ends, time_ms % self.total)
+
+    def frame_name(self, time_ms):
+        return self.frames[self.frame_index(time_ms)]
+
+
+def scrolling_frames(name, count, register=None):
+    """Genera count frames del sprite name desplazado en horizontal (con vuelta).
+
+    Se registran en el sprite_manager como 'name#i' (con register, por
+    defecto add_sprite) y se devuelven sus nombres.
+    """
+    register = register or sprite_manager.add_sprite
+    base = sprite_manager.get_sprite(name)
+    names = []
+    for index in range(count):
+        frame_name = f"{name}#{index}"
+        if base is not None:
+            width = base.get_width()
+            offset = width * index // count
+            frame = base.copy()
+            frame.blit(base, (offset, 0))
+            frame.blit(base, (offset - width, 0))
+            register(frame_name, frame)
+        names.append(frame_name)
+    return names
+
+
+class TileAnimations:
+    """Registro de las animaciones por tipo de tile.
+
+    Las generadas (ANIMATED_TILES) se rehacen si cambian los sprites del
+    sprite_manager (p. ej. al llegar los tiles reales); las de Tiled se
+    añaden tal cual con add().
+    """
+
+    def __init__(self, specs=ANIMATED_TILES):
+        self.specs = dict(specs)
+        self.animations = {}
+        self._version = None
+
+    def is_animated(self, tile_type):
+        return tile_type in self.specs or tile_type in self.animations
+
+    def add(self, tile_type, animation):
+        """Registra una animación con frames ya existentes"""
+        self.specs.pop(tile_type, None)
+        self.animations[tile_type] = animation
+
+    def refresh(self):
+        """Regenera los frames desplazados si los sprites base han cambiado"""
+        if self._version == sprite_manager.version:
+            return
+        for tile_type, (count, duration) in self.specs.items():
+            self.animations[tile_type] = TileAnimation(scrolling_frames(tile_type, count), [duration] * count)
+        self._version = sprite_manager.version
+
+    def on_sprites_changed(self, names):
+        """Recarga en caliente: rehace solo los frames de los tiles base cambiados"""
+        if self._version != sprite_manager.version:
+            return
+        for name in names:
+            if name in self.specs:
+                count, duration = self.specs[name]
+                frames = scrolling_frames(name, count, sprite_manager.replace_sprite)
+                self.animations[name] = TileAnimation(frames, [duration] * count)
+
+    def get(self, tile_type):
+        """Animación del tipo de tile (None si es estático)"""
+        if not self.is_animated(tile_type):
+            return None
+        self.refresh()
+        return self.animations.get(tile_type)
+
+
+# Registro global de animaciones de tiles
+tile_animations = TileAnimations()
+sprite_manager.add_sprite_listener(tile_animations.on_sprites_changed)
+
+
+def read_tileset(path):
+    """Lee un tileset de Tiled (.tsx o .tsj/.json) a un diccionario con 'tiles'.
+
+    De cada tile solo interesan 'id' y 'animation' ([{'tileid', 'duration'}]).
+    """
+    if os.path.splitext(path)[1].lower() != '.tsx':
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    root = ElementTree.parse(path).getroot()
+    tiles = []
+    for tile in root.iter('tile'):
+        animation = tile.find('animation')
+        if animation is None:
+            continue
+        tiles.append({
+            'id': int(tile.get('id')),
+            'animation': [{'tileid': int(frame.get('tileid')), 'duration': int(frame.get('duration'))}
+                          for frame in animation.iter('frame')],
+        })
+    return {'name': root.get('name'), 'tiles': tiles}
+
+
+def tiled_animations(tileset, tile_names):
+    """Animaciones definidas en un tileset de Tiled.
+
+    tile_names traduce ids locales del tileset a nombres de sprite; los
+    frames sin nombre conocido se saltan. Devuelve {tipo de tile: TileAnimation}.
+    """
+    animations = {}
+    for tile in tileset.get('tiles', []):
+        name = tile_names.get(tile['id'])
+        frames = [(tile_names.get(frame['tileid']), frame['duration']) for frame in tile.get('animation', [])]
+        frames = [(frame, duration) for frame, duration in frames if frame is not None]
+        if name is None or not frames:
+            continue
+        animations[name] = TileAnimation([frame for frame, _ in frames], [duration for _, duration in frames])
+    return animations
@@ -0,0 +1,263 @@
+import os
+import pygame
+from settings import TILE_SIZE
+from tilemap import TILE_PALETTE
+from tiled_map import save_tmj
+from autotile import ROAD_TILES
+
+# Pasos de deshacer que se guardan (un trazo entero cuenta como uno)
+EDITOR_UNDO_LIMIT = 200
+
+# Tamaño máximo del pincel (lado del cuadrado, en tiles)
+EDITOR_MAX_BRUSH = 7
+
+# Archivo donde se guarda un mapa que no venía de un .tmj
+EDITOR_DEFAULT_PATH = 'mapa_editado.tmj'
+
+
+def line_cells(start, end):
+    """Celdas (fila, col) de la recta entre dos celdas (Bresenham), ambas incluidas.
+
+    Sirve para que un trazo rápido del ratón no deje huecos entre dos eventos.
+    """
+    row, col = start
+    end_row, end_col = end
+    d_col = abs(end_col - col)
+    d_row = -abs(end_row - row)
+    step_col = 1 if col < end_col else -1
+    step_row = 1 if row < end_row else -1
+    error = d_col + d_row
+    cells = [(row, col)]
+    while (row, col) != (end_row, end_col):
+        double = 2 * error
+        if double >= d_row:
+            error += d_row
+            col += step_col
+        if double <= d_col:
+            error += d_col
+            row += step_row
+        cells.append((row, col))
+    return cells
+
+
+def editor_palette():
+    """Tiles que se pueden pintar; las carreteras son una sola entrada (el autotile elige la pieza)"""
+    palette = [tile_type for tile_type in TILE_PALETTE if tile_type not in ROAD_TILES]
+    palette.insert(palette.index('door') + 1, 'road_straight_h')
+    return palette
+
+
+class TileEditor:
+    """Editor de tiles y jeeps sobre un TileMap con deshacer/rehacer.
+
+    Cada edición pasa por TileMap.paint_tiles/write_tiles/add_jeep/remove_jeep,
+    que solo avisan de las celdas tocadas: la capa estática, las rejillas
+    de caminabilidad, la conectividad, los campos de distancia y el índice
+    de colisión de jeeps se actualizan por celda, nunca enteros. Un trazo
+    del ratón es un único paso de deshacer con el tile anterior de cada
+    celda cambiada (vecinas re-autotileadas incluidas).
+    """
+
+    def __init__(self, tilemap, palette=None, undo_limit=EDITOR_UNDO_LIMIT):
+        self.tilemap = tilemap
+        self.palette = palette or editor_palette()
+        self.brush_index = 0
+        self.brush_size = 1
+        self.undo_limit = undo_limit
+        self.undo_stack = []
+        self.redo_stack = []
+        self.modified = False
+        self._stroke = None      # {celda: tile anterior} del trazo en curso
+        self._last_cell = None
+
+    @property
+    def brush(self):
+        return self.palette[self.brush_index]
+
+    def select_brush(self, index):
+        self.brush_index = index % len(self.palette)
+
+    def set_tilemap(self, tilemap):
+        """Cambia de mapa (p. ej. tras recargarlo); el historial ya no vale"""
+        self.end_stroke()
+        self.tilemap = tilemap
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.modified = False
+
+    def cell_at(self, x, y):
+        """Celda (fila, col) bajo un punto en píxeles del mapa, o None si cae fuera"""
+        row = int(y // self.tilemap.tile_size)
+        col = int(x // self.tilemap.tile_size)
+        if 0 <= row < len(self.tilemap.map_data) and 0 <= col < len(self.tilemap.map_data[0]):
+            return (row, col)
+        return None
+
+    def _brush_cells(self, cells):
+        """Amplía las celdas al cuadrado del pincel, sin salirse del mapa"""
+        if self.brush_size == 1:
+            return cells
+        rows = len(self.tilemap.map_data)
+        cols = len(self.tilemap.map_data[0])
+        low = (self.brush_size - 1) // 2
+        high = self.brush_size // 2
+        covered = {}
+        for row, col in cells:
+            for r in range(max(0, row - low), min(rows, row + high + 1)):
+                for c in range(max(0, col - low), min(cols, col + high + 1)):
+                    covered[(r, c)] = None
+        return list(covered)
+
+    # --- Trazos ---
+
+    def begin_stroke(self, x, y):
+        self.end_stroke()
+        self._stroke = {}
+        self._last_cell = None
+        self.continue_stroke(x, y)
+
+    def continue_stroke(self, x, y):
+        """Pinta desde la última celda del trazo hasta la del punto"""
+        if self._stroke is None:
+            return
+        cell = self.cell_at(x, y)
+        if cell is None or cell == self._last_cell:
+            return
+        cells = line_cells(self._last_cell, cell) if self._last_cell else [cell]
+        self._last_cell = cell
+        previous = self.tilemap.paint_tiles(self._brush_cells(cells), self.brush)
+        for changed, old_type in previous.items():
+            self._stroke.setdefault(changed, old_type)
+
+    def end_stroke(self):
+        """Cierra el trazo como un paso de deshacer"""
+        stroke, self._stroke = self._stroke, None
+        self._last_cell = None
+        if not stroke:
+            return
+        map_data = self.tilemap.map_data
+        after = {(row, col): map_data[row][col] for row, col in stroke}
+        before = {cell: old_type for cell, old_type in stroke.items() if after[cell] != old_type}
+        if before:
+            self._push(('tiles', before, {cell: after[cell] for cell in before}))
+
+    # --- Jeeps ---
+
+    def toggle_jeep(self, x, y):
+        """Quita el jeep bajo el punto o pone uno alineado a la rejilla"""
+        self.end_stroke()
+        jeep = self.tilemap.jeep_at(x, y)
+        if jeep is not None:
+            position = jeep.rect.topleft
+            self.tilemap.remove_jeep(jeep)
+            self._push(('remove_jeep', position))
+            return
+        cell = self.cell_at(x, y)
+        if cell is None or cell[1] + 2 > len(self.tilemap.map_data[0]):
+            return
+        position = (cell[1] * TILE_SIZE, cell[0] * TILE_SIZE)
+        self.tilemap.add_jeep(*position)
+        self._push(('add_jeep', position))
+
+    def _jeep_at_position(self, position):
+        for jeep in self.tilemap.jeeps:
+            if jeep.rect.topleft == position:
+                return jeep
+        return None
+
+    # --- Deshacer / rehacer ---
+
+    def _push(self, action):
+        self.undo_stack.append(action)
+        if len(self.undo_stack) > self.undo_limit:
+            del self.undo_stack[0]
+        self.redo_stack.clear()
+        self.modified = True
+
+    def _apply(self, action, undo):
+        kind = action[0]
+        if kind == 'tiles':
+            self.tilemap.write_tiles(action[1] if undo else action[2])
+        elif (kind == 'add_jeep') == undo:
+            jeep = self._jeep_at_position(action[1])
+            if jeep is not None:
+                self.tilemap.remove_jeep(jeep)
+        else:
+            self.tilemap.add_jeep(*action[1])
+        self.modified = True
+
+    def undo(self):
+        self.end_stroke()
+        if not self.undo_stack:
+            return False
+        action = self.undo_stack.pop()
+        self._apply(action, undo=True)
+        self.redo_stack.append(action)
+        return True
+
+    def redo(self):
+        self.end_stroke()
+        if not self.redo_stack:
+            return False
+        action = self.redo_stack.pop()
+        self._apply(action, undo=False)
+        self.undo_stack.append(action)
+        return True
+
+    # --- Guardado ---
+
+    def save(self, path=None):
+        """Guarda el mapa y sus jeeps en .tmj; devuelve la ruta usada"""
+        self.end_stroke()
+        path = path or self.tilemap.map_path or EDITOR_DEFAULT_PATH
+        save_tmj(path, self.tilemap.map_data, [jeep.rect.topleft for jeep in self.tilemap.jeeps], TILE_PALETTE)
+        self.tilemap.map_path = path
+        self.modified = False
+        print(f"💾 Mapa guardado en {os.path.abspath(path)}")
+        return path
+
+    # --- Entrada ---
+
+    def handle_event(self, event):
+        """Procesa un evento de pygame; devuelve True si era del editor.
+
+        Ratón izquierdo pinta, derecho pone/quita jeeps, la rueda o 1-9
+        cambian de tile, [ y ] el tamaño del pincel, Ctrl+Z/Ctrl+Y
+        deshacen/rehacen y Ctrl+S guarda.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                self.begin_stroke(*event.pos)
+            elif event.button == 3:
+                self.toggle_jeep(*event.pos)
+            elif event.button in (4, 5):
+                self.select_brush(self.brush_index + (1 if event.button == 5 else -1))
+            else:
+                return False
+            return True
+        if event.type == pygame.MOUSEMOTION and self._stroke is not None:
+            self.continue_stroke(*event.pos)
+            return True
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.end_stroke()
+            return True
+        if event.type != pygame.KEYDOWN:
+            return False
+        ctrl = event.mod & pygame.KMOD_CTRL
+        if ctrl and event.key == pygame.K_z:
+            self.undo()
+        elif ctrl and event.key == pygame.K_y:
+            self.redo()
+        elif ctrl and event.key == pygame.K_s:
+            self.save()
+        elif event.key == pygame.K_j:
+            self.toggle_jeep(*pygame.mouse.get_pos())
+        elif event.key == pygame.K_LEFTBRACKET:
+            self.brush_size = max(1, self.brush_size - 1)
+        elif event.key == pygame.K_RIGHTBRACKET:
+            self.brush_size = min(EDITOR_MAX_BRUSH, self.brush_size + 1)
+        elif pygame.K_1 <= event.key <= pygame.K_9:
+            self.select_brush(event.key - pygame.K_1)
+        else:
+            return False
+        return True
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from settings import TILE_SIZE, ORIGINAL_TILE_SIZE
+from sprite_manager import KENNEY_TILE_FILES, KENNEY_TILES_PATH
+
+# Los 3 bits altos del gid son las banderas de volteo de Tiled
+GID_MASK = 0x1FFFFFFF
+
+# Tile que se usa para los gids que no se sabe traducir
+UNKNOWN_TILE = 'grass'
+
+# Nombre de la capa de objetos con los jeeps
+JEEP_LAYER = 'jeeps'
+
+# Índice dentro de la hoja de Kenney -> nombre de tile (tile_0051.png -> 51)
+KENNEY_TILE_NAMES = {int(filename[5:9]): name for name, filename in KENNEY_TILE_FILES.items()}
+
+
+def _tile_name(tile):
+    """Nombre de tile guardado en un tile de un tileset ('type', 'class' o propiedad 'name')"""
+    for prop in tile.get('properties', []):
+        if prop.get('name') == 'name':
+            return prop.get('value')
+    return tile.get('type') or tile.get('class')
+
+
+def _read_tileset_names(path):
+    """Ids locales -> nombres de un tileset externo (.tsx o .tsj); vacío si no existe"""
+    if not os.path.exists(path):
+        return {}
+    if os.path.splitext(path)[1].lower() != '.tsx':
+        with open(path, encoding='utf-8') as file:
+            tileset = json.load(file)
+        return {tile['id']: _tile_name(tile) for tile in tileset.get('tiles', []) if _tile_name(tile)}
+    names = {}
+    for tile in ElementTree.parse(path).getroot().iter('tile'):
+        name = tile.get('type') or tile.get('class')
+        for prop in tile.iter('property'):
+            if prop.get('name') == 'name':
+                name = prop.get('value')
+        if name:
+            names[int(tile.get('id'))] = name
+    return names
+
+
+def _gid_names(data, base_dir):
+    """Lista de (firstgid, {id local: nombre}) ordenada de mayor a menor firstgid"""
+    tilesets = []
+    for tileset in data.get('tilesets', []):
+        if 'source' in tileset:
+            names = _read_tileset_names(os.path.join(base_dir, tileset['source']))
+        else:
+            names = {tile['id']: _tile_name(tile) for tile in tileset.get('tiles', []) if _tile_name(tile)}
+        tilesets.append((tileset.get('firstgid', 1), names))
+    tilesets.sort(key=lambda item: item[0], reverse=True)
+    return tilesets
+
+
+def load_tmj(path, known_tiles=None):
+    """Lee un mapa de Tiled en JSON (.tmj).
+
+    Devuelve (map_data, jeep_positions): la primera capa de tiles traducida
+    a nombres de tile y las esquinas en píxeles (a TILE_SIZE) de los
+    objetos de la capa 'jeeps'. Los ids se traducen con el nombre guardado
+    en el tileset y, si no lo hay, con la numeración de la hoja de Kenney;
+    lo que no se reconoce se carga como UNKNOWN_TILE. Con known_tiles, los
+    nombres que no estén ahí también (la paleta del TileMap no crece con
+    cada mapa que se carga).
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    width = data['width']
+    height = data['height']
+    scale = TILE_SIZE / data.get('tilewidth', TILE_SIZE)
+    tilesets = _gid_names(data, os.path.dirname(os.path.abspath(path)))
+
+    names = {}
+    unknown = set()
+
+    def name_for(gid):
+        gid &= GID_MASK
+        if gid == 0:
+            return UNKNOWN_TILE
+        if gid not in names:
+            name = None
+            for firstgid, tileset_names in tilesets:
+                if gid >= firstgid:
+                    local_id = gid - firstgid
+                    name = tileset_names.get(local_id) or KENNEY_TILE_NAMES.get(local_id)
+                    break
+            if name is None or (known_tiles is not None and name not in known_tiles):
+                unknown.add(gid)
+                name = UNKNOWN_TILE
+            names[gid] = name
+        return names[gid]
+
+    map_data = None
+    jeep_positions = []
+    for layer in data.get('layers', []):
+        if layer.get('type') == 'tilelayer' and map_data is None:
+            cells = layer['data']
+            if len(cells) != width * height:
+                raise ValueError(f"La capa '{layer.get('name')}' tiene {len(cells)} tiles y el mapa {width}x{height}")
+            map_data = [[name_for(cells[row * width + col]) for col in range(width)] for row in range(height)]
+        elif layer.get('type') == 'objectgroup' and layer.get('name') == JEEP_LAYER:
+            jeep_positions = [(round(obj['x'] * scale), round(obj['y'] * scale)) for obj in layer.get('objects', [])]
+    if map_data is None:
+        raise ValueError(f"El mapa '{path}' no tiene ninguna capa de tiles")
+    if unknown:
+        print(f"⚠️  {os.path.basename(path)}: {len(unknown)} ids de tile sin nombre conocido, se cargan como '{UNKNOWN_TILE}'")
+    return map_data, jeep_positions
+
+
+def save_tmj(path, map_data, jeep_positions=(), tile_names=None):
+    """Guarda un mapa en JSON de Tiled (.tmj) que load_tmj vuelve a leer igual.
+
+    El tileset va incrustado como colección de imágenes: cada tile lleva su
+    nombre en 'type' y, si existe, la ruta al PNG de Kenney. tile_names fija
+    el orden de los ids (p. ej. la paleta del TileMap); los tiles que no
+    estén se añaden al final. Se escribe en un temporal y se renombra para
+    que la recarga en caliente nunca lea un archivo a medias.
+    """
+    names = list(tile_names or [])
+    for row in map_data:
+        for tile_type in row:
+            if tile_type not in names:
+                names.append(tile_type)
+    gids = {tile_type: index + 1 for index, tile_type in enumerate(names)}
+    height = len(map_data)
+    width = len(map_data[0]) if height else 0
+    base_dir = os.path.dirname(os.path.abspath(path))
+    scale = ORIGINAL_TILE_SIZE / TILE_SIZE
+
+    tiles = []
+    for index, tile_type in enumerate(names):
+        tile = {'id': index, 'type': tile_type}
+        filename = KENNEY_TILE_FILES.get(tile_type)
+        if filename is not None:
+            image = os.path.join(KENNEY_TILES_PATH, filename)
+            tile.update(image=os.path.relpath(image, base_dir).replace(os.sep, '/'),
+                        imagewidth=ORIGINAL_TILE_SIZE, imageheight=ORIGINAL_TILE_SIZE)
+        tiles.append(tile)
+
+    data = {
+        'type': 'map', 'version': '1.10', 'orientation': 'orthogonal', 'renderorder': 'right-down',
+        'width': width, 'height': height, 'infinite': False,
+        'tilewidth': ORIGINAL_TILE_SIZE, 'tileheight': ORIGINAL_TILE_SIZE,
+        'nextlayerid': 3, 'nextobjectid': len(jeep_positions) + 1,
+        'tilesets': [{
+            'firstgid': 1, 'name': 'jahackathon', 'tilecount': len(names), 'columns': 0,
+            'tilewidth': ORIGINAL_TILE_SIZE, 'tileheight': ORIGINAL_TILE_SIZE, 'tiles': tiles,
+        }],
+        'layers': [
+            {'id': 1, 'name': 'tiles', 'type': 'tilelayer', 'x': 0, 'y': 0, 'width': width, 'height': height,
+             'opacity': 1, 'visible': True, 'data': [gids[tile_type] for row in map_data for tile_type in row]},
+            {'id': 2, 'name': JEEP_LAYER, 'type': 'objectgroup', 'draworder': 'topdown',
+             'opacity': 1, 'visible': True, 'objects': [
+                 {'id': index + 1, 'name': '', 'type': 'jeep', 'x': x * scale, 'y': y * scale,
+                  'width': 2 * ORIGINAL_TILE_SIZE, 'height': ORIGINAL_TILE_SIZE, 'rotation': 0, 'visible': True}
+                 for index, (x, y) in enumerate(jeep_positions)]},
+        ],
+    }
+    fd, temp_path = tempfile.mkstemp(suffix='.tmj', dir=base_dir)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
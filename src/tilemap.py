@@ -1,15 +1,114 @@
+import itertools
+import numpy as np
 import pygame
 import os
 from settings import WIDTH, HEIGHT, TILE_SIZE
 from sprite_manager import sprite_manager
 from jeep import Jeep
+from ecs import World, COLLIDER_DAMAGE, collision_system
+from pool import Pool, rect_pool
+from tile_animation import animation_clock, tile_animations
+from tiled_map import load_tmj
+from sweep import sweep_boxes
+from distance_field import DistanceField, influence_map
+from connectivity import ConnectivityIndex, NO_COMPONENT
+from autotile import autotile_roads, update_autotile_at, border_mask, is_road, ROAD_TILES
+
+# Propiedades de cada tipo de tile
+TILE_PROPERTIES = {
+    # Terrenos básicos
+    'grass': {'walkable': True, 'speed_modifier': 1.0},
+    'stone_light': {'walkable': True, 'speed_modifier': 1.0},
+    'stone_dark': {'walkable': True, 'speed_modifier': 1.0},
+    'cobblestone': {'walkable': True, 'speed_modifier': 1.1},
+    'dirt': {'walkable': True, 'speed_modifier': 0.8},
+    'sand': {'walkable': True, 'speed_modifier': 0.7},
+    'door': {'walkable': True, 'speed_modifier': 1.0},
+    
+    # Carreteras - velocidad alta
+    'road_straight_h': {'walkable': True, 'speed_modifier': 1.3},
+    'road_straight_v': {'walkable': True, 'speed_modifier': 1.3},
+    'road_corner_tl': {'walkable': True, 'speed_modifier': 1.2},
+    'road_corner_tr': {'walkable': True, 'speed_modifier': 1.2},
+    'road_corner_bl': {'walkable': True, 'speed_modifier': 1.2},
+    'road_corner_br': {'walkable': True, 'speed_modifier': 1.2},
+    'road_intersection': {'walkable': True, 'speed_modifier': 1.2},
+    'road_t_up': {'walkable': True, 'speed_modifier': 1.2},
+    'road_t_down': {'walkable': True, 'speed_modifier': 1.2},
+    'road_t_left': {'walkable': True, 'speed_modifier': 1.2},
+    'road_t_right': {'walkable': True, 'speed_modifier': 1.2},
+    
+    # Aceras
+    'sidewalk': {'walkable': True, 'speed_modifier': 1.1},
+    'sidewalk_corner': {'walkable': True, 'speed_modifier': 1.1},
+    
+    # No caminables
+    'brick_wall': {'walkable': False, 'speed_modifier': 0.0},
+    'tree_trunk': {'walkable': False, 'speed_modifier': 0.0},
+    'water': {'walkable': False, 'speed_modifier': 0.0},
+    'water_deep': {'walkable': False, 'speed_modifier': 0.0},
+    'roof_red': {'walkable': False, 'speed_modifier': 0.0},
+    'roof_blue': {'walkable': False, 'speed_modifier': 0.0},
+    'window': {'walkable': False, 'speed_modifier': 0.0}
+}
+
+DEFAULT_TILE_PROPERTIES = {'walkable': True, 'speed_modifier': 1.0}
+
+# Paleta estable de ids de tile (uint8) para guardar el mapa en arrays
+TILE_PALETTE = list(TILE_PROPERTIES)
+TILE_IDS = {tile_type: index for index, tile_type in enumerate(TILE_PALETTE)}
+
+# Cada contenido distinto del mapa recibe una versión única (entre todos los mapas)
+_tile_versions = itertools.count()
+
+# Tiles que cuentan como refugio para quien huye
+SAFE_ZONE_TILES = {'door'}
+
+# Coste (en tiles de velocidad normal) hasta el que se nota el peligro de un jeep
+JEEP_DANGER_RADIUS = 3.0
+
+
+def tile_id(tile_type):
+    """Id de paleta de un tipo de tile (los desconocidos se añaden al final, hasta 256)"""
+    index = TILE_IDS.get(tile_type)
+    if index is None:
+        index = len(TILE_PALETTE)
+        if index > np.iinfo(np.uint8).max:
+            raise ValueError(f"No caben más tipos de tile en la paleta ({index}): '{tile_type}' no tiene id")
+        TILE_PALETTE.append(tile_type)
+        TILE_IDS[tile_type] = index
+    return index
 
 class TileMap:
-    def __init__(self):
+    def __init__(self, generator=None, chunks=(2, 2), origin_chunk=(0, 0), map_path=None):
         self.tile_size = TILE_SIZE
         self.map_data = []
         self.jeeps = []  # Lista de jeeps en el mapa
-        self.create_urban_map_with_roads()
+        self.walkable_grid = []  # Caminabilidad por tile (solo terreno)
+        self.speed_grid = []     # speed_modifier por tile
+        self.world = World()     # Entidades que viven en este mapa
+        self.change_listeners = []  # Se llaman con la lista de celdas cambiadas
+        self._jeep_by_id = {}
+        self._jeep_cells = None  # Caché de jeep_cells (los jeeps solo se mueven al colocarlos)
+        self.jeep_pool = Pool('jeeps', lambda x, y: Jeep(x, y, self.world), reset=Jeep.spawn, on_release=Jeep.despawn)
+        self.static_layer = None    # Mapa ya dibujado (se repinta por celdas)
+        self._static_version = None
+        self._dirty_cells = set()
+        self._animated_cells = {}   # Tipo de tile animado -> celdas con ese tile
+        self._shown_frames = {}     # Tipo de tile animado -> frame pintado en la capa estática
+        self.distance_fields = {}   # Campos de distancia cacheados por nombre
+        self._safe_cells = set()
+        self.map_path = map_path
+        if map_path is not None:
+            self.map_data, jeep_positions = load_tmj(map_path, TILE_PROPERTIES)
+            self.place_jeeps(jeep_positions)
+        elif generator is not None:
+            self.load_generated_area(generator, origin_chunk, chunks)
+        else:
+            self.create_urban_map_with_roads()
+        self.rebuild_grids()
+        self.connectivity = ConnectivityIndex(self)  # Qué celdas se alcanzan entre sí
+        sprite_manager.add_sprite_listener(self._on_sprites_changed)
     
     def create_urban_map_with_roads(self):
         """Crea un mapa urbano con carreteras y jeeps como obstáculos"""
@@ -26,6 +125,9 @@ class TileMap:
                 if row == 0 or row == rows-1 or col == 0 or col == cols-1:
                     self.map_data[row][col] = 'brick_wall'
         
+        # Las carreteras se trazan sin preocuparse del tipo de tramo:
+        # autotile_roads elige rectas, esquinas, T e intersecciones al final
+        
         # Carretera principal horizontal en el centro
         road_row = rows // 2
         for col in range(1, cols-1):
@@ -34,24 +136,13 @@ class TileMap:
         # Carretera vertical que cruza la horizontal
         road_col = cols // 2
         for row in range(1, rows-1):
-            if row != road_row:  # No sobrescribir la intersección
-                self.map_data[row][road_col] = 'road_straight_v'
-        
-        # Intersección en el centro
-        self.map_data[road_row][road_col] = 'road_intersection'
+            self.map_data[row][road_col] = 'road_straight_v'
         
         # Carretera secundaria horizontal en la parte superior
         secondary_road_row = 3
         for col in range(1, cols//2):
             self.map_data[secondary_road_row][col] = 'road_straight_h'
         
-        # Conectar carretera secundaria con la principal
-        for row in range(secondary_road_row + 1, road_row):
-            self.map_data[row][cols//2] = 'road_straight_v'
-        
-        # T-junction para conectar carretera secundaria
-        self.map_data[secondary_road_row][cols//2] = 'road_t_down'
-        
         # Carretera en L en la esquina inferior derecha
         corner_start_row = rows - 4
         corner_start_col = cols - 8
@@ -64,10 +155,7 @@ class TileMap:
         for row in range(corner_start_row + 1, rows-1):
             self.map_data[row][corner_start_col] = 'road_straight_v'
         
-        # Esquina de la L
-        self.map_data[corner_start_row][corner_start_col] = 'road_corner_bl'
-        
-        # Aceras junto a las carreteras principales
+        # Aceras junto a las carreteras
         self.add_sidewalks(road_row, road_col, rows, cols)
         
         # Edificios y estructuras
@@ -76,24 +164,35 @@ class TileMap:
         # Añadir algunos árboles en zonas verdes
         self.add_trees(rows, cols)
         
+        # Tramos correctos según los vecinos de cada carretera
+        autotile_roads(self.map_data)
+        
         # Colocar jeeps como obstáculos de daño
         self.place_jeeps()
     
-    def add_sidewalks(self, road_row, road_col, rows, cols):
-        """Añade aceras junto a las carreteras"""
-        # Aceras horizontales
-        for col in range(1, cols-1):
-            if road_row - 1 > 0:
-                self.map_data[road_row - 1][col] = 'sidewalk'
-            if road_row + 1 < rows-1:
-                self.map_data[road_row + 1][col] = 'sidewalk'
+    def load_generated_area(self, generator, origin_chunk, chunks):
+        """Construye el mapa juntando chunks de un CityGenerator"""
+        origin_cx, origin_cy = origin_chunk
+        chunks_w, chunks_h = chunks
+        size = generator.chunk_size
+        self.map_data = [[] for _ in range(chunks_h * size)]
+        jeep_positions = []
         
-        # Aceras verticales
-        for row in range(1, rows-1):
-            if road_col - 1 > 0 and self.map_data[row][road_col - 1] == 'grass':
-                self.map_data[row][road_col - 1] = 'sidewalk'
-            if road_col + 1 < cols-1 and self.map_data[row][road_col + 1] == 'grass':
-                self.map_data[row][road_col + 1] = 'sidewalk'
+        for chunk in generator.iter_chunks(origin_cx, origin_cy, origin_cx + chunks_w, origin_cy + chunks_h):
+            base_row = (chunk.cy - origin_cy) * size
+            for row_offset, tiles in enumerate(chunk.tiles):
+                self.map_data[base_row + row_offset].extend(tiles)
+            for jx, jy in chunk.jeeps:
+                jeep_positions.append(((jx - origin_cx * size) * TILE_SIZE,
+                                       (jy - origin_cy * size) * TILE_SIZE))
+        
+        self.place_jeeps(jeep_positions)
+    
+    def add_sidewalks(self, road_row, road_col, rows, cols):
+        """Añade aceras en el césped que toca las carreteras"""
+        sidewalk = border_mask(self.map_data, {'grass'}, ROAD_TILES)
+        for row, col in zip(*np.nonzero(sidewalk)):
+            self.map_data[row][col] = 'sidewalk'
     
     def add_buildings(self, rows, cols):
         """Añade edificios al mapa"""
@@ -134,44 +233,290 @@ class TileMap:
                 self.map_data[row][col] == 'grass'):
                 self.map_data[row][col] = 'tree_trunk'
     
-    def place_jeeps(self):
+    def place_jeeps(self, jeep_positions=None):
         """Coloca jeeps como obstáculos de daño en el mapa"""
-        # Posiciones estratégicas para los jeeps
-        jeep_positions = [
-            (TILE_SIZE * 8, TILE_SIZE * 6),    # Zona media-izquierda
-            (TILE_SIZE * 15, TILE_SIZE * 4),   # Zona superior-derecha
-            (TILE_SIZE * 12, TILE_SIZE * 12),  # Zona inferior-centro
-            (TILE_SIZE * 5, TILE_SIZE * 10),   # Zona inferior-izquierda
-        ]
+        if jeep_positions is None:
+            # Posiciones estratégicas para los jeeps
+            jeep_positions = [
+                (TILE_SIZE * 8, TILE_SIZE * 6),    # Zona media-izquierda
+                (TILE_SIZE * 15, TILE_SIZE * 4),   # Zona superior-derecha
+                (TILE_SIZE * 12, TILE_SIZE * 12),  # Zona inferior-centro
+                (TILE_SIZE * 5, TILE_SIZE * 10),   # Zona inferior-izquierda
+            ]
+        
+        map_width = len(self.map_data[0]) * TILE_SIZE if self.map_data else WIDTH
+        map_height = len(self.map_data) * TILE_SIZE if self.map_data else HEIGHT
         
+        old_cells = self.jeep_cells()
+        for jeep in self.jeeps:
+            self.jeep_pool.release(jeep)
         self.jeeps = []
+        self._jeep_by_id = {}
+        self._jeep_cells = None
         for x, y in jeep_positions:
             # Verificar que la posición esté dentro del mapa y no en carreteras
-            if (x + TILE_SIZE * 2 < WIDTH - TILE_SIZE and 
-                y + TILE_SIZE < HEIGHT - TILE_SIZE):
-                jeep = Jeep(x, y)
+            if (x + TILE_SIZE * 2 < map_width - TILE_SIZE and 
+                y + TILE_SIZE < map_height - TILE_SIZE):
+                jeep = self.jeep_pool.acquire(x, y)
                 self.jeeps.append(jeep)
+                self._jeep_by_id[jeep.eid] = jeep
+        self._jeep_cells = None
+        
+        # Si el mapa ya estaba construido, avisar de las celdas que cambian de ocupación
+        if self.walkable_grid:
+            changed = set(old_cells) ^ set(self.jeep_cells())
+            if changed:
+                self.notify_change(sorted(changed))
+    
+    def rebuild_grids(self):
+        """Precalcula las rejillas de caminabilidad y velocidad a partir de map_data"""
+        self.walkable_grid = []
+        self.speed_grid = []
+        for row in self.map_data:
+            walkable_row = []
+            speed_row = []
+            for tile_type in row:
+                properties = self.get_tile_properties(tile_type)
+                walkable_row.append(properties['walkable'])
+                speed_row.append(properties['speed_modifier'])
+            self.walkable_grid.append(walkable_row)
+            self.speed_grid.append(speed_row)
+        
+        # Versiones en array para los sistemas del ECS
+        self.speed_array = np.array(self.speed_grid, dtype=np.float64)
+        self.blocked_padded = np.pad(~np.array(self.walkable_grid, dtype=bool), 1, constant_values=True)
+        self.tile_ids = np.array([[tile_id(tile_type) for tile_type in row] for row in self.map_data],
+                                 dtype=np.uint8)
+        self.tile_version = next(_tile_versions)
+        self._safe_cells = {(row, col) for row, tiles in enumerate(self.map_data)
+                            for col, tile_type in enumerate(tiles) if tile_type in SAFE_ZONE_TILES}
+        self._animated_cells = {}
+        for row, tiles in enumerate(self.map_data):
+            for col, tile_type in enumerate(tiles):
+                if tile_animations.is_animated(tile_type):
+                    self._animated_cells.setdefault(tile_type, set()).add((row, col))
+    
+    def set_tile(self, row, col, tile_type):
+        """Cambia un tile en tiempo de ejecución actualizando solo lo afectado.
+        
+        Si hay carreteras implicadas se re-autotilea el vecindario 3x3.
+        Devuelve la lista de celdas (fila, col) que han cambiado.
+        """
+        old_type = self.map_data[row][col]
+        if old_type == tile_type:
+            return []
+        self.map_data[row][col] = tile_type
+        changed = [(row, col)]
+        if is_road(old_type) or is_road(tile_type):
+            changed.extend(cell for cell in update_autotile_at(self.map_data, row, col)
+                           if cell != (row, col))
+        self._update_grid_cells(changed)
+        self.notify_change(changed)
+        return changed
+    
+    def paint_tiles(self, cells, tile_type):
+        """set_tile sobre varias celdas con un único aviso a los listeners (trazos del editor).
+        
+        Devuelve {celda: tipo anterior} de todas las celdas cambiadas,
+        incluidas las vecinas re-autotileadas, para poder deshacerlo.
+        """
+        previous = {}
+        for row, col in cells:
+            old_type = self.map_data[row][col]
+            if old_type == tile_type:
+                continue
+            if (row, col) not in previous:
+                previous[(row, col)] = old_type
+            self.map_data[row][col] = tile_type
+            if is_road(old_type) or is_road(tile_type):
+                # Los vecinos se apuntan antes de que el autotile los cambie
+                for r in range(max(0, row - 1), min(len(self.map_data), row + 2)):
+                    for c in range(max(0, col - 1), min(len(self.map_data[0]), col + 2)):
+                        previous.setdefault((r, c), self.map_data[r][c])
+                update_autotile_at(self.map_data, row, col)
+        previous = {cell: old_type for cell, old_type in previous.items()
+                    if self.map_data[cell[0]][cell[1]] != old_type}
+        if previous:
+            changed = list(previous)
+            self._update_grid_cells(changed)
+            self.notify_change(changed)
+        return previous
+    
+    def write_tiles(self, tiles):
+        """Escribe {celda: tipo} tal cual, sin autotile, con un único aviso (deshacer/rehacer)"""
+        changed = [(row, col) for (row, col), tile_type in tiles.items() if self.map_data[row][col] != tile_type]
+        for row, col in changed:
+            self.map_data[row][col] = tiles[(row, col)]
+        if changed:
+            self._update_grid_cells(changed)
+            self.notify_change(changed)
+        return changed
+    
+    def _update_grid_cells(self, cells):
+        """Refresca las rejillas precalculadas solo en las celdas indicadas"""
+        for row, col in cells:
+            properties = self.get_tile_properties(self.map_data[row][col])
+            self.walkable_grid[row][col] = properties['walkable']
+            self.speed_grid[row][col] = properties['speed_modifier']
+            self.speed_array[row, col] = properties['speed_modifier']
+            self.blocked_padded[row + 1, col + 1] = not properties['walkable']
+            self.tile_ids[row, col] = tile_id(self.map_data[row][col])
+            if self.map_data[row][col] in SAFE_ZONE_TILES:
+                self._safe_cells.add((row, col))
+            else:
+                self._safe_cells.discard((row, col))
+            for animated in self._animated_cells.values():
+                animated.discard((row, col))
+            if tile_animations.is_animated(self.map_data[row][col]):
+                self._animated_cells.setdefault(self.map_data[row][col], set()).add((row, col))
+        self.tile_version = next(_tile_versions)
+    
+    def restore_tiles(self, tile_ids, version=None):
+        """Sustituye el contenido del mapa por un array de ids de paleta (snapshots).
+        
+        Solo se reescriben y notifican las celdas distintas. Si se indica la
+        versión de esos tiles, el mapa la adopta para que las instantáneas
+        siguientes puedan compartir el array. Devuelve las celdas cambiadas.
+        """
+        if tile_ids.shape != self.tile_ids.shape:
+            raise ValueError(f"El mapa es {self.tile_ids.shape} y los tiles {tile_ids.shape}")
+        rows, cols = np.nonzero(self.tile_ids != tile_ids)
+        changed = list(zip(rows.tolist(), cols.tolist()))
+        for row, col in changed:
+            self.map_data[row][col] = TILE_PALETTE[tile_ids[row, col]]
+        if changed:
+            self._update_grid_cells(changed)
+            self.notify_change(changed)
+        if version is not None:
+            self.tile_version = version
+        return changed
     
-    def draw(self, screen):
+    def apply_map_data(self, map_data, jeep_positions=None):
+        """Pasa a otro contenido del mismo tamaño tocando solo las celdas distintas (recarga en caliente).
+        
+        Rejillas, autotile, pathfinding y capa estática se enteran por
+        notify_change como con cualquier edición. Devuelve las celdas
+        cambiadas, o None si el tamaño no coincide y hay que crear otro TileMap.
+        """
+        rows = len(map_data)
+        cols = len(map_data[0]) if rows else 0
+        if (rows, cols) != self.tile_ids.shape:
+            return None
+        tile_ids = np.array([[tile_id(tile_type) for tile_type in row] for row in map_data], dtype=np.uint8)
+        changed = self.restore_tiles(tile_ids)
+        if (jeep_positions is not None and
+                sorted(jeep_positions) != sorted(jeep.rect.topleft for jeep in self.jeeps)):
+            self.place_jeeps(jeep_positions)
+        return changed
+    
+    def _on_sprites_changed(self, names):
+        """Un sprite sustituido en caliente: se repintan solo las celdas que lo usan"""
+        if self.static_layer is None:
+            return
+        names = set(names)
+        for tile_type in names:
+            index = TILE_IDS.get(tile_type)
+            if index is not None and not tile_animations.is_animated(tile_type):
+                rows, cols = np.nonzero(self.tile_ids == index)
+                self._dirty_cells.update(zip(rows.tolist(), cols.tolist()))
+        for tile_type, cells in self._animated_cells.items():
+            if self.tile_sprite_name(tile_type) in names:
+                self._dirty_cells.update(cells)
+    
+    def add_change_listener(self, callback):
+        """Registra una función que recibe las celdas cambiadas tras cada edición"""
+        self.change_listeners.append(callback)
+    
+    def notify_change(self, cells):
+        """Avisa a los listeners de que estas celdas han cambiado"""
+        self._dirty_cells.update(cells)
+        for callback in self.change_listeners:
+            callback(cells)
+    
+    def take_dirty_cells(self):
+        """Celdas pendientes de repintar, que se dan por atendidas (para capas propias como la de GPU)"""
+        cells = self._dirty_cells
+        self._dirty_cells = set()
+        return cells
+    
+    def get_static_layer(self):
+        """Superficie con todos los tiles dibujados.
+        
+        Se pinta entera solo la primera vez o si cambian los sprites; después
+        únicamente se repintan las celdas notificadas como cambiadas.
+        """
+        rows = len(self.map_data)
+        cols = len(self.map_data[0]) if rows else 0
+        size = (cols * self.tile_size, rows * self.tile_size)
+        if (self.static_layer is None or self.static_layer.get_size() != size or
+                self._static_version != sprite_manager.version):
+            self.static_layer = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                self.static_layer = self.static_layer.convert()
+            cells = [(row, col) for row in range(rows) for col in range(cols)]
+            self._static_version = sprite_manager.version
+        elif self._dirty_cells:
+            cells = list(self._dirty_cells)
+        else:
+            return self.static_layer
+        self._dirty_cells.clear()
+        
+        blits = []
+        for row, col in cells:
+            x = col * self.tile_size
+            y = row * self.tile_size
+            sprite = sprite_manager.get_sprite(self.tile_sprite_name(self.map_data[row][col]))
+            if sprite:
+                blits.append((sprite, (x, y)))
+            else:
+                # Fallback: dibujar un rectángulo de color si no hay sprite
+                rect = pygame.Rect(x, y, self.tile_size, self.tile_size)
+                pygame.draw.rect(self.static_layer, (255, 0, 255), rect)  # Magenta como error
+        self.static_layer.blits(blits, doreturn=False)
+        return self.static_layer
+    
+    def update_animations(self, time_ms=None):
+        """Avanza los tiles animados al frame del reloj global.
+        
+        Solo se marcan para repintar las celdas de los tipos cuyo frame ha
+        cambiado; el resto de la capa estática se queda como está.
+        Devuelve cuántas celdas se han marcado.
+        """
+        if not self._animated_cells:
+            return 0
+        tile_animations.refresh()
+        if time_ms is None:
+            time_ms = animation_clock.time_ms
+        marked = 0
+        for tile_type, cells in self._animated_cells.items():
+            animation = tile_animations.get(tile_type)
+            if not cells or animation is None:
+                continue
+            index = animation.frame_index(time_ms)
+            if self._shown_frames.get(tile_type) != index:
+                self._shown_frames[tile_type] = index
+                self._dirty_cells.update(cells)
+                marked += len(cells)
+        return marked
+    
+    def tile_sprite_name(self, tile_type):
+        """Nombre del sprite con el que se pinta ahora un tipo de tile (frame actual si está animado)"""
+        animation = tile_animations.get(tile_type)
+        if animation is None:
+            return tile_type
+        index = self._shown_frames.get(tile_type)
+        if index is None:
+            index = self._shown_frames[tile_type] = animation.frame_index(animation_clock.time_ms)
+        return animation.frames[index]
+    
+    def draw(self, screen, draw_jeeps=True):
         """Dibuja el mapa completo en pantalla"""
-        # Dibujar tiles del mapa
-        for row_idx, row in enumerate(self.map_data):
-            for col_idx, tile_type in enumerate(row):
-                sprite = sprite_manager.get_sprite(tile_type)
-                if sprite:
-                    x = col_idx * self.tile_size
-                    y = row_idx * self.tile_size
-                    screen.blit(sprite, (x, y))
-                else:
-                    # Fallback: dibujar un rectángulo de color si no hay sprite
-                    x = col_idx * self.tile_size
-                    y = row_idx * self.tile_size
-                    rect = pygame.Rect(x, y, self.tile_size, self.tile_size)
-                    pygame.draw.rect(screen, (255, 0, 255), rect)  # Magenta como error
+        screen.blit(self.get_static_layer(), (0, 0))
         
         # Dibujar jeeps encima del mapa
-        for jeep in self.jeeps:
-            jeep.draw(screen)
+        if draw_jeeps:
+            for jeep in self.jeeps:
+                jeep.draw(screen)
     
     def get_tile_at_position(self, x, y):
         """Obtiene el tipo de tile en una posición específica"""
@@ -192,65 +537,133 @@ class TileMap:
         ]
         
         # Verificar colisión con jeeps
-        for jeep in self.jeeps:
-            if jeep.check_collision(pygame.Rect(x, y, 1, 1)):
-                return False
+        if len(collision_system(self.world, (x, y, 1, 1), COLLIDER_DAMAGE)):
+            return False
         
         return tile_type not in non_walkable
     
     def get_tile_properties(self, tile_type):
         """Obtiene las propiedades de un tipo de tile"""
-        properties = {
-            # Terrenos básicos
-            'grass': {'walkable': True, 'speed_modifier': 1.0},
-            'stone_light': {'walkable': True, 'speed_modifier': 1.0},
-            'stone_dark': {'walkable': True, 'speed_modifier': 1.0},
-            'cobblestone': {'walkable': True, 'speed_modifier': 1.1},
-            'dirt': {'walkable': True, 'speed_modifier': 0.8},
-            'sand': {'walkable': True, 'speed_modifier': 0.7},
-            'door': {'walkable': True, 'speed_modifier': 1.0},
-            
-            # Carreteras - velocidad alta
-            'road_straight_h': {'walkable': True, 'speed_modifier': 1.3},
-            'road_straight_v': {'walkable': True, 'speed_modifier': 1.3},
-            'road_corner_tl': {'walkable': True, 'speed_modifier': 1.2},
-            'road_corner_tr': {'walkable': True, 'speed_modifier': 1.2},
-            'road_corner_bl': {'walkable': True, 'speed_modifier': 1.2},
-            'road_corner_br': {'walkable': True, 'speed_modifier': 1.2},
-            'road_intersection': {'walkable': True, 'speed_modifier': 1.2},
-            'road_t_up': {'walkable': True, 'speed_modifier': 1.2},
-            'road_t_down': {'walkable': True, 'speed_modifier': 1.2},
-            'road_t_left': {'walkable': True, 'speed_modifier': 1.2},
-            'road_t_right': {'walkable': True, 'speed_modifier': 1.2},
-            
-            # Aceras
-            'sidewalk': {'walkable': True, 'speed_modifier': 1.1},
-            'sidewalk_corner': {'walkable': True, 'speed_modifier': 1.1},
-            
-            # No caminables
-            'brick_wall': {'walkable': False, 'speed_modifier': 0.0},
-            'tree_trunk': {'walkable': False, 'speed_modifier': 0.0},
-            'water': {'walkable': False, 'speed_modifier': 0.0},
-            'water_deep': {'walkable': False, 'speed_modifier': 0.0},
-            'roof_red': {'walkable': False, 'speed_modifier': 0.0},
-            'roof_blue': {'walkable': False, 'speed_modifier': 0.0},
-            'window': {'walkable': False, 'speed_modifier': 0.0}
-        }
-        return properties.get(tile_type, {'walkable': True, 'speed_modifier': 1.0})
-    
-    def check_jeep_collision(self, rect):
-        """Verifica colisión con cualquier jeep en el mapa"""
+        return TILE_PROPERTIES.get(tile_type, DEFAULT_TILE_PROPERTIES)
+    
+    def check_jeep_collision(self, rect, mask=None, motion=None):
+        """Verifica colisión con cualquier jeep en el mapa (rects en bloque, luego máscaras).
+        
+        Si se pasa motion (desplazamiento del último paso) y es mayor que la
+        caja, también cuenta un jeep atravesado durante ese paso: el barrido
+        de cajas da el instante de impacto y desde ahí se confirma con las
+        máscaras, así las esquinas transparentes no cuentan.
+        """
+        overlapping = collision_system(self.world, rect, COLLIDER_DAMAGE)
+        for eid in overlapping:
+            jeep = self._jeep_by_id.get(int(eid))
+            if jeep and jeep.check_collision(rect, mask):
+                return jeep
+        
+        # Con pasos más cortos que la caja no se puede saltar un jeep: basta el rect final
+        if motion is None or (abs(motion[0]) < rect.width and abs(motion[1]) < rect.height):
+            return None
+        world = self.world
+        ids = world.active_ids()
+        ids = ids[((world.collider[ids] & COLLIDER_DAMAGE) != 0) & ~np.isin(ids, overlapping)]
+        if len(ids) == 0:
+            return None
+        boxes = np.hstack([np.round(world.position[ids]), world.size[ids]])
+        toi = sweep_boxes(rect.x - motion[0], rect.y - motion[1], rect.width, rect.height,
+                          motion[0], motion[1], boxes)
+        # Posiciones a media caja de distancia desde el impacto hasta el final del paso
+        steps = int(2 * max(abs(motion[0]) / rect.width, abs(motion[1]) / rect.height)) + 1
+        moved = rect.copy()
+        for index in np.argsort(toi).tolist():
+            if not np.isfinite(toi[index]):
+                break
+            jeep = self._jeep_by_id.get(int(ids[index]))
+            if jeep is None:
+                continue
+            for t in np.linspace(toi[index], 1.0, steps).tolist():
+                moved.topleft = (round(rect.x - motion[0] * (1 - t)), round(rect.y - motion[1] * (1 - t)))
+                if jeep.check_collision(moved, mask):
+                    return jeep
+        return None
+    
+    def jeep_cells(self):
+        """Conjunto de celdas (fila, col) ocupadas por algún jeep"""
+        if self._jeep_cells is None:
+            self._jeep_cells = frozenset(cell for jeep in self.jeeps for cell in self.rect_cells(jeep.rect))
+        return self._jeep_cells
+    
+    def rect_cells(self, rect):
+        """Celdas (fila, col) que toca un rect"""
+        return [(row, col)
+                for row in range(rect.top // self.tile_size, (rect.bottom - 1) // self.tile_size + 1)
+                for col in range(rect.left // self.tile_size, (rect.right - 1) // self.tile_size + 1)]
+    
+    def add_jeep(self, x, y):
+        """Coloca un jeep más avisando solo de las celdas que ocupa"""
+        jeep = self.jeep_pool.acquire(x, y)
+        self.jeeps.append(jeep)
+        self._jeep_by_id[jeep.eid] = jeep
+        self._jeep_cells = None
+        self.notify_change(self.rect_cells(jeep.rect))
+        return jeep
+    
+    def remove_jeep(self, jeep):
+        """Quita un jeep avisando solo de las celdas que ocupaba"""
+        cells = self.rect_cells(jeep.rect)
+        self.jeeps.remove(jeep)
+        del self._jeep_by_id[jeep.eid]
+        self._jeep_cells = None
+        self.jeep_pool.release(jeep)
+        self.notify_change(cells)
+    
+    def jeep_at(self, x, y):
+        """Jeep bajo el punto (x, y), o None"""
         for jeep in self.jeeps:
-            if jeep.check_collision(rect):
+            if jeep.rect.collidepoint(x, y):
                 return jeep
         return None
     
+    def distance_field(self, name, sources=None):
+        """Campo de distancias cacheado con ese nombre; si se pasan sources se actualizan sus orígenes"""
+        field = self.distance_fields.get(name)
+        if field is None:
+            field = DistanceField(self, sources or ())
+            self.distance_fields[name] = field
+        elif sources is not None:
+            field.set_sources(sources)
+        return field
+    
+    def player_field(self, cell):
+        """Distancias hasta la celda del jugador (para perseguirle)"""
+        return self.distance_field('player', [cell])
+    
+    def safe_zone_field(self):
+        """Distancias hasta el refugio más cercano"""
+        return self.distance_field('safe', self._safe_cells)
+    
+    def jeep_field(self):
+        """Distancias hasta el jeep más cercano"""
+        return self.distance_field('jeeps', self.jeep_cells())
+    
+    def danger_map(self, radius=JEEP_DANGER_RADIUS):
+        """Peligro por celda alrededor de los jeeps: 1 pegado a uno, 0 a partir de radius"""
+        return influence_map(self.jeep_field(), radius)
+    
     def get_jeeps(self):
         """Devuelve la lista de jeeps"""
         return self.jeeps
     
-    def find_safe_spawn_position(self, entity_width=30, entity_height=30, for_enemy=False):
-        """Encuentra una posición segura y caminable para spawnear el jugador o enemigo"""
+    def find_safe_spawn_position(self, entity_width=30, entity_height=30, for_enemy=False, reachable_from=None):
+        """Encuentra una posición segura y caminable para spawnear el jugador o enemigo.
+        
+        La posición tiene que estar conectada con el punto reachable_from
+        (x, y) si se indica; si no, con la zona caminable más grande del
+        mapa, para no aparecer encerrado en un edificio.
+        """
+        if reachable_from is not None:
+            component = self.connectivity.component_at(*reachable_from)
+        else:
+            component = self.connectivity.largest_component()
         if for_enemy:
             # Posiciones especiales para el enemigo con más espacio libre
             safe_positions = [
@@ -275,23 +688,29 @@ class TileMap:
                 (WIDTH - TILE_SIZE * 5, TILE_SIZE * 7),    # Lado derecho
             ]
         
-        for x, y in safe_positions:
-            # Crear rect temporal para verificar
-            temp_rect = pygame.Rect(x, y, entity_width, entity_height)
-            
-            # Verificar que la posición esté dentro de límites
-            if (x >= 0 and y >= 0 and 
-                x + entity_width <= WIDTH and 
-                y + entity_height <= HEIGHT):
+        # Un único rect temporal del pool para todas las comprobaciones
+        with rect_pool.borrow(0, 0, entity_width, entity_height) as temp_rect:
+            for x, y in safe_positions:
+                temp_rect.topleft = (x, y)
                 
-                # Verificar que sea caminable
-                if self._is_rect_walkable(temp_rect):
-                    # Verificar que no esté en un jeep
-                    if not self.check_jeep_collision(temp_rect):
-                        # Para enemigos, verificar que tenga espacio de movimiento
-                        if for_enemy and not self._has_movement_space(x, y, entity_width, entity_height):
-                            continue
-                        return (x, y)
+                # Verificar que la posición esté dentro de límites
+                if (x >= 0 and y >= 0 and 
+                    x + entity_width <= WIDTH and 
+                    y + entity_height <= HEIGHT):
+                    
+                    # Verificar que sea caminable y esté conectada
+                    if self._is_rect_walkable(temp_rect) and self.is_rect_in_component(temp_rect, component):
+                        # Verificar que no esté en un jeep
+                        if not self.check_jeep_collision(temp_rect):
+                            # Para enemigos, verificar que tenga espacio de movimiento
+                            if for_enemy and not self._has_movement_space(x, y, entity_width, entity_height):
+                                continue
+                            return (x, y)
+        
+        # Si no, la primera celda de la componente en la que quepa la entidad
+        position = self._find_position_in_component(component, entity_width, entity_height)
+        if position is not None:
+            return position
         
         # Si no encuentra posición segura, usar una por defecto
         if for_enemy:
@@ -299,6 +718,28 @@ class TileMap:
         else:
             return (TILE_SIZE * 2, TILE_SIZE * 2)
     
+    def is_rect_in_component(self, rect, component):
+        """¿El centro del rect cae en esa componente conexa?"""
+        return component != NO_COMPONENT and self.connectivity.component_at(*rect.center) == component
+    
+    def can_reach(self, x1, y1, x2, y2):
+        """¿Se puede ir andando del punto (x1, y1) al (x2, y2)? (O(1))"""
+        component = self.connectivity.component_at(x1, y1)
+        return component != NO_COMPONENT and component == self.connectivity.component_at(x2, y2)
+    
+    def _find_position_in_component(self, component, entity_width, entity_height):
+        """Esquina de la primera celda de la componente donde la entidad cabe sin tocar jeeps"""
+        if component == NO_COMPONENT:
+            return None
+        with rect_pool.borrow(0, 0, entity_width, entity_height) as temp_rect:
+            for row, col in self.connectivity.cells_of(component).tolist():
+                x = col * TILE_SIZE + (TILE_SIZE - entity_width) // 2
+                y = row * TILE_SIZE + (TILE_SIZE - entity_height) // 2
+                temp_rect.topleft = (x, y)
+                if self._is_rect_walkable(temp_rect) and not self.check_jeep_collision(temp_rect):
+                    return (x, y)
+        return None
+    
     def _has_movement_space(self, x, y, width, height, min_space=3):
         """Verifica que haya suficiente espacio libre alrededor para que el enemigo se mueva"""
         # Verificar un área más grande alrededor de la entidad
@@ -0,0 +1,157 @@
+# Tiles que bloquean la visión (las ventanas dejan ver)
+OPAQUE_TILES = frozenset({'brick_wall', 'tree_trunk', 'roof_red', 'roof_blue'})
+
+# Multiplicadores de los 8 octantes para el shadowcasting
+_OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+class VisibilityMap:
+    """Consultas de línea de visión sobre la rejilla de tiles.
+
+    has_line_of_sight recorre la rejilla con DDA (un paso por tile cruzado) y
+    memoriza el resultado por pareja (tile origen, tile destino) hasta el
+    siguiente begin_frame(). compute_fov hace shadowcasting recursivo y su
+    resultado se cachea por origen hasta que se edita un tile cercano.
+    """
+
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        self.tile_size = tilemap.tile_size
+        self.rows = len(tilemap.map_data)
+        self.cols = len(tilemap.map_data[0]) if self.rows else 0
+        self.opaque = [[tile in OPAQUE_TILES for tile in row] for row in tilemap.map_data]
+        self._line_cache = {}
+        self._fov_cache = {}
+        tilemap.add_change_listener(self._on_tiles_changed)
+
+    def begin_frame(self):
+        """Olvida las consultas del frame anterior (las entidades se han movido)"""
+        self._line_cache.clear()
+
+    def _on_tiles_changed(self, cells):
+        for row, col in cells:
+            self.opaque[row][col] = self.tilemap.map_data[row][col] in OPAQUE_TILES
+        self._line_cache.clear()
+        # Solo se descartan los FOV cuyo radio alcanza alguna celda editada
+        for key in list(self._fov_cache):
+            origin_row, origin_col, radius = key
+            for row, col in cells:
+                if abs(row - origin_row) <= radius and abs(col - origin_col) <= radius:
+                    del self._fov_cache[key]
+                    break
+
+    def is_opaque(self, row, col):
+        """Fuera del mapa se considera opaco"""
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.opaque[row][col]
+        return True
+
+    def has_line_of_sight(self, from_cell, to_cell):
+        """Indica si no hay tiles opacos entre los centros de dos celdas (fila, col)"""
+        if from_cell == to_cell:
+            return True
+        # El DDA no es simétrico con la suma en coma flotante: se lanza siempre
+        # desde la menor de las dos celdas para que (a, b) y (b, a) coincidan
+        key = (from_cell, to_cell) if from_cell < to_cell else (to_cell, from_cell)
+        cached = self._line_cache.get(key)
+        if cached is None:
+            cached = self._cast(*key)
+            self._line_cache[key] = cached
+        return cached
+
+    def _cast(self, from_cell, to_cell):
+        """DDA de Amanatides-Woo entre centros de tile"""
+        row, col = from_cell
+        end_row, end_col = to_cell
+        dx = end_col - col
+        dy = end_row - row
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Distancia (en t de 0 a 1) para cruzar un tile en cada eje
+        delta_x = abs(1 / dx) if dx else float('inf')
+        delta_y = abs(1 / dy) if dy else float('inf')
+        # Desde el centro, el primer borde está a medio tile
+        max_x = delta_x / 2
+        max_y = delta_y / 2
+
+        while (row, col) != (end_row, end_col):
+            if max_x < max_y:
+                col += step_x
+                max_x += delta_x
+            elif max_y < max_x:
+                row += step_y
+                max_y += delta_y
+            else:
+                # Pasa justo por una esquina: bloquea solo si ambos lados son opacos
+                side_a = self.is_opaque(row, col + step_x)
+                side_b = self.is_opaque(row + step_y, col)
+                if side_a and side_b:
+                    return False
+                col += step_x
+                row += step_y
+                max_x += delta_x
+                max_y += delta_y
+            if (row, col) != (end_row, end_col) and self.is_opaque(row, col):
+                return False
+        return True
+
+    def cell_at(self, x, y):
+        """Celda (fila, col) de una posición en píxeles"""
+        return (int(y // self.tile_size), int(x // self.tile_size))
+
+    def can_see(self, viewer_rect, target_rect):
+        """Línea de visión entre los centros de dos rects"""
+        return self.has_line_of_sight(self.cell_at(*viewer_rect.center),
+                                      self.cell_at(*target_rect.center))
+
+    def compute_fov(self, row, col, radius):
+        """Conjunto de celdas visibles desde (row, col) dentro del radio (cacheado)"""
+        key = (row, col, radius)
+        visible = self._fov_cache.get(key)
+        if visible is None:
+            visible = {(row, col)}
+            for xx, xy, yx, yy in _OCTANTS:
+                self._cast_light(visible, row, col, 1, 1.0, 0.0, radius, xx, xy, yx, yy)
+            visible = frozenset(visible)
+            self._fov_cache[key] = visible
+        return visible
+
+    def _cast_light(self, visible, origin_row, origin_col, distance, start, end, radius, xx, xy, yx, yy):
+        """Shadowcasting recursivo de un octante"""
+        if start < end:
+            return
+        radius_sq = radius * radius
+        for current in range(distance, radius + 1):
+            dx = -current - 1
+            dy = -current
+            blocked = False
+            new_start = start
+            while dx <= 0:
+                dx += 1
+                col = origin_col + dx * xx + dy * xy
+                row = origin_row + dx * yx + dy * yy
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                if dx * dx + dy * dy <= radius_sq and 0 <= row < self.rows and 0 <= col < self.cols:
+                    visible.add((row, col))
+                if blocked:
+                    if self.is_opaque(row, col):
+                        new_start = right_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif self.is_opaque(row, col) and current < radius:
+                    blocked = True
+                    self._cast_light(visible, origin_row, origin_col, current + 1, start, left_slope,
+                                     radius, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pathfinding import HierarchicalPathfinder
+
+
+def open_grid(rows, cols):
+    return [[True] * cols for _ in range(rows)], [[1.0] * cols for _ in range(rows)]
+
+
+def flat_reachable(walkable, start, goal):
+    """BFS sobre toda la rejilla: la referencia para HPA*"""
+    rows, cols = len(walkable), len(walkable[0])
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        row, col = queue.popleft()
+        if (row, col) == goal:
+            return True
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < rows and 0 <= c < cols and walkable[r][c] and (r, c) not in seen:
+                seen.add((r, c))
+                queue.append((r, c))
+    return False
+
+
+def test_start_on_entrance_uses_its_own_inter_edge():
+    walkable, cost = open_grid(8, 16)
+    pathfinder = HierarchicalPathfinder(walkable, cost, cluster_size=8)
+    path = pathfinder.find_path((0, 7), (0, 8))
+    assert path is not None
+    assert path.cost == 1.0
+
+
+def test_start_on_entrance_with_walled_cluster():
+    walkable, cost = open_grid(8, 16)
+    for row in range(8):
+        walkable[row][6] = False
+    walkable[2][7] = False
+    walkable[4][7] = False
+    pathfinder = HierarchicalPathfinder(walkable, cost, cluster_size=8)
+    assert pathfinder.find_path((3, 12), (3, 7)) is not None
+    assert pathfinder.find_path((3, 7), (3, 12)) is not None
+
+
+def test_reachability_matches_flat_search():
+    rng = random.Random(1234)
+    for _ in range(20):
+        rows, cols = rng.randint(8, 24), rng.randint(8, 24)
+        walkable = [[rng.random() > 0.3 for _ in range(cols)] for _ in range(rows)]
+        cost = [[1.0] * cols for _ in range(rows)]
+        pathfinder = HierarchicalPathfinder(walkable, cost, cluster_size=4)
+        free = [(row, col) for row in range(rows) for col in range(cols) if walkable[row][col]]
+        for _ in range(40):
+            start, goal = rng.choice(free), rng.choice(free)
+            found = pathfinder.find_path(start, goal) is not None
+            assert found == flat_reachable(walkable, start, goal), (start, goal)